@@ -491,10 +491,11 @@ class BaseInterpreterInterface:
             val_dict = {}
 
         keys = val_dict.keys()
+        budget = pydevd_xml.RenderBudget()
         for k in keys:
             val = val_dict[k]
             evaluate_full_value = pydevd_xml.should_evaluate_full_value(val)
-            xml.write(pydevd_vars.var_to_xml(val, k, evaluate_full_value=evaluate_full_value))
+            xml.write(pydevd_vars.var_to_xml(val, k, evaluate_full_value=evaluate_full_value, budget=budget))
 
         xml.write("</xml>")
 
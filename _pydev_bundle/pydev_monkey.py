@@ -254,6 +254,10 @@ def patch_args(args, is_exec=False):
         if len(args) == 0:
             return args
 
+        if pydevd_constants.is_inherited_fd_endpoint(SetupHolder.setup.get('client')):
+            pydev_log.debug("Connection is done through an inherited socket (which can't be shared with subprocesses), returning.")
+            return args
+
         if is_python(args[0]):
             ind_c = get_c_option_index(args)
 
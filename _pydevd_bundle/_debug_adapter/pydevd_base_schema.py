@@ -1,16 +1,34 @@
 from _pydevd_bundle._debug_adapter.pydevd_schema_log import debug_exception
+from _pydevd_bundle.pydevd_constants import ForkSafeLock
+from collections import deque
 import json
-import itertools
-from functools import partial
+
+try:
+    from inspect import getfullargspec as _getargspec
+except ImportError:
+    from inspect import getargspec as _getargspec  # Python 2
+
+
+# The number of released dap ids to keep before starting to reuse released ids (so, the
+# translation tables have at most the number of live ids + this number of entries).
+REUSE_RELEASED_DAP_IDS_AFTER = 10000
 
 
 class BaseSchema(object):
 
     @staticmethod
     def initialize_ids_translation():
-        BaseSchema._dap_id_to_obj_id = {0:0, None:None}
+        # The dap id is the index in the list (0 is always mapped to 0 and a None entry
+        # means that the dap id was released and may be reused).
+        BaseSchema._dap_id_to_obj_id = [0]
         BaseSchema._obj_id_to_dap_id = {0:0, None:None}
-        BaseSchema._next_dap_id = partial(next, itertools.count(1))
+
+        # Released dap ids are reused in the order they were released and only after
+        # `REUSE_RELEASED_DAP_IDS_AFTER` other ids are released (so that a dap id the client
+        # still has from some previous suspension is reported as invalid instead of pointing
+        # to some unrelated object).
+        BaseSchema._released_dap_ids = deque()
+        BaseSchema._ids_translation_lock = ForkSafeLock()
 
     def to_json(self):
         return json.dumps(self.to_dict())
@@ -19,22 +37,55 @@ class BaseSchema(object):
     def _translate_id_to_dap(obj_id):
         if obj_id == '*':
             return '*'
-        # Note: we don't invalidate ids, so, if some object starts using the same id
-        # of another object, the same id will be used.
         dap_id = BaseSchema._obj_id_to_dap_id.get(obj_id)
-        if dap_id is None:
-            dap_id = BaseSchema._obj_id_to_dap_id[obj_id] = BaseSchema._next_dap_id()
-            BaseSchema._dap_id_to_obj_id[dap_id] = obj_id
+        if dap_id is None and obj_id is not None:
+            with BaseSchema._ids_translation_lock:
+                dap_id = BaseSchema._obj_id_to_dap_id.get(obj_id)
+                if dap_id is None:
+                    dap_id_to_obj_id = BaseSchema._dap_id_to_obj_id
+                    released_dap_ids = BaseSchema._released_dap_ids
+                    if len(released_dap_ids) > REUSE_RELEASED_DAP_IDS_AFTER:
+                        dap_id = released_dap_ids.popleft()
+                        dap_id_to_obj_id[dap_id] = obj_id
+                    else:
+                        dap_id = len(dap_id_to_obj_id)
+                        dap_id_to_obj_id.append(obj_id)
+                    BaseSchema._obj_id_to_dap_id[obj_id] = dap_id
         return dap_id
 
     @staticmethod
     def _translate_id_from_dap(dap_id):
         if dap_id == '*':
             return '*'
+        if dap_id is None:
+            return None
         try:
-            return BaseSchema._dap_id_to_obj_id[dap_id]
+            if dap_id >= 0:
+                obj_id = BaseSchema._dap_id_to_obj_id[dap_id]
+                if obj_id is not None:
+                    return obj_id
         except:
-            raise KeyError('Wrong ID sent from the client: %s' % (dap_id,))
+            pass
+        raise KeyError('Wrong ID sent from the client: %s' % (dap_id,))
+
+    @staticmethod
+    def release_ids(obj_ids):
+        '''
+        Releases the dap ids of the given object ids (i.e.: frames and variables references which
+        are no longer valid because the related thread was resumed).
+
+        Afterwards the client can no longer use the related dap ids (until they're reused).
+        '''
+        with BaseSchema._ids_translation_lock:
+            obj_id_to_dap_id = BaseSchema._obj_id_to_dap_id
+            dap_id_to_obj_id = BaseSchema._dap_id_to_obj_id
+            released_dap_ids = BaseSchema._released_dap_ids
+            for obj_id in obj_ids:
+                dap_id = obj_id_to_dap_id.get(obj_id)
+                if dap_id:  # Note: 0 and None are never released.
+                    del obj_id_to_dap_id[obj_id]
+                    dap_id_to_obj_id[dap_id] = None
+                    released_dap_ids.append(dap_id)
 
     @staticmethod
     def update_dict_ids_to_dap(dct):
@@ -113,12 +164,22 @@ def from_dict(dct, update_ids_from_dap=False):
         raise
 
 
-def from_json(json_msg, update_ids_from_dap=False, on_dict_loaded=lambda dct:None):
+def from_json(json_msg, update_ids_from_dap=False, on_dict_loaded=lambda dct:None, lazy_requests=False):
+    '''
+    :param bool lazy_requests:
+        If True, the requests in `LAZY_REQUESTS` are returned as a `LazyRequest` (which only
+        decodes the fields actually accessed and creates the actual request object on demand).
+    '''
     if isinstance(json_msg, bytes):
         json_msg = json_msg.decode('utf-8')
 
     as_dict = json.loads(json_msg)
     on_dict_loaded(as_dict)
+    if lazy_requests and as_dict.get('type') == 'request' and as_dict.get('command') in LAZY_REQUESTS:
+        lazy_request = _create_lazy_request(as_dict, update_ids_from_dap)
+        if lazy_request is not None:
+            return lazy_request
+
     try:
         return from_dict(as_dict, update_ids_from_dap=update_ids_from_dap)
     except:
@@ -130,6 +191,125 @@ def from_json(json_msg, update_ids_from_dap=False, on_dict_loaded=lambda dct:Non
             raise
 
 
+# Requests which may be decoded lazily (those are sent very frequently by the client and their
+# handlers only access a few fields of the arguments).
+LAZY_REQUESTS = frozenset(('threads', 'stackTrace', 'variables', 'evaluate'))
+
+# command -> tuple(request class, arguments class or None, required arguments, arguments defaults)
+_lazy_request_info_cache = {}
+
+
+def _get_lazy_request_info(command):
+    try:
+        return _lazy_request_info_cache[command]
+    except KeyError:
+        pass
+
+    request_cls = _requests_to_types[command]
+    arguments_type = request_cls.__props__['arguments'].get('type')
+    arguments_cls = _all_messages.get(arguments_type) if arguments_type.__class__ == str else None
+    required = ()
+    defaults = {}
+    if arguments_cls is not None:
+        args, _varargs, _varkw, arg_defaults = _getargspec(arguments_cls.__init__)[:4]
+        args = args[1:]  # Skip self.
+        if arg_defaults:
+            required = tuple(args[:-len(arg_defaults)])
+            defaults = dict(zip(args[-len(arg_defaults):], arg_defaults))
+        else:
+            required = tuple(args)
+
+        for ref in getattr(arguments_cls, '__refs__', ()):
+            if defaults.get(ref) is None:
+                # When not given the request creates an empty instance (whose dict is empty).
+                defaults[ref] = {}
+
+    info = _lazy_request_info_cache[command] = (request_cls, arguments_cls, required, defaults)
+    return info
+
+
+def _create_lazy_request(dct, update_ids_from_dap):
+    '''
+    :return LazyRequest:
+        The lazy request or None if it can't be created lazily (in which case the message must
+        be fully decoded -- which will also raise the proper errors if the message is not valid).
+    '''
+    request_cls, arguments_cls, required, defaults = _get_lazy_request_info(dct['command'])
+    arguments = dct.get('arguments')
+    if arguments_cls is not None:
+        if arguments.__class__ != dict:
+            return None
+
+        for name in required:
+            if name not in arguments:
+                return None
+
+        arguments_dct = dict(arguments)
+        if update_ids_from_dap:
+            arguments_cls.update_dict_ids_from_dap(arguments_dct)
+        arguments = _LazyArguments(arguments_dct, arguments_cls, defaults)
+
+    return LazyRequest(dct, request_cls, arguments, update_ids_from_dap)
+
+
+class _LazyArguments(object):
+    '''
+    The arguments of a `LazyRequest`: the fields are read directly from the (already translated)
+    dict and the actual arguments object is only created if something else is accessed.
+    '''
+
+    __slots__ = ['_dct', '_arguments_cls', '_defaults', '_arguments']
+
+    def __init__(self, dct, arguments_cls, defaults):
+        self._dct = dct
+        self._arguments_cls = arguments_cls
+        self._defaults = defaults
+        self._arguments = None
+
+    def __getattr__(self, name):
+        try:
+            return self._dct[name]
+        except KeyError:
+            pass
+
+        defaults = self._defaults
+        if name in defaults:
+            return defaults[name]
+
+        arguments = self._arguments
+        if arguments is None:
+            # Note: ids in the dict are already translated.
+            arguments = self._arguments = self._arguments_cls(**self._dct)
+        return getattr(arguments, name)
+
+
+class LazyRequest(object):
+    '''
+    A request whose `type`, `seq`, `command` and `arguments` are available without creating the
+    actual request object (which is only created if some other attribute -- i.e.: `to_dict` --
+    is accessed).
+    '''
+
+    __slots__ = ['seq', 'command', 'arguments', '_dct', '_request_cls', '_update_ids_from_dap', '_request']
+
+    type = 'request'
+
+    def __init__(self, dct, request_cls, arguments, update_ids_from_dap):
+        self.seq = dct.get('seq', -1)
+        self.command = dct['command']
+        self.arguments = arguments
+        self._dct = dct
+        self._request_cls = request_cls
+        self._update_ids_from_dap = update_ids_from_dap
+        self._request = None
+
+    def __getattr__(self, name):
+        request = self._request
+        if request is None:
+            request = self._request = self._request_cls(update_ids_from_dap=self._update_ids_from_dap, **self._dct)
+        return getattr(request, name)
+
+
 def get_response_class(request):
     if request.__class__ == dict:
         return _responses_to_types[request['command']]
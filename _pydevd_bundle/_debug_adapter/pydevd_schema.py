@@ -14993,40 +14993,787 @@ class PydevdInfo(BaseSchema):
         "usingFrameEval": {
             "type": "boolean",
             "description": "Specifies whether the frame eval native module is being used."
+        },
+        "compiledCodeCache": {
+            "description": "Statistics of the cache of the code compiled from the expressions evaluated.",
+            "type": "PydevdCompiledCodeCacheInfo"
         }
     }
-    __refs__ = set()
+    __refs__ = set(['compiledCodeCache'])
 
     __slots__ = list(__props__.keys()) + ['kwargs']
 
-    def __init__(self, usingCython=None, usingFrameEval=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+    def __init__(self, usingCython=None, usingFrameEval=None, compiledCodeCache=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
         """
         :param boolean usingCython: Specifies whether the cython native module is being used.
         :param boolean usingFrameEval: Specifies whether the frame eval native module is being used.
+        :param PydevdCompiledCodeCacheInfo compiledCodeCache: Statistics of the cache of the code compiled from the expressions evaluated.
         """
         self.usingCython = usingCython
         self.usingFrameEval = usingFrameEval
+        if compiledCodeCache is None:
+            self.compiledCodeCache = PydevdCompiledCodeCacheInfo()
+        else:
+            self.compiledCodeCache = PydevdCompiledCodeCacheInfo(update_ids_from_dap=update_ids_from_dap, **compiledCodeCache) if compiledCodeCache.__class__ !=  PydevdCompiledCodeCacheInfo else compiledCodeCache
         self.kwargs = kwargs
 
 
     def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
         usingCython = self.usingCython
         usingFrameEval = self.usingFrameEval
+        compiledCodeCache = self.compiledCodeCache
+        dct = {
+        }
+        if usingCython is not None:
+            dct['usingCython'] = usingCython
+        if usingFrameEval is not None:
+            dct['usingFrameEval'] = usingFrameEval
+        if compiledCodeCache is not None:
+            dct['compiledCodeCache'] = compiledCodeCache.to_dict(update_ids_to_dap=update_ids_to_dap)
+        dct.update(self.kwargs)
+        return dct
+
+
+@register
+class PydevdCompiledCodeCacheInfo(BaseSchema):
+    """
+    This object contains the statistics of the cache of the code compiled from the expressions
+    evaluated.
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "size": {
+            "type": "integer",
+            "description": "Number of entries in the cache."
+        },
+        "hits": {
+            "type": "integer",
+            "description": "Number of times the code was found in the cache."
+        },
+        "misses": {
+            "type": "integer",
+            "description": "Number of times the code had to be compiled."
+        },
+        "evictions": {
+            "type": "integer",
+            "description": "Number of entries removed because the cache was full."
+        },
+        "hitRate": {
+            "type": "number",
+            "description": "Ratio of hits to the total number of lookups."
+        }
+    }
+    __refs__ = set()
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, size=None, hits=None, misses=None, evictions=None, hitRate=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param integer size: Number of entries in the cache.
+        :param integer hits: Number of times the code was found in the cache.
+        :param integer misses: Number of times the code had to be compiled.
+        :param integer evictions: Number of entries removed because the cache was full.
+        :param number hitRate: Ratio of hits to the total number of lookups.
+        """
+        self.size = size
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.hitRate = hitRate
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        size = self.size
+        hits = self.hits
+        misses = self.misses
+        evictions = self.evictions
+        hitRate = self.hitRate
+        dct = {
+        }
+        if size is not None:
+            dct['size'] = size
+        if hits is not None:
+            dct['hits'] = hits
+        if misses is not None:
+            dct['misses'] = misses
+        if evictions is not None:
+            dct['evictions'] = evictions
+        if hitRate is not None:
+            dct['hitRate'] = hitRate
+        dct.update(self.kwargs)
+        return dct
+
+
+@register_request('pydevdAuthorize')
+@register
+class PydevdAuthorizeRequest(BaseSchema):
+    """
+    A request to authorize the ide to start accepting commands.
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "seq": {
+            "type": "integer",
+            "description": "Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request."
+        },
+        "type": {
+            "type": "string",
+            "enum": [
+                "request"
+            ]
+        },
+        "command": {
+            "type": "string",
+            "enum": [
+                "pydevdAuthorize"
+            ]
+        },
+        "arguments": {
+            "type": "PydevdAuthorizeArguments"
+        }
+    }
+    __refs__ = set(['arguments'])
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, arguments, seq=-1, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param string type: 
+        :param string command: 
+        :param PydevdAuthorizeArguments arguments: 
+        :param integer seq: Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request.
+        """
+        self.type = 'request'
+        self.command = 'pydevdAuthorize'
+        if arguments is None:
+            self.arguments = PydevdAuthorizeArguments()
+        else:
+            self.arguments = PydevdAuthorizeArguments(update_ids_from_dap=update_ids_from_dap, **arguments) if arguments.__class__ !=  PydevdAuthorizeArguments else arguments
+        self.seq = seq
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        type = self.type  # noqa (assign to builtin)
+        command = self.command
+        arguments = self.arguments
+        seq = self.seq
+        dct = {
+            'type': type,
+            'command': command,
+            'arguments': arguments.to_dict(update_ids_to_dap=update_ids_to_dap),
+            'seq': seq,
+        }
+        dct.update(self.kwargs)
+        return dct
+
+
+@register
+class PydevdAuthorizeArguments(BaseSchema):
+    """
+    Arguments for 'pydevdAuthorize' request.
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "debugServerAccessToken": {
+            "type": "string",
+            "description": "The access token to access the debug server."
+        }
+    }
+    __refs__ = set()
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, debugServerAccessToken=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param string debugServerAccessToken: The access token to access the debug server.
+        """
+        self.debugServerAccessToken = debugServerAccessToken
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        debugServerAccessToken = self.debugServerAccessToken
+        dct = {
+        }
+        if debugServerAccessToken is not None:
+            dct['debugServerAccessToken'] = debugServerAccessToken
+        dct.update(self.kwargs)
+        return dct
+
+
+@register_response('pydevdAuthorize')
+@register
+class PydevdAuthorizeResponse(BaseSchema):
+    """
+    Response to 'pydevdAuthorize' request.
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "seq": {
+            "type": "integer",
+            "description": "Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request."
+        },
+        "type": {
+            "type": "string",
+            "enum": [
+                "response"
+            ]
+        },
+        "request_seq": {
+            "type": "integer",
+            "description": "Sequence number of the corresponding request."
+        },
+        "success": {
+            "type": "boolean",
+            "description": "Outcome of the request.\nIf true, the request was successful and the 'body' attribute may contain the result of the request.\nIf the value is false, the attribute 'message' contains the error in short form and the 'body' may contain additional information (see 'ErrorResponse.body.error')."
+        },
+        "command": {
+            "type": "string",
+            "description": "The command requested."
+        },
+        "message": {
+            "type": "string",
+            "description": "Contains the raw error in short form if 'success' is false.\nThis raw error might be interpreted by the frontend and is not shown in the UI.\nSome predefined values exist.",
+            "_enum": [
+                "cancelled"
+            ],
+            "enumDescriptions": [
+                "request was cancelled."
+            ]
+        },
+        "body": {
+            "type": "object",
+            "properties": {
+                "clientAccessToken": {
+                    "type": "string",
+                    "description": "The access token to access the client (i.e.: usually the IDE)."
+                }
+            },
+            "required": [
+                "clientAccessToken"
+            ]
+        }
+    }
+    __refs__ = set(['body'])
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, request_seq, success, command, body, seq=-1, message=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param string type: 
+        :param integer request_seq: Sequence number of the corresponding request.
+        :param boolean success: Outcome of the request.
+        If true, the request was successful and the 'body' attribute may contain the result of the request.
+        If the value is false, the attribute 'message' contains the error in short form and the 'body' may contain additional information (see 'ErrorResponse.body.error').
+        :param string command: The command requested.
+        :param PydevdAuthorizeResponseBody body: 
+        :param integer seq: Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request.
+        :param string message: Contains the raw error in short form if 'success' is false.
+        This raw error might be interpreted by the frontend and is not shown in the UI.
+        Some predefined values exist.
+        """
+        self.type = 'response'
+        self.request_seq = request_seq
+        self.success = success
+        self.command = command
+        if body is None:
+            self.body = PydevdAuthorizeResponseBody()
+        else:
+            self.body = PydevdAuthorizeResponseBody(update_ids_from_dap=update_ids_from_dap, **body) if body.__class__ !=  PydevdAuthorizeResponseBody else body
+        self.seq = seq
+        self.message = message
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        type = self.type  # noqa (assign to builtin)
+        request_seq = self.request_seq
+        success = self.success
+        command = self.command
+        body = self.body
+        seq = self.seq
+        message = self.message
         dct = {
+            'type': type,
+            'request_seq': request_seq,
+            'success': success,
+            'command': command,
+            'body': body.to_dict(update_ids_to_dap=update_ids_to_dap),
+            'seq': seq,
+        }
+        if message is not None:
+            dct['message'] = message
+        dct.update(self.kwargs)
+        return dct
+
+
+@register_request('pydevdGetSnapshots')
+@register
+class PydevdGetSnapshotsRequest(BaseSchema):
+    """
+    Fetches (and removes from the debugger) the snapshots captured by snapshot breakpoints (i.e.:
+    breakpoints set with 'pydevdSnapshot': true in the 'SourceBreakpoint', which don't suspend and
+    capture a snapshot of the locals and the stack when hit).
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "seq": {
+            "type": "integer",
+            "description": "Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request."
+        },
+        "type": {
+            "type": "string",
+            "enum": [
+                "request"
+            ]
+        },
+        "command": {
+            "type": "string",
+            "enum": [
+                "pydevdGetSnapshots"
+            ]
+        },
+        "arguments": {
+            "type": "PydevdGetSnapshotsArguments"
+        }
+    }
+    __refs__ = set(['arguments'])
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, seq=-1, arguments=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param string type: 
+        :param string command: 
+        :param integer seq: Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request.
+        :param PydevdGetSnapshotsArguments arguments: 
+        """
+        self.type = 'request'
+        self.command = 'pydevdGetSnapshots'
+        self.seq = seq
+        if arguments is None:
+            self.arguments = PydevdGetSnapshotsArguments()
+        else:
+            self.arguments = PydevdGetSnapshotsArguments(update_ids_from_dap=update_ids_from_dap, **arguments) if arguments.__class__ !=  PydevdGetSnapshotsArguments else arguments
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        type = self.type  # noqa (assign to builtin)
+        command = self.command
+        seq = self.seq
+        arguments = self.arguments
+        dct = {
+            'type': type,
+            'command': command,
+            'seq': seq,
+        }
+        if arguments is not None:
+            dct['arguments'] = arguments.to_dict(update_ids_to_dap=update_ids_to_dap)
+        dct.update(self.kwargs)
+        return dct
+
+
+@register
+class PydevdGetSnapshotsArguments(BaseSchema):
+    """
+    Arguments for 'pydevdGetSnapshots' request.
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "maxCount": {
+            "type": "integer",
+            "description": "The maximum number of snapshots to fetch (oldest first). If not specified or 0, all the available snapshots are fetched."
+        }
+    }
+    __refs__ = set()
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, maxCount=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param integer maxCount: The maximum number of snapshots to fetch (oldest first). If not specified or 0, all the available snapshots are fetched.
+        """
+        self.maxCount = maxCount
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        maxCount = self.maxCount
+        dct = {
+        }
+        if maxCount is not None:
+            dct['maxCount'] = maxCount
+        dct.update(self.kwargs)
+        return dct
+
+
+@register_response('pydevdGetSnapshots')
+@register
+class PydevdGetSnapshotsResponse(BaseSchema):
+    """
+    Response to 'pydevdGetSnapshots' request.
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "seq": {
+            "type": "integer",
+            "description": "Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request."
+        },
+        "type": {
+            "type": "string",
+            "enum": [
+                "response"
+            ]
+        },
+        "request_seq": {
+            "type": "integer",
+            "description": "Sequence number of the corresponding request."
+        },
+        "success": {
+            "type": "boolean",
+            "description": "Outcome of the request.\nIf true, the request was successful and the 'body' attribute may contain the result of the request.\nIf the value is false, the attribute 'message' contains the error in short form and the 'body' may contain additional information (see 'ErrorResponse.body.error')."
+        },
+        "command": {
+            "type": "string",
+            "description": "The command requested."
+        },
+        "message": {
+            "type": "string",
+            "description": "Contains the raw error in short form if 'success' is false.\nThis raw error might be interpreted by the frontend and is not shown in the UI.\nSome predefined values exist.",
+            "_enum": [
+                "cancelled"
+            ],
+            "enumDescriptions": [
+                "request was cancelled."
+            ]
+        },
+        "body": {
+            "type": "object",
+            "properties": {
+                "snapshots": {
+                    "type": "array",
+                    "items": {
+                        "$ref": "#/definitions/PydevdSnapshot"
+                    },
+                    "description": "The snapshots fetched (oldest first)."
+                },
+                "droppedCount": {
+                    "type": "integer",
+                    "description": "The number of snapshots discarded since the last fetch because the snapshots buffer was full."
+                },
+                "remaining": {
+                    "type": "integer",
+                    "description": "The number of snapshots still available to be fetched."
+                }
+            },
+            "required": [
+                "snapshots"
+            ]
+        }
+    }
+    __refs__ = set(['body'])
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, request_seq, success, command, body, seq=-1, message=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param string type: 
+        :param integer request_seq: Sequence number of the corresponding request.
+        :param boolean success: Outcome of the request.
+        If true, the request was successful and the 'body' attribute may contain the result of the request.
+        If the value is false, the attribute 'message' contains the error in short form and the 'body' may contain additional information (see 'ErrorResponse.body.error').
+        :param string command: The command requested.
+        :param PydevdGetSnapshotsResponseBody body: 
+        :param integer seq: Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request.
+        :param string message: Contains the raw error in short form if 'success' is false.
+        This raw error might be interpreted by the frontend and is not shown in the UI.
+        Some predefined values exist.
+        """
+        self.type = 'response'
+        self.request_seq = request_seq
+        self.success = success
+        self.command = command
+        if body is None:
+            self.body = PydevdGetSnapshotsResponseBody()
+        else:
+            self.body = PydevdGetSnapshotsResponseBody(update_ids_from_dap=update_ids_from_dap, **body) if body.__class__ !=  PydevdGetSnapshotsResponseBody else body
+        self.seq = seq
+        self.message = message
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        type = self.type  # noqa (assign to builtin)
+        request_seq = self.request_seq
+        success = self.success
+        command = self.command
+        body = self.body
+        seq = self.seq
+        message = self.message
+        dct = {
+            'type': type,
+            'request_seq': request_seq,
+            'success': success,
+            'command': command,
+            'body': body.to_dict(update_ids_to_dap=update_ids_to_dap),
+            'seq': seq,
+        }
+        if message is not None:
+            dct['message'] = message
+        dct.update(self.kwargs)
+        return dct
+
+
+@register
+class PydevdSnapshot(BaseSchema):
+    """
+    A snapshot captured when a snapshot breakpoint was hit.
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "id": {
+            "type": "integer",
+            "description": "Unique identifier for the snapshot."
+        },
+        "threadId": {
+            "type": "integer",
+            "description": "The thread which hit the breakpoint."
+        },
+        "source": {
+            "description": "The source where the breakpoint was hit.",
+            "type": "Source"
+        },
+        "line": {
+            "type": "integer",
+            "description": "The line where the breakpoint was hit."
+        },
+        "timestamp": {
+            "type": "number",
+            "description": "The time when the snapshot was captured (seconds since the epoch)."
+        },
+        "variables": {
+            "type": "array",
+            "items": {
+                "$ref": "#/definitions/PydevdSnapshotVariable"
+            },
+            "description": "The locals captured."
+        },
+        "stackFrames": {
+            "type": "array",
+            "items": {
+                "$ref": "#/definitions/PydevdSnapshotFrame"
+            },
+            "description": "The stack when the breakpoint was hit (topmost frame first)."
+        }
+    }
+    __refs__ = set(['source'])
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, id, threadId, source, line, timestamp, variables, stackFrames, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param integer id: Unique identifier for the snapshot.
+        :param integer threadId: The thread which hit the breakpoint.
+        :param Source source: The source where the breakpoint was hit.
+        :param integer line: The line where the breakpoint was hit.
+        :param number timestamp: The time when the snapshot was captured (seconds since the epoch).
+        :param array variables: The locals captured.
+        :param array stackFrames: The stack when the breakpoint was hit (topmost frame first).
+        """
+        self.id = id
+        self.threadId = threadId
+        if source is None:
+            self.source = Source()
+        else:
+            self.source = Source(update_ids_from_dap=update_ids_from_dap, **source) if source.__class__ !=  Source else source
+        self.line = line
+        self.timestamp = timestamp
+        self.variables = variables
+        if update_ids_from_dap and self.variables:
+            for o in self.variables:
+                PydevdSnapshotVariable.update_dict_ids_from_dap(o)
+        self.stackFrames = stackFrames
+        if update_ids_from_dap and self.stackFrames:
+            for o in self.stackFrames:
+                PydevdSnapshotFrame.update_dict_ids_from_dap(o)
+        if update_ids_from_dap:
+            self.threadId = self._translate_id_from_dap(self.threadId)
+        self.kwargs = kwargs
+    
+    
+    @classmethod
+    def update_dict_ids_from_dap(cls, dct):
+        if 'threadId' in dct:
+            dct['threadId'] = cls._translate_id_from_dap(dct['threadId'])
+        return dct
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        id = self.id  # noqa (assign to builtin)
+        threadId = self.threadId
+        source = self.source
+        line = self.line
+        timestamp = self.timestamp
+        variables = self.variables
+        if variables and hasattr(variables[0], "to_dict"):
+            variables = [x.to_dict() for x in variables]
+        stackFrames = self.stackFrames
+        if stackFrames and hasattr(stackFrames[0], "to_dict"):
+            stackFrames = [x.to_dict() for x in stackFrames]
+        if update_ids_to_dap:
+            if threadId is not None:
+                threadId = self._translate_id_to_dap(threadId)
+        dct = {
+            'id': id,
+            'threadId': threadId,
+            'source': source.to_dict(update_ids_to_dap=update_ids_to_dap),
+            'line': line,
+            'timestamp': timestamp,
+            'variables': [PydevdSnapshotVariable.update_dict_ids_to_dap(o) for o in variables] if (update_ids_to_dap and variables) else variables,
+            'stackFrames': [PydevdSnapshotFrame.update_dict_ids_to_dap(o) for o in stackFrames] if (update_ids_to_dap and stackFrames) else stackFrames,
+        }
+        dct.update(self.kwargs)
+        return dct    
+    
+    @classmethod
+    def update_dict_ids_to_dap(cls, dct):
+        if 'threadId' in dct:
+            dct['threadId'] = cls._translate_id_to_dap(dct['threadId'])
+        return dct
+
+
+@register
+class PydevdSnapshotVariable(BaseSchema):
+    """
+    A variable captured in a snapshot.
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "name": {
+            "type": "string",
+            "description": "The variable's name."
+        },
+        "value": {
+            "type": "string",
+            "description": "The (possibly truncated) representation of the variable's value."
+        },
+        "type": {
+            "type": "string",
+            "description": "The type of the variable's value."
+        }
+    }
+    __refs__ = set()
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, name, value, type=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param string name: The variable's name.
+        :param string value: The (possibly truncated) representation of the variable's value.
+        :param string type: The type of the variable's value.
+        """
+        self.name = name
+        self.value = value
+        self.type = type
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        name = self.name
+        value = self.value
+        type = self.type  # noqa (assign to builtin)
+        dct = {
+            'name': name,
+            'value': value,
+        }
+        if type is not None:
+            dct['type'] = type
+        dct.update(self.kwargs)
+        return dct
+
+
+@register
+class PydevdSnapshotFrame(BaseSchema):
+    """
+    A stack frame captured in a snapshot.
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "name": {
+            "type": "string",
+            "description": "The name of the frame (i.e.: the function name)."
+        },
+        "source": {
+            "description": "The source of the frame.",
+            "type": "Source"
+        },
+        "line": {
+            "type": "integer",
+            "description": "The line within the source of the frame."
+        }
+    }
+    __refs__ = set(['source'])
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, name, line, source=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param string name: The name of the frame (i.e.: the function name).
+        :param integer line: The line within the source of the frame.
+        :param Source source: The source of the frame.
+        """
+        self.name = name
+        self.line = line
+        if source is None:
+            self.source = Source()
+        else:
+            self.source = Source(update_ids_from_dap=update_ids_from_dap, **source) if source.__class__ !=  Source else source
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        name = self.name
+        line = self.line
+        source = self.source
+        dct = {
+            'name': name,
+            'line': line,
         }
-        if usingCython is not None:
-            dct['usingCython'] = usingCython
-        if usingFrameEval is not None:
-            dct['usingFrameEval'] = usingFrameEval
+        if source is not None:
+            dct['source'] = source.to_dict(update_ids_to_dap=update_ids_to_dap)
         dct.update(self.kwargs)
         return dct
 
 
-@register_request('pydevdAuthorize')
+@register_request('pydevdEvaluateBatch')
 @register
-class PydevdAuthorizeRequest(BaseSchema):
+class PydevdEvaluateBatchRequest(BaseSchema):
     """
-    A request to authorize the ide to start accepting commands.
+    Evaluates a list of expressions in the context of the same stack frame (i.e.: the watches) and
+    provides all the results in a single response (the expressions are evaluated in order and an error
+    in one expression doesn't prevent the others from being evaluated).
 
     Note: automatically generated code. Do not edit manually.
     """
@@ -15045,11 +15792,11 @@ class PydevdAuthorizeRequest(BaseSchema):
         "command": {
             "type": "string",
             "enum": [
-                "pydevdAuthorize"
+                "pydevdEvaluateBatch"
             ]
         },
         "arguments": {
-            "type": "PydevdAuthorizeArguments"
+            "type": "PydevdEvaluateBatchArguments"
         }
     }
     __refs__ = set(['arguments'])
@@ -15060,15 +15807,15 @@ class PydevdAuthorizeRequest(BaseSchema):
         """
         :param string type: 
         :param string command: 
-        :param PydevdAuthorizeArguments arguments: 
+        :param PydevdEvaluateBatchArguments arguments: 
         :param integer seq: Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request.
         """
         self.type = 'request'
-        self.command = 'pydevdAuthorize'
+        self.command = 'pydevdEvaluateBatch'
         if arguments is None:
-            self.arguments = PydevdAuthorizeArguments()
+            self.arguments = PydevdEvaluateBatchArguments()
         else:
-            self.arguments = PydevdAuthorizeArguments(update_ids_from_dap=update_ids_from_dap, **arguments) if arguments.__class__ !=  PydevdAuthorizeArguments else arguments
+            self.arguments = PydevdEvaluateBatchArguments(update_ids_from_dap=update_ids_from_dap, **arguments) if arguments.__class__ !=  PydevdEvaluateBatchArguments else arguments
         self.seq = seq
         self.kwargs = kwargs
 
@@ -15089,46 +15836,104 @@ class PydevdAuthorizeRequest(BaseSchema):
 
 
 @register
-class PydevdAuthorizeArguments(BaseSchema):
+class PydevdEvaluateBatchArguments(BaseSchema):
     """
-    Arguments for 'pydevdAuthorize' request.
+    Arguments for 'pydevdEvaluateBatch' request.
 
     Note: automatically generated code. Do not edit manually.
     """
 
     __props__ = {
-        "debugServerAccessToken": {
+        "expressions": {
+            "type": "array",
+            "items": {
+                "type": "string"
+            },
+            "description": "The expressions to evaluate."
+        },
+        "frameId": {
+            "type": "integer",
+            "description": "Evaluate the expressions in the scope of this stack frame."
+        },
+        "context": {
             "type": "string",
-            "description": "The access token to access the debug server."
+            "_enum": [
+                "watch",
+                "hover"
+            ],
+            "enumDescriptions": [
+                "evaluate is run in a watch.",
+                "evaluate is run from a data hover."
+            ],
+            "description": "The context in which the evaluate requests are run (as in the 'evaluate' request, but statements are never executed). If not specified, 'watch' is used."
+        },
+        "format": {
+            "description": "Specifies details on how to format the results.",
+            "type": "ValueFormat"
         }
     }
-    __refs__ = set()
+    __refs__ = set(['format'])
 
     __slots__ = list(__props__.keys()) + ['kwargs']
 
-    def __init__(self, debugServerAccessToken=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+    def __init__(self, expressions, frameId, context=None, format=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
         """
-        :param string debugServerAccessToken: The access token to access the debug server.
+        :param array expressions: The expressions to evaluate.
+        :param integer frameId: Evaluate the expressions in the scope of this stack frame.
+        :param string context: The context in which the evaluate requests are run (as in the 'evaluate' request, but statements are never executed). If not specified, 'watch' is used.
+        :param ValueFormat format: Specifies details on how to format the results.
         """
-        self.debugServerAccessToken = debugServerAccessToken
+        self.expressions = expressions
+        self.frameId = frameId
+        self.context = context
+        if format is None:
+            self.format = ValueFormat()
+        else:
+            self.format = ValueFormat(update_ids_from_dap=update_ids_from_dap, **format) if format.__class__ !=  ValueFormat else format
+        if update_ids_from_dap:
+            self.frameId = self._translate_id_from_dap(self.frameId)
         self.kwargs = kwargs
-
+    
+    
+    @classmethod
+    def update_dict_ids_from_dap(cls, dct):
+        if 'frameId' in dct:
+            dct['frameId'] = cls._translate_id_from_dap(dct['frameId'])
+        return dct
 
     def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
-        debugServerAccessToken = self.debugServerAccessToken
+        expressions = self.expressions
+        if expressions and hasattr(expressions[0], "to_dict"):
+            expressions = [x.to_dict() for x in expressions]
+        frameId = self.frameId
+        context = self.context
+        format = self.format  # noqa (assign to builtin)
+        if update_ids_to_dap:
+            if frameId is not None:
+                frameId = self._translate_id_to_dap(frameId)
         dct = {
+            'expressions': expressions,
+            'frameId': frameId,
         }
-        if debugServerAccessToken is not None:
-            dct['debugServerAccessToken'] = debugServerAccessToken
+        if context is not None:
+            dct['context'] = context
+        if format is not None:
+            dct['format'] = format.to_dict(update_ids_to_dap=update_ids_to_dap)
         dct.update(self.kwargs)
+        return dct    
+    
+    @classmethod
+    def update_dict_ids_to_dap(cls, dct):
+        if 'frameId' in dct:
+            dct['frameId'] = cls._translate_id_to_dap(dct['frameId'])
         return dct
 
 
-@register_response('pydevdAuthorize')
+@register_response('pydevdEvaluateBatch')
 @register
-class PydevdAuthorizeResponse(BaseSchema):
+class PydevdEvaluateBatchResponse(BaseSchema):
     """
-    Response to 'pydevdAuthorize' request.
+    Response to 'pydevdEvaluateBatch' request.
 
     Note: automatically generated code. Do not edit manually.
     """
@@ -15169,13 +15974,16 @@ class PydevdAuthorizeResponse(BaseSchema):
         "body": {
             "type": "object",
             "properties": {
-                "clientAccessToken": {
-                    "type": "string",
-                    "description": "The access token to access the client (i.e.: usually the IDE)."
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "$ref": "#/definitions/PydevdEvaluateBatchResult"
+                    },
+                    "description": "The results (in the same order of the expressions)."
                 }
             },
             "required": [
-                "clientAccessToken"
+                "results"
             ]
         }
     }
@@ -15191,7 +15999,7 @@ class PydevdAuthorizeResponse(BaseSchema):
         If true, the request was successful and the 'body' attribute may contain the result of the request.
         If the value is false, the attribute 'message' contains the error in short form and the 'body' may contain additional information (see 'ErrorResponse.body.error').
         :param string command: The command requested.
-        :param PydevdAuthorizeResponseBody body: 
+        :param PydevdEvaluateBatchResponseBody body: 
         :param integer seq: Sequence number (also known as message ID). For protocol messages of type 'request' this ID can be used to cancel the request.
         :param string message: Contains the raw error in short form if 'success' is false.
         This raw error might be interpreted by the frontend and is not shown in the UI.
@@ -15202,9 +16010,9 @@ class PydevdAuthorizeResponse(BaseSchema):
         self.success = success
         self.command = command
         if body is None:
-            self.body = PydevdAuthorizeResponseBody()
+            self.body = PydevdEvaluateBatchResponseBody()
         else:
-            self.body = PydevdAuthorizeResponseBody(update_ids_from_dap=update_ids_from_dap, **body) if body.__class__ !=  PydevdAuthorizeResponseBody else body
+            self.body = PydevdEvaluateBatchResponseBody(update_ids_from_dap=update_ids_from_dap, **body) if body.__class__ !=  PydevdEvaluateBatchResponseBody else body
         self.seq = seq
         self.message = message
         self.kwargs = kwargs
@@ -15232,6 +16040,123 @@ class PydevdAuthorizeResponse(BaseSchema):
         return dct
 
 
+@register
+class PydevdEvaluateBatchResult(BaseSchema):
+    """
+    The result of one of the expressions of a 'pydevdEvaluateBatch' request (the same contents of the
+    body of an 'evaluate' response plus whether it succeeded).
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "success": {
+            "type": "boolean",
+            "description": "Whether the expression was successfully evaluated."
+        },
+        "message": {
+            "type": "string",
+            "description": "The error message if the evaluation failed."
+        },
+        "result": {
+            "type": "string",
+            "description": "The result of the evaluation."
+        },
+        "type": {
+            "type": "string",
+            "description": "The optional type of the evaluate result."
+        },
+        "presentationHint": {
+            "description": "Properties of a evaluate result that can be used to determine how to render the result in the UI.",
+            "type": "VariablePresentationHint"
+        },
+        "variablesReference": {
+            "type": "integer",
+            "description": "If variablesReference is > 0, the evaluate result is structured and its children can be retrieved by passing variablesReference to the VariablesRequest."
+        },
+        "namedVariables": {
+            "type": "integer",
+            "description": "The number of named child variables."
+        },
+        "indexedVariables": {
+            "type": "integer",
+            "description": "The number of indexed child variables."
+        }
+    }
+    __refs__ = set(['presentationHint'])
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, success, result, variablesReference, message=None, type=None, presentationHint=None, namedVariables=None, indexedVariables=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param boolean success: Whether the expression was successfully evaluated.
+        :param string result: The result of the evaluation.
+        :param integer variablesReference: If variablesReference is > 0, the evaluate result is structured and its children can be retrieved by passing variablesReference to the VariablesRequest.
+        :param string message: The error message if the evaluation failed.
+        :param string type: The optional type of the evaluate result.
+        :param VariablePresentationHint presentationHint: Properties of a evaluate result that can be used to determine how to render the result in the UI.
+        :param integer namedVariables: The number of named child variables.
+        :param integer indexedVariables: The number of indexed child variables.
+        """
+        self.success = success
+        self.result = result
+        self.variablesReference = variablesReference
+        self.message = message
+        self.type = type
+        if presentationHint is None:
+            self.presentationHint = VariablePresentationHint()
+        else:
+            self.presentationHint = VariablePresentationHint(update_ids_from_dap=update_ids_from_dap, **presentationHint) if presentationHint.__class__ !=  VariablePresentationHint else presentationHint
+        self.namedVariables = namedVariables
+        self.indexedVariables = indexedVariables
+        if update_ids_from_dap:
+            self.variablesReference = self._translate_id_from_dap(self.variablesReference)
+        self.kwargs = kwargs
+    
+    
+    @classmethod
+    def update_dict_ids_from_dap(cls, dct):
+        if 'variablesReference' in dct:
+            dct['variablesReference'] = cls._translate_id_from_dap(dct['variablesReference'])
+        return dct
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        success = self.success
+        result = self.result
+        variablesReference = self.variablesReference
+        message = self.message
+        type = self.type  # noqa (assign to builtin)
+        presentationHint = self.presentationHint
+        namedVariables = self.namedVariables
+        indexedVariables = self.indexedVariables
+        if update_ids_to_dap:
+            if variablesReference is not None:
+                variablesReference = self._translate_id_to_dap(variablesReference)
+        dct = {
+            'success': success,
+            'result': result,
+            'variablesReference': variablesReference,
+        }
+        if message is not None:
+            dct['message'] = message
+        if type is not None:
+            dct['type'] = type
+        if presentationHint is not None:
+            dct['presentationHint'] = presentationHint.to_dict(update_ids_to_dap=update_ids_to_dap)
+        if namedVariables is not None:
+            dct['namedVariables'] = namedVariables
+        if indexedVariables is not None:
+            dct['indexedVariables'] = indexedVariables
+        dct.update(self.kwargs)
+        return dct    
+    
+    @classmethod
+    def update_dict_ids_to_dap(cls, dct):
+        if 'variablesReference' in dct:
+            dct['variablesReference'] = cls._translate_id_to_dap(dct['variablesReference'])
+        return dct
+
+
 @register
 class ErrorResponseBody(BaseSchema):
     """
@@ -17379,3 +18304,107 @@ class PydevdAuthorizeResponseBody(BaseSchema):
         }
         dct.update(self.kwargs)
         return dct
+
+
+@register
+class PydevdGetSnapshotsResponseBody(BaseSchema):
+    """
+    "body" of PydevdGetSnapshotsResponse
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "snapshots": {
+            "type": "array",
+            "items": {
+                "$ref": "#/definitions/PydevdSnapshot"
+            },
+            "description": "The snapshots fetched (oldest first)."
+        },
+        "droppedCount": {
+            "type": "integer",
+            "description": "The number of snapshots discarded since the last fetch because the snapshots buffer was full."
+        },
+        "remaining": {
+            "type": "integer",
+            "description": "The number of snapshots still available to be fetched."
+        }
+    }
+    __refs__ = set()
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, snapshots, droppedCount=None, remaining=None, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param array snapshots: The snapshots fetched (oldest first).
+        :param integer droppedCount: The number of snapshots discarded since the last fetch because the snapshots buffer was full.
+        :param integer remaining: The number of snapshots still available to be fetched.
+        """
+        self.snapshots = snapshots
+        if update_ids_from_dap and self.snapshots:
+            for o in self.snapshots:
+                PydevdSnapshot.update_dict_ids_from_dap(o)
+        self.droppedCount = droppedCount
+        self.remaining = remaining
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        snapshots = self.snapshots
+        if snapshots and hasattr(snapshots[0], "to_dict"):
+            snapshots = [x.to_dict() for x in snapshots]
+        droppedCount = self.droppedCount
+        remaining = self.remaining
+        dct = {
+            'snapshots': [PydevdSnapshot.update_dict_ids_to_dap(o) for o in snapshots] if (update_ids_to_dap and snapshots) else snapshots,
+        }
+        if droppedCount is not None:
+            dct['droppedCount'] = droppedCount
+        if remaining is not None:
+            dct['remaining'] = remaining
+        dct.update(self.kwargs)
+        return dct
+
+
+@register
+class PydevdEvaluateBatchResponseBody(BaseSchema):
+    """
+    "body" of PydevdEvaluateBatchResponse
+
+    Note: automatically generated code. Do not edit manually.
+    """
+
+    __props__ = {
+        "results": {
+            "type": "array",
+            "items": {
+                "$ref": "#/definitions/PydevdEvaluateBatchResult"
+            },
+            "description": "The results (in the same order of the expressions)."
+        }
+    }
+    __refs__ = set()
+
+    __slots__ = list(__props__.keys()) + ['kwargs']
+
+    def __init__(self, results, update_ids_from_dap=False, **kwargs):  # noqa (update_ids_from_dap may be unused)
+        """
+        :param array results: The results (in the same order of the expressions).
+        """
+        self.results = results
+        if update_ids_from_dap and self.results:
+            for o in self.results:
+                PydevdEvaluateBatchResult.update_dict_ids_from_dap(o)
+        self.kwargs = kwargs
+
+
+    def to_dict(self, update_ids_to_dap=False):  # noqa (update_ids_to_dap may be unused)
+        results = self.results
+        if results and hasattr(results[0], "to_dict"):
+            results = [x.to_dict() for x in results]
+        dct = {
+            'results': [PydevdEvaluateBatchResult.update_dict_ids_to_dap(o) for o in results] if (update_ids_to_dap and results) else results,
+        }
+        dct.update(self.kwargs)
+        return dct
@@ -8,7 +8,7 @@ from _pydev_bundle import pydev_log
 from _pydevd_bundle.pydevd_frame import PyDBFrame
 # ENDIF
 
-version = 11
+version = 12
 
 if USE_CUSTOM_SYS_CURRENT_FRAMES:
 
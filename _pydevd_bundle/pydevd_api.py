@@ -10,7 +10,8 @@ from _pydevd_bundle.pydevd_comm import (InternalGetThreadStack, internal_get_com
     InternalGetVariable, InternalGetArray, InternalLoadFullValue,
     internal_get_description, internal_get_frame, internal_evaluate_expression, InternalConsoleExec,
     internal_get_variable_json, internal_change_variable, internal_change_variable_json,
-    internal_evaluate_expression_json, internal_set_expression_json, internal_get_exception_details_json,
+    internal_evaluate_expression_json, internal_evaluate_batch_json, internal_set_expression_json,
+    internal_get_exception_details_json,
     internal_step_in_thread, internal_run_thread, run_as_pydevd_daemon_thread)
 from _pydevd_bundle.pydevd_comm_constants import (CMD_THREAD_SUSPEND, file_system_encoding,
     CMD_STEP_INTO_MY_CODE, CMD_STOP_ON_START)
@@ -252,8 +253,8 @@ class PyDevdAPI(object):
         int_cmd = InternalGetVariable(seq, thread_id, frame_id, scope, attrs)
         py_db.post_internal_command(int_cmd, thread_id)
 
-    def request_get_array(self, py_db, seq, roffset, coffset, rows, cols, fmt, thread_id, frame_id, scope, attrs):
-        int_cmd = InternalGetArray(seq, roffset, coffset, rows, cols, fmt, thread_id, frame_id, scope, attrs)
+    def request_get_array(self, py_db, seq, roffset, coffset, rows, cols, fmt, thread_id, frame_id, scope, attrs, binary=False):
+        int_cmd = InternalGetArray(seq, roffset, coffset, rows, cols, fmt, thread_id, frame_id, scope, attrs, binary)
         py_db.post_internal_command(int_cmd, thread_id)
 
     def request_load_full_value(self, py_db, seq, thread_id, frame_id, vars):
@@ -332,7 +333,8 @@ class PyDevdAPI(object):
 
     def add_breakpoint(
             self, py_db, filename, breakpoint_type, breakpoint_id, line, condition, func_name,
-            expression, suspend_policy, hit_condition, is_logpoint, adjust_line=False):
+            expression, suspend_policy, hit_condition, is_logpoint, is_snapshot=False, snapshot_locals=None,
+            adjust_line=False):
         '''
         :param str filename:
             Note: must be sent as it was received in the protocol. It may be translated in this
@@ -370,6 +372,15 @@ class PyDevdAPI(object):
             If True and an expression is passed, pydevd will create an io message command with the
             result of the evaluation.
 
+        :param bool is_snapshot:
+            If True the breakpoint will never suspend. Instead, when hit, a snapshot with the
+            locals and the stack is captured (to be fetched later on by the client).
+            Note: only available for 'python-line' breakpoints.
+
+        :param list(str) snapshot_locals:
+            If given, only these locals are captured in the snapshot (otherwise all the locals
+            are captured).
+
         :return _AddBreakpointResult:
         '''
         assert filename.__class__ == str, 'Expected str, found: %s' % (filename.__class__,)  # i.e.: bytes on py2 and str on py3
@@ -378,7 +389,7 @@ class PyDevdAPI(object):
         pydev_log.debug('Request for breakpoint in: %s line: %s', original_filename, line)
         # Parameters to reapply breakpoint.
         api_add_breakpoint_params = (filename, breakpoint_type, breakpoint_id, line, condition, func_name,
-            expression, suspend_policy, hit_condition, is_logpoint)
+            expression, suspend_policy, hit_condition, is_logpoint, is_snapshot, snapshot_locals)
 
         filename = self.filename_to_server(filename)  # Apply user path mapping.
         func_name = self.to_str(func_name)
@@ -442,7 +453,9 @@ class PyDevdAPI(object):
                 result.error_code = self.ADD_BREAKPOINT_FILE_EXCLUDED_BY_FILTERS
 
         if breakpoint_type == 'python-line':
-            added_breakpoint = LineBreakpoint(line, condition, func_name, expression, suspend_policy, hit_condition=hit_condition, is_logpoint=is_logpoint)
+            added_breakpoint = LineBreakpoint(
+                line, condition, func_name, expression, suspend_policy, hit_condition=hit_condition,
+                is_logpoint=is_logpoint, is_snapshot=is_snapshot, snapshot_locals=snapshot_locals)
             breakpoints = py_db.breakpoints
             file_to_id_to_breakpoint = py_db.file_to_id_to_line_breakpoint
             supported_type = True
@@ -475,7 +488,11 @@ class PyDevdAPI(object):
         if py_db.plugin is not None:
             py_db.has_plugin_line_breaks = py_db.plugin.has_line_breaks()
 
-        py_db.on_breakpoints_changed()
+        if breakpoints is py_db.breakpoints:
+            # Only the contexts from this file need to be re-evaluated.
+            py_db.on_breakpoints_changed(filename=filename)
+        else:
+            py_db.on_breakpoints_changed()
         return result
 
     def reapply_breakpoints(self, py_db):
@@ -560,6 +577,7 @@ class PyDevdAPI(object):
                 'Did not find breakpoint to remove: %s (breakpoint id: %s)', filename, breakpoint_id)
 
         file_to_id_to_breakpoint = None
+        changed_filename = None
         filename = self.filename_to_server(filename)
 
         if breakpoint_type == 'python-line':
@@ -587,12 +605,14 @@ class PyDevdAPI(object):
                 py_db.consolidate_breakpoints(filename, id_to_pybreakpoint, breakpoints)
                 if py_db.plugin is not None:
                     py_db.has_plugin_line_breaks = py_db.plugin.has_line_breaks()
+                if breakpoints is py_db.breakpoints:
+                    changed_filename = filename
 
             except KeyError:
                 pydev_log.info("Error removing breakpoint: Breakpoint id not found: %s id: %s. Available ids: %s\n",
                     filename, breakpoint_id, dict_keys(id_to_pybreakpoint))
 
-        py_db.on_breakpoints_changed(removed=True)
+        py_db.on_breakpoints_changed(removed=True, filename=changed_filename)
 
     def request_exec_or_evaluate(
             self, py_db, seq, thread_id, frame_id, expression, is_exec, trim_if_too_big, attr_to_set_result):
@@ -605,6 +625,10 @@ class PyDevdAPI(object):
         py_db.post_method_as_internal_command(
             thread_id, internal_evaluate_expression_json, request, thread_id)
 
+    def request_evaluate_batch_json(self, py_db, request, thread_id):
+        py_db.post_method_as_internal_command(
+            thread_id, internal_evaluate_batch_json, request, thread_id)
+
     def request_set_expression_json(self, py_db, request, thread_id):
         py_db.post_method_as_internal_command(
             thread_id, internal_set_expression_json, request, thread_id)
@@ -1,8 +1,75 @@
+import types
+
 from _pydevd_bundle.pydevd_constants import dict_iter_values, IS_PY24
 from _pydev_bundle import pydev_log
 from _pydevd_bundle import pydevd_import_class
 from _pydevd_bundle.pydevd_frame_utils import add_exception_to_frame
 from _pydev_imps._pydev_saved_modules import threading
+from _pydevd_bundle.pydevd_vars import compile_expression
+
+# Name of the variable which holds the hit count when evaluating a hit condition
+# (the '@HIT@' in the hit condition is replaced by this name before compiling it).
+HIT_COUNT_VAR_NAME = '__pydevd_hit_count__'
+
+
+def compile_breakpoint_expression(expression):
+    '''
+    :param str expression:
+        The expression (condition, hit condition or logpoint expression) to be compiled.
+
+    :return code|NoneType:
+        The code object to be evaluated or None if the expression couldn't be compiled (in which
+        case the source should be evaluated so that the related error is properly reported).
+    '''
+    if not expression:
+        return None
+    try:
+        return compile_expression(expression, 'eval')
+    except:
+        return None
+
+
+def compile_hit_condition(hit_condition):
+    '''
+    :param str hit_condition:
+        The hit condition (where '@HIT@' is the hit count) to be compiled.
+
+    :return code|NoneType:
+        The code object to be evaluated with _HitCountLocals or None if the hit condition
+        couldn't be compiled or if the hit count can't be provided as a variable (in which case
+        '@HIT@' should be replaced by the hit count in the source which is then evaluated).
+    '''
+    if not hit_condition:
+        return None
+    if '@HIT@' not in hit_condition:
+        return compile_breakpoint_expression(hit_condition)
+
+    code = compile_breakpoint_expression(hit_condition.replace('@HIT@', HIT_COUNT_VAR_NAME))
+    if code is not None:
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                # In a nested scope (i.e.: lambda, generator expression or comprehension) the
+                # hit count would be looked up as a global (which _HitCountLocals can't provide).
+                return None
+    return code
+
+
+class _HitCountLocals(object):
+    '''
+    Mapping used as the locals when evaluating a hit condition (provides the hit count
+    along with the frame locals without copying them).
+    '''
+
+    __slots__ = ['_f_locals', '_hit_count']
+
+    def __init__(self, f_locals, hit_count):
+        self._f_locals = f_locals
+        self._hit_count = hit_count
+
+    def __getitem__(self, key):
+        if key == HIT_COUNT_VAR_NAME:
+            return self._hit_count
+        return self._f_locals[key]
 
 
 class ExceptionBreakpoint(object):
@@ -26,6 +93,8 @@ class ExceptionBreakpoint(object):
 
         self.condition = condition
         self.expression = expression
+        self.condition_code = compile_breakpoint_expression(condition)
+        self.expression_code = compile_breakpoint_expression(expression)
         self.notify_on_unhandled_exceptions = notify_on_unhandled_exceptions
         self.notify_on_handled_exceptions = notify_on_handled_exceptions
         self.notify_on_first_raise_only = notify_on_first_raise_only
@@ -46,17 +115,25 @@ class ExceptionBreakpoint(object):
 
 class LineBreakpoint(object):
 
-    def __init__(self, line, condition, func_name, expression, suspend_policy="NONE", hit_condition=None, is_logpoint=False):
+    def __init__(self, line, condition, func_name, expression, suspend_policy="NONE", hit_condition=None, is_logpoint=False, is_snapshot=False, snapshot_locals=None):
         self.line = line
         self.condition = condition
         self.func_name = func_name
         self.expression = expression
         self.suspend_policy = suspend_policy
         self.hit_condition = hit_condition
+        self.condition_code = compile_breakpoint_expression(condition)
+        self.expression_code = compile_breakpoint_expression(expression)
+        self.hit_condition_code = compile_hit_condition(hit_condition)
         self._hit_count = 0
         self._hit_condition_lock = threading.Lock()
         self.is_logpoint = is_logpoint
 
+        # A snapshot breakpoint never suspends: it captures the locals (just the ones in
+        # `snapshot_locals` if given) and the stack when hit.
+        self.is_snapshot = is_snapshot
+        self.snapshot_locals = snapshot_locals
+
     @property
     def has_condition(self):
         return bool(self.condition) or bool(self.hit_condition)
@@ -67,9 +144,15 @@ class LineBreakpoint(object):
         ret = False
         with self._hit_condition_lock:
             self._hit_count += 1
-            expr = self.hit_condition.replace('@HIT@', str(self._hit_count))
             try:
-                ret = bool(eval(expr, frame.f_globals, frame.f_locals))
+                hit_condition_code = self.hit_condition_code
+                if hit_condition_code is None:
+                    # Unable to compile it to be evaluated with _HitCountLocals: evaluate the
+                    # source (if it's invalid the error is handled below).
+                    expr = self.hit_condition.replace('@HIT@', str(self._hit_count))
+                    ret = bool(eval(expr, frame.f_globals, frame.f_locals))
+                else:
+                    ret = bool(eval(hit_condition_code, frame.f_globals, _HitCountLocals(frame.f_locals, self._hit_count)))
             except Exception:
                 ret = False
         return ret
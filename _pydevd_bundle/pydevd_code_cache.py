@@ -0,0 +1,117 @@
+'''
+Cache for the code objects compiled from the expressions evaluated in the debugger (i.e.:
+evaluate requests -- watches, hovers, repl --, conditional breakpoints, logpoints and the debug
+console).
+
+Clients usually evaluate the same expressions over and over (i.e.: the watches are evaluated at
+each stop/step), so, the code compiled for an expression is kept in a bounded LRU cache.
+'''
+from collections import OrderedDict
+import copy
+
+from _pydev_imps._pydev_saved_modules import threading
+
+
+# The errors raised by `compile` for a given source (which is why they can be cached: compiling
+# the same source again would just raise the same error). Any other error (i.e.: a RecursionError
+# or MemoryError) may not happen again, so, it's not cached.
+_CACHED_COMPILE_ERRORS = (SyntaxError, OverflowError, ValueError)
+
+
+class _CompileError(object):
+    '''
+    Kept in the cache when an expression couldn't be compiled (so that it doesn't need to be
+    compiled again just to get the same error -- i.e.: an `eval` which falls back to an `exec`).
+    '''
+
+    __slots__ = ['exc']
+
+    def __init__(self, exc):
+        self.exc = exc
+
+    def create_exception(self):
+        # A copy is raised each time (re-raising the same instance would keep on appending to
+        # its traceback -- note that the copy keeps the attributes of the exception, such as the
+        # `lineno` of a SyntaxError).
+        return copy.copy(self.exc)
+
+
+class CompiledCodeCache(object):
+    '''
+    Bounded LRU cache of compiled code objects (thread-safe).
+
+    The key must contain everything which affects the code compiled (i.e.: the expression, the
+    compile mode and any other flags used to compile it).
+    '''
+
+    def __init__(self, max_size=500):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_code(self, key, compile_code):
+        '''
+        :param tuple key:
+            The key for the code in the cache.
+
+        :param callable compile_code:
+            Callable with no arguments which compiles the code if it's not in the cache.
+
+        :return code:
+            The code compiled (note that if it couldn't be compiled due to an error in the source
+            the same exception raised when it was compiled is raised again).
+        '''
+        with self._lock:
+            code = self._cache.pop(key, None)
+            if code is not None:
+                # Re-added so that it becomes the most recently used.
+                self._cache[key] = code
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if code is None:
+            try:
+                code = compile_code()
+            except _CACHED_COMPILE_ERRORS as e:
+                code = _CompileError(e)
+
+            with self._lock:
+                self._cache[key] = code
+                while len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+                    self.evictions += 1
+
+        if code.__class__ is _CompileError:
+            raise code.create_exception()
+        return code
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def to_dict(self):
+        with self._lock:
+            hits = self.hits
+            misses = self.misses
+            return {
+                'size': len(self._cache),
+                'hits': hits,
+                'misses': misses,
+                'evictions': self.evictions,
+                'hit_rate': (float(hits) / (hits + misses)) if hits + misses else 0.0,
+            }
+
+    def __str__(self):
+        return 'CompiledCodeCache(%s)' % (', '.join('%s=%s' % item for item in sorted(self.to_dict().items())),)
+
+
+# The cache shared by all the places which compile the expressions from the client.
+_compiled_code_cache = CompiledCodeCache()
+
+
+def get_compiled_code_cache():
+    return _compiled_code_cache
@@ -63,25 +63,31 @@ each command has a format:
     * PYDB - pydevd, the python end
 '''
 
+from collections import deque
+import errno
 import itertools
 import linecache
 import os
+import stat
 
 from _pydev_bundle.pydev_imports import _queue
 from _pydev_imps._pydev_saved_modules import time
 from _pydev_imps._pydev_saved_modules import threading
+from _pydev_imps._pydev_saved_modules import thread
 from _pydev_imps._pydev_saved_modules import socket as socket_module
 from _pydevd_bundle.pydevd_constants import (DebugInfoHolder, get_thread_id, IS_WINDOWS, IS_JYTHON,
     IS_PY2, IS_PY36_OR_GREATER, STATE_RUN, dict_keys, ASYNC_EVAL_TIMEOUT_SEC,
-    get_global_debugger, GetGlobalDebugger, set_global_debugger)  # Keep for backward compatibility @UnusedImport
+    get_global_debugger, GetGlobalDebugger, set_global_debugger,  # Keep for backward compatibility @UnusedImport
+    UNIX_SOCKET_ENDPOINT_PREFIX, INHERITED_FD_ENDPOINT_PREFIX, is_unix_socket_endpoint, is_inherited_fd_endpoint)
 from _pydev_bundle.pydev_override import overrides
 import weakref
 from _pydev_bundle._pydev_completer import extract_token_and_qualifier
 from _pydevd_bundle._debug_adapter.pydevd_schema import VariablesResponseBody, \
     SetVariableResponseBody
 from _pydevd_bundle._debug_adapter import pydevd_base_schema, pydevd_schema
-from _pydevd_bundle.pydevd_net_command import NetCommand
+from _pydevd_bundle.pydevd_net_command import NetCommand, send_buffers
 from _pydevd_bundle.pydevd_xml import ExceptionOnEvaluate
+from _pydevd_bundle.pydevd_suspended_frames import create_safe_repr
 from _pydevd_bundle.pydevd_constants import ForkSafeLock, NULL
 try:
     from urllib import quote_plus, unquote_plus
@@ -205,6 +211,110 @@ def run_as_pydevd_daemon_thread(py_db, func, *args, **kwargs):
     return t
 
 
+class SocketReader(object):
+    '''
+    Reads lines and messages from a socket.
+
+    The contents are received with `recv_into` in a bytearray (which grows as needed to fit a
+    whole message) and lines/messages are gotten through a memoryview, so, contents received
+    aren't copied around as the messages are consumed.
+    '''
+
+    # The minimum number of bytes requested at each recv.
+    READ_SIZE = 64 * 1024
+
+    # If the buffer grows over this size (to fit a big message) it's released when emptied.
+    MAX_KEPT_BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._set_buffer(bytearray(self.READ_SIZE))
+
+        # The contents received and not consumed are in self._buffer[self._start:self._end].
+        self._start = 0
+        self._end = 0
+
+        # Position until which we already know there's no new line.
+        self._line_search_pos = 0
+
+    def _set_buffer(self, buf):
+        self._buffer = buf
+        self._view = memoryview(buf)
+
+    def _recv(self, min_size):
+        '''
+        Receives more contents (making sure that there's room for at least `min_size` bytes).
+
+        :return bool:
+            False if the socket was closed and True otherwise.
+        '''
+        start = self._start
+        end = self._end
+        if start == end and start != 0:
+            # Everything was consumed: start from the beginning of the buffer.
+            start = end = self._line_search_pos = 0
+            if len(self._buffer) > self.MAX_KEPT_BUFFER_SIZE:
+                self._set_buffer(bytearray(self.READ_SIZE))
+
+        needed = max(min_size, self.READ_SIZE)
+        if len(self._buffer) - end < needed:
+            # Not enough room: move what's still pending to a new buffer (which is grown as
+            # needed). Note that only the pending contents are copied.
+            pending = end - start
+            new_buffer = bytearray(max(len(self._buffer), pending + needed))
+            new_buffer[:pending] = self._view[start:end]
+            self._set_buffer(new_buffer)
+            self._line_search_pos -= start
+            start = 0
+            end = pending
+
+        self._start = start
+        self._end = end
+        try:
+            received = self.sock.recv_into(self._view[end:])
+        except OSError:
+            return False
+        if not received:
+            return False
+        self._end = end + received
+        return True
+
+    def read(self, size):
+        '''
+        :return bytes:
+            The next `size` bytes (or an empty bytes if the socket was closed).
+        '''
+        start = self._start
+        while self._end - start < size:
+            if not self._recv(size - (self._end - start)):
+                return b''
+            start = self._start
+
+        end = start + size
+        self._start = end
+        return self._view[start:end].tobytes()
+
+    def read_line(self):
+        '''
+        :return bytes:
+            The next line, including the new line (or an empty bytes if the socket was closed).
+        '''
+        while True:
+            start = self._start
+            search_pos = self._line_search_pos
+            if search_pos < start:
+                search_pos = start
+            i = self._buffer.find(b'\n', search_pos, self._end)
+            if i != -1:
+                i += 1  # Add the newline to the return
+                self._start = i
+                return self._view[start:i].tobytes()
+
+            self._line_search_pos = self._end
+            if not self._recv(1):
+                return b''
+
+
 class ReaderThread(PyDBDaemonThread):
     ''' reader thread reads and dispatches commands in an infinite loop '''
 
@@ -214,13 +324,14 @@ class ReaderThread(PyDBDaemonThread):
         self.__terminate_on_socket_close = terminate_on_socket_close
 
         self.sock = sock
-        self._buffer = b''
+        self._socket_reader = SocketReader(sock)
         self.setName("pydevd.Reader")
         self.process_net_command = process_net_command
         self.process_net_command_json = PyDevJsonCommandProcessor(self._from_json).process_net_command_json
 
     def _from_json(self, json_msg, update_ids_from_dap=False):
-        return pydevd_base_schema.from_json(json_msg, update_ids_from_dap, on_dict_loaded=self._on_dict_loaded)
+        return pydevd_base_schema.from_json(
+            json_msg, update_ids_from_dap, on_dict_loaded=self._on_dict_loaded, lazy_requests=True)
 
     def _on_dict_loaded(self, dct):
         for listener in self.py_db.dap_messages_listeners:
@@ -249,42 +360,10 @@ class ReaderThread(PyDBDaemonThread):
         #    pass
 
     def _read(self, size):
-        while True:
-            buffer_len = len(self._buffer)
-            if buffer_len == size:
-                ret = self._buffer
-                self._buffer = b''
-                return ret
-
-            if buffer_len > size:
-                ret = self._buffer[:size]
-                self._buffer = self._buffer[size:]
-                return ret
-
-            try:
-                r = self.sock.recv(max(size - buffer_len, 1024))
-            except OSError:
-                return b''
-            if not r:
-                return b''
-            self._buffer += r
+        return self._socket_reader.read(size)
 
     def _read_line(self):
-        while True:
-            i = self._buffer.find(b'\n')
-            if i != -1:
-                i += 1  # Add the newline to the return
-                ret = self._buffer[:i]
-                self._buffer = self._buffer[i:]
-                return ret
-            else:
-                try:
-                    r = self.sock.recv(1024)
-                except OSError:
-                    return b''
-                if not r:
-                    return b''
-                self._buffer += r
+        return self._socket_reader.read_line()
 
     @overrides(PyDBDaemonThread._on_run)
     def _on_run(self):
@@ -381,24 +460,209 @@ class ReaderThread(PyDBDaemonThread):
         self.process_net_command(self.py_db, cmd_id, seq, text)
 
 
+class _FlushStats(object):
+    '''
+    Metrics on the flushes done by the WriterThread.
+
+    The latency of a command is the time from the moment it's added to the writer until it's
+    written to the socket.
+    '''
+
+    def __init__(self):
+        self.flushes = 0
+        self.commands = 0
+        self.bytes = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def on_flush(self, add_times, bytes_sent, flush_time):
+        self.flushes += 1
+        self.commands += len(add_times)
+        self.bytes += bytes_sent
+        for add_time in add_times:
+            latency = flush_time - add_time
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+    def to_dict(self):
+        return {
+            'flushes': self.flushes,
+            'commands': self.commands,
+            'bytes': self.bytes,
+            'avg_latency': (self.total_latency / self.commands) if self.commands else 0.0,
+            'max_latency': self.max_latency,
+        }
+
+    def __str__(self):
+        return 'FlushStats(%s)' % (', '.join('%s=%s' % item for item in sorted(self.to_dict().items())),)
+
+
+# Priority lanes of the commands written by the WriterThread: the commands in a lower lane are
+# always written before the ones in a higher lane (and the order is kept inside a lane).
+WRITER_LANE_CONTROL = 0  # Responses and any other command not explicitly mapped to a lane.
+WRITER_LANE_THREAD_EVENTS = 1  # Stopped/continued and thread create/exit events.
+WRITER_LANE_MODULE_EVENTS = 2
+WRITER_LANE_OUTPUT = 3
+
+_CMD_ID_TO_WRITER_LANE = {
+    CMD_THREAD_CREATE: WRITER_LANE_THREAD_EVENTS,
+    CMD_THREAD_KILL: WRITER_LANE_THREAD_EVENTS,
+    CMD_THREAD_SUSPEND: WRITER_LANE_THREAD_EVENTS,
+    CMD_THREAD_RUN: WRITER_LANE_THREAD_EVENTS,
+    CMD_THREAD_SUSPEND_SINGLE_NOTIFICATION: WRITER_LANE_THREAD_EVENTS,
+    CMD_THREAD_RESUME_SINGLE_NOTIFICATION: WRITER_LANE_THREAD_EVENTS,
+
+    CMD_MODULE_EVENT: WRITER_LANE_MODULE_EVENTS,
+
+    CMD_WRITE_TO_CONSOLE: WRITER_LANE_OUTPUT,
+
+    # The exit must be the last command written (so, it goes to the last lane, after any
+    # pending output).
+    CMD_EXIT: WRITER_LANE_OUTPUT,
+}
+
+
+class _PriorityCommandsQueue(object):
+    '''
+    A queue with a FIFO for each priority lane (`get` always returns the oldest item from the
+    lowest non-empty lane).
+
+    Items added by the same thread are never reordered: when a thread adds an item to a lane
+    while it still has items pending in a lower priority lane (i.e.: a lane with a higher
+    number), those items are promoted to that lane before the new item (so, for instance, the
+    output printed while evaluating some expression is still written before the evaluate
+    response, whereas the output printed by other threads is written after it).
+
+    Provides the same API of `Queue` used by the WriterThread (but `put` also receives the lane).
+    '''
+
+    def __init__(self, lanes_count):
+        self._condition = threading.Condition()
+
+        # Each lane has [thread ident, item, lane] entries. When an entry is promoted to another
+        # lane its lane is updated and the entry left in the previous lane is just skipped
+        # in `get` (so, no lane needs to be scanned to promote the entries of a thread).
+        self._lanes = tuple(deque() for _i in range(lanes_count))
+        self._lane_sizes = [0] * lanes_count
+        self._size = 0
+
+        # thread ident -> tuple(deque with the entries of the thread pending in each lane)
+        self._thread_ident_to_pending = {}
+
+    def put(self, item, lane):
+        ident = thread.get_ident()
+        with self._condition:
+            pending = self._thread_ident_to_pending.get(ident)
+            if pending is None:
+                pending = self._thread_ident_to_pending[ident] = tuple(deque() for _i in self._lanes)
+            else:
+                self._promote(pending, lane)
+
+            entry = [ident, item, lane]
+            self._lanes[lane].append(entry)
+            pending[lane].append(entry)
+            self._lane_sizes[lane] += 1
+            self._size += 1
+            self._condition.notify()
+
+    def _promote(self, pending, lane):
+        # Note: after a thread adds an item to a lane it has no items pending in the lanes after
+        # it, so, the entries of a thread in a lane are always older than the ones in the lanes
+        # after it (and promoting from each lane in order keeps the order of the thread).
+        lane_entries = self._lanes[lane]
+        thread_lane_entries = pending[lane]
+        for i in range(lane + 1, len(self._lanes)):
+            promoted = pending[i]
+            if promoted:
+                for entry in promoted:
+                    entry[2] = lane
+                lane_entries.extend(promoted)
+                thread_lane_entries.extend(promoted)
+
+                self._lane_sizes[lane] += len(promoted)
+                self._lane_sizes[i] -= len(promoted)
+                promoted.clear()
+                if not self._lane_sizes[i]:
+                    # Only promoted entries are left there.
+                    self._lanes[i].clear()
+
+    def get(self, block=True, timeout=None):
+        with self._condition:
+            if not self._size:
+                if block:
+                    self._condition.wait(timeout)
+                if not self._size:
+                    raise _queue.Empty()
+
+            for i, lane_entries in enumerate(self._lanes):
+                if self._lane_sizes[i]:
+                    entry = lane_entries.popleft()
+                    while entry[2] != i:  # Skip the entries promoted to another lane.
+                        entry = lane_entries.popleft()
+
+                    ident, item, _lane = entry
+                    entry[1] = None  # Don't keep the item alive in a promoted entry.
+                    self._lane_sizes[i] -= 1
+                    if not self._lane_sizes[i]:
+                        lane_entries.clear()
+                    self._size -= 1
+
+                    pending = self._thread_ident_to_pending[ident]
+                    pending[i].popleft()
+                    if not any(pending):
+                        del self._thread_ident_to_pending[ident]
+                    return item
+
+    def get_nowait(self):
+        return self.get(False)
+
+    def qsize(self, lane=None):
+        if lane is None:
+            return self._size
+        return self._lane_sizes[lane]
+
+    def empty(self):
+        return self._size == 0
+
+
 class WriterThread(PyDBDaemonThread):
     ''' writer thread writes out the commands in an infinite loop '''
 
+    # All the commands pending are written at once, limited by the number of commands and the
+    # total size of the batch.
+    MAX_BATCH_COMMANDS = 500
+    MAX_BATCH_SIZE = 512 * 1024
+
     def __init__(self, sock, py_db, terminate_on_socket_close=True):
         PyDBDaemonThread.__init__(self, py_db)
         self.sock = sock
         self.__terminate_on_socket_close = terminate_on_socket_close
         self.setName("pydevd.Writer")
-        self._cmd_queue = _queue.Queue()
+        self._cmd_queue = _PriorityCommandsQueue(WRITER_LANE_OUTPUT + 1)
+        self._flush_stats = _FlushStats()
+        self._time = time.time  # Keep a reference as module globals may be None on interpreter shutdown.
         if pydevd_vm_type.get_vm_type() == 'python':
             self.timeout = 0
         else:
             self.timeout = 0.1
 
     def add_command(self, cmd):
-        ''' cmd is NetCommand '''
+        '''
+        cmd is NetCommand (commands are written in the order they're added, but responses
+        are written before events, events before module events and those before output --
+        see: `_CMD_ID_TO_WRITER_LANE`).
+        '''
         if not self._kill_received:  # we don't take new data after everybody die
-            self._cmd_queue.put(cmd, False)
+            self._cmd_queue.put((cmd, self._time()), _CMD_ID_TO_WRITER_LANE.get(cmd.id, WRITER_LANE_CONTROL))
+
+    def get_flush_stats(self):
+        '''
+        :return dict:
+            The number of flushes, commands and bytes written and the average/max latency
+            (in seconds) of the commands written.
+        '''
+        return self._flush_stats.to_dict()
 
     @overrides(PyDBDaemonThread._on_run)
     def _on_run(self):
@@ -408,7 +672,7 @@ class WriterThread(PyDBDaemonThread):
             while True:
                 try:
                     try:
-                        cmd = self._cmd_queue.get(True, 0.1)
+                        cmd, add_time = self._cmd_queue.get(True, 0.1)
                     except _queue.Empty:
                         if self._kill_received:
                             pydev_log.debug('WriterThread: kill_received (sock.shutdown(SHUT_WR))')
@@ -435,18 +699,51 @@ class WriterThread(PyDBDaemonThread):
                     # but the thread was still not liberated
                     return
 
-                if cmd.as_dict is not None:
-                    for listener in self.py_db.dap_messages_listeners:
-                        listener.before_send(cmd.as_dict)
+                # Get all the commands pending (up to the batch limits) to write them at once.
+                exit_received = False
+                buffers = []
+                add_times = []
+                batch_size = 0
+                while True:
+                    if cmd.as_dict is not None:
+                        for listener in self.py_db.dap_messages_listeners:
+                            listener.before_send(cmd.as_dict)
+
+                    for buf in cmd.get_send_buffers():
+                        buffers.append(buf)
+                        batch_size += len(buf)
+                    add_times.append(add_time)
+
+                    if cmd.id == CMD_EXIT:
+                        exit_received = True
+                        break
+
+                    if len(add_times) >= self.MAX_BATCH_COMMANDS or batch_size >= self.MAX_BATCH_SIZE:
+                        break
+
+                    try:
+                        cmd, add_time = self._cmd_queue.get_nowait()
+                    except _queue.Empty:
+                        break
 
                 notify_about_gevent_if_needed()
-                cmd.send(self.sock)
+                if buffers:
+                    try:
+                        send_buffers(self.sock, buffers)
+                    except:
+                        if IS_JYTHON:
+                            # Ignore errors in sock.sendall in Jython (seems to be common for Jython to
+                            # give spurious exceptions at interpreter shutdown here).
+                            pass
+                        else:
+                            raise
+                self._flush_stats.on_flush(add_times, batch_size, self._time())
+                if time is None:
+                    break  # interpreter shutdown
 
-                if cmd.id == CMD_EXIT:
+                if exit_received:
                     pydev_log.debug('WriterThread: CMD_EXIT received')
                     break
-                if time is None:
-                    break  # interpreter shutdown
                 time.sleep(self.timeout)
         except Exception:
             if self.__terminate_on_socket_close:
@@ -454,11 +751,21 @@ class WriterThread(PyDBDaemonThread):
                 if DebugInfoHolder.DEBUG_TRACE_LEVEL > 0:
                     pydev_log_exception()
         finally:
-            pydev_log.debug('WriterThread: exit')
+            pydev_log.debug('WriterThread: exit (%s)', self._flush_stats)
 
     def empty(self):
         return self._cmd_queue.empty()
 
+    def get_pending_count(self, lane=None):
+        '''
+        :param int lane:
+            If given, only the commands pending in the given lane (WRITER_LANE_XXX) are counted.
+
+        :return int:
+            The number of commands added which are still waiting to be written.
+        '''
+        return self._cmd_queue.qsize(lane)
+
     @overrides(PyDBDaemonThread.do_kill_pydev_thread)
     def do_kill_pydev_thread(self):
         if not self._kill_received:
@@ -469,7 +776,54 @@ class WriterThread(PyDBDaemonThread):
         PyDBDaemonThread.do_kill_pydev_thread(self)
 
 
+def _get_unix_socket_path(host):
+    if getattr(socket_module, 'AF_UNIX', None) is None:
+        raise RuntimeError('Unix domain sockets are not available in this platform (endpoint: %s).' % (host,))
+    return host[len(UNIX_SOCKET_ENDPOINT_PREFIX):]
+
+
+def _remove_stale_unix_socket(path):
+    '''
+    Removes a socket file left over by some previous (dead) process.
+
+    :raise socket.error:
+        With EADDRINUSE if something is still listening on it.
+    '''
+    if not os.path.exists(path) or not stat.S_ISSOCK(os.stat(path).st_mode):
+        return
+
+    probe = socket(socket_module.AF_UNIX, SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except socket_module.error as e:
+        if getattr(e, 'errno', None) != errno.ECONNREFUSED:
+            raise
+        # Nothing is listening on it anymore: it's safe to remove it.
+        os.unlink(path)
+    else:
+        raise socket_module.error(errno.EADDRINUSE, 'Address already in use: %s' % (path,))
+    finally:
+        probe.close()
+
+
 def create_server_socket(host, port):
+    '''
+    :param host:
+        The host to bind to or a `unix:/path/to/socket` endpoint (in which case the port is
+        ignored).
+    '''
+    if is_unix_socket_endpoint(host):
+        path = _get_unix_socket_path(host)
+        server = socket(socket_module.AF_UNIX, SOCK_STREAM)
+        try:
+            _remove_stale_unix_socket(path)
+            server.bind(path)
+            server.settimeout(None)
+        except Exception:
+            server.close()
+            raise
+        return server
+
     try:
         server = socket(AF_INET, SOCK_STREAM, IPPROTO_TCP)
         if IS_WINDOWS and not IS_JYTHON:
@@ -486,9 +840,38 @@ def create_server_socket(host, port):
     return server
 
 
-def start_server(port):
-    ''' binds to a port, waits for the debugger to connect '''
-    s = create_server_socket(host='', port=port)
+def socket_from_inherited_fd(host):
+    '''
+    :param host:
+        A `fd:<file descriptor>` endpoint (the file descriptor of an already connected socket
+        inherited from the process which launched this one).
+    '''
+    fd = int(host[len(INHERITED_FD_ENDPOINT_PREFIX):])
+    pydev_log.info("Using socket from inherited file descriptor: %s", fd)
+    if IS_PY2:
+        s = socket_module.fromfd(fd, socket_module.AF_UNIX, SOCK_STREAM)
+        os.close(fd)  # fromfd dups the file descriptor.
+        s = socket(_sock=s)
+    else:
+        s = socket(fileno=fd)
+        # Don't let subprocesses inherit it (otherwise the client won't see the connection
+        # being closed when this process exits).
+        s.set_inheritable(False)
+    s.settimeout(None)
+    return s
+
+
+def start_server(port, host=''):
+    '''
+    binds to a port (or to a `unix:/path/to/socket` endpoint), waits for the debugger to connect.
+
+    Note: if an inherited `fd:<file descriptor>` endpoint is given it's used directly as the
+    connection.
+    '''
+    if is_inherited_fd_endpoint(host):
+        return socket_from_inherited_fd(host)
+
+    s = create_server_socket(host=host, port=port)
 
     try:
         s.listen(1)
@@ -503,35 +886,48 @@ def start_server(port):
 
 
 def start_client(host, port):
-    ''' connects to a host/port '''
-    pydev_log.info("Connecting to %s:%s", host, port)
+    '''
+    connects to a host/port (or to a `unix:/path/to/socket` endpoint).
 
-    s = socket(AF_INET, SOCK_STREAM)
+    Note: if an inherited `fd:<file descriptor>` endpoint is given it's used directly as the
+    connection.
+    '''
+    if is_inherited_fd_endpoint(host):
+        return socket_from_inherited_fd(host)
 
-    #  Set TCP keepalive on an open socket.
-    #  It activates after 1 second (TCP_KEEPIDLE,) of idleness,
-    #  then sends a keepalive ping once every 3 seconds (TCP_KEEPINTVL),
-    #  and closes the connection after 5 failed ping (TCP_KEEPCNT), or 15 seconds
-    try:
-        IPPROTO_TCP, SO_KEEPALIVE, TCP_KEEPIDLE, TCP_KEEPINTVL, TCP_KEEPCNT = (
-            socket_module.IPPROTO_TCP,
-            socket_module.SO_KEEPALIVE,
-            socket_module.TCP_KEEPIDLE,
-            socket_module.TCP_KEEPINTVL,
-            socket_module.TCP_KEEPCNT,
-        )
-        s.setsockopt(SOL_SOCKET, SO_KEEPALIVE, 1)
-        s.setsockopt(IPPROTO_TCP, TCP_KEEPIDLE, 1)
-        s.setsockopt(IPPROTO_TCP, TCP_KEEPINTVL, 3)
-        s.setsockopt(IPPROTO_TCP, TCP_KEEPCNT, 5)
-    except AttributeError:
-        pass  # May not be available everywhere.
+    if is_unix_socket_endpoint(host):
+        pydev_log.info("Connecting to %s", host)
+        s = socket(socket_module.AF_UNIX, SOCK_STREAM)
+        address = _get_unix_socket_path(host)
+    else:
+        pydev_log.info("Connecting to %s:%s", host, port)
+        s = socket(AF_INET, SOCK_STREAM)
+        address = (host, port)
+
+        #  Set TCP keepalive on an open socket.
+        #  It activates after 1 second (TCP_KEEPIDLE,) of idleness,
+        #  then sends a keepalive ping once every 3 seconds (TCP_KEEPINTVL),
+        #  and closes the connection after 5 failed ping (TCP_KEEPCNT), or 15 seconds
+        try:
+            IPPROTO_TCP, SO_KEEPALIVE, TCP_KEEPIDLE, TCP_KEEPINTVL, TCP_KEEPCNT = (
+                socket_module.IPPROTO_TCP,
+                socket_module.SO_KEEPALIVE,
+                socket_module.TCP_KEEPIDLE,
+                socket_module.TCP_KEEPINTVL,
+                socket_module.TCP_KEEPCNT,
+            )
+            s.setsockopt(SOL_SOCKET, SO_KEEPALIVE, 1)
+            s.setsockopt(IPPROTO_TCP, TCP_KEEPIDLE, 1)
+            s.setsockopt(IPPROTO_TCP, TCP_KEEPINTVL, 3)
+            s.setsockopt(IPPROTO_TCP, TCP_KEEPCNT, 5)
+        except AttributeError:
+            pass  # May not be available everywhere.
 
     try:
         # 10 seconds default timeout
         timeout = int(os.environ.get('PYDEVD_CONNECT_TIMEOUT', 10))
         s.settimeout(timeout)
-        s.connect((host, port))
+        s.connect(address)
         s.settimeout(None)  # no timeout after connected
         pydev_log.info("Connected.")
         return s
@@ -679,6 +1075,11 @@ def internal_run_thread(thread, set_additional_thread_info):
     info.pydev_step_stop = None
     info.pydev_state = STATE_RUN
 
+    py_db = get_global_debugger()
+    if py_db is not None:
+        # If it's suspended waiting for commands it must notice that it was resumed.
+        py_db.wake_up_thread(get_thread_id(thread))
+
 
 def internal_step_in_thread(py_db, thread_id, cmd_id, set_additional_thread_info):
     thread_to_step = pydevd_find_thread_by_id(thread_id)
@@ -739,8 +1140,13 @@ def internal_get_variable_json(py_db, request):
     except KeyError:
         pass
     else:
-        for child_var in variable.get_children_variables(fmt=fmt):
-            variables.append(child_var.get_var_data(fmt=fmt))
+        children_variables = variable.get_children_variables(
+            fmt=fmt, filter=arguments.filter, start=arguments.start, count=arguments.count)
+        budget = pydevd_xml.RenderBudget()
+        value_repr_cache = py_db.suspended_frames_manager.get_value_repr_cache(
+            py_db.suspended_frames_manager.get_thread_id_for_variable_reference(variables_reference))
+        for child_var in children_variables:
+            variables.append(child_var.get_var_data(fmt=fmt, budget=budget, value_repr_cache=value_repr_cache))
 
     body = VariablesResponseBody(variables)
     variables_response = pydevd_base_schema.build_response(request, kwargs={'body':body})
@@ -773,10 +1179,13 @@ class InternalGetVariable(InternalThreadCommand):
             if not (_typeName == "OrderedDict" or val_dict.__class__.__name__ == "OrderedDict" or IS_PY36_OR_GREATER):
                 keys.sort(key=compare_object_attrs_key)
 
+            budget = pydevd_xml.RenderBudget()
+            value_repr_cache = dbg.suspended_frames_manager.get_value_repr_cache(self.thread_id)
             for k in keys:
                 val = val_dict[k]
                 evaluate_full_value = pydevd_xml.should_evaluate_full_value(val)
-                xml.write(pydevd_xml.var_to_xml(val, k, evaluate_full_value=evaluate_full_value))
+                xml.write(pydevd_xml.var_to_xml(
+                    val, k, evaluate_full_value=evaluate_full_value, budget=budget, value_repr_cache=value_repr_cache))
 
             xml.write("</xml>")
             cmd = dbg.cmd_factory.make_get_variable_message(self.sequence, xml.getvalue())
@@ -790,7 +1199,7 @@ class InternalGetVariable(InternalThreadCommand):
 
 class InternalGetArray(InternalThreadCommand):
 
-    def __init__(self, seq, roffset, coffset, rows, cols, format, thread_id, frame_id, scope, attrs):
+    def __init__(self, seq, roffset, coffset, rows, cols, format, thread_id, frame_id, scope, attrs, binary=False):
         self.sequence = seq
         self.thread_id = thread_id
         self.frame_id = frame_id
@@ -802,12 +1211,15 @@ class InternalGetArray(InternalThreadCommand):
         self.rows = int(rows)
         self.cols = int(cols)
         self.format = format
+        self.binary = binary
 
     def do_it(self, dbg):
         try:
             frame = dbg.find_frame(self.thread_id, self.frame_id)
             var = pydevd_vars.eval_in_context(self.name, frame.f_globals, frame.f_locals)
-            xml = pydevd_vars.table_like_struct_to_xml(var, self.name, self.roffset, self.coffset, self.rows, self.cols, self.format)
+            xml = pydevd_vars.table_like_struct_to_xml(
+                var, self.name, self.roffset, self.coffset, self.rows, self.cols, self.format, binary=self.binary,
+                value_repr_cache=dbg.suspended_frames_manager.get_value_repr_cache(self.thread_id))
             cmd = dbg.cmd_factory.make_get_array_message(self.sequence, xml)
             dbg.writer.add_command(cmd)
         except:
@@ -897,7 +1309,8 @@ def internal_get_frame(dbg, seq, thread_id, frame_id):
         if frame is not None:
             hidden_ns = pydevconsole.get_ipython_hidden_vars()
             xml = "<xml>"
-            xml += pydevd_xml.frame_vars_to_xml(frame.f_locals, hidden_ns)
+            xml += pydevd_xml.frame_vars_to_xml(
+                frame.f_locals, hidden_ns, dbg.suspended_frames_manager.get_value_repr_cache(thread_id))
             del frame
             xml += "</xml>"
             cmd = dbg.cmd_factory.make_get_frame_message(seq, xml)
@@ -1005,6 +1418,10 @@ def internal_evaluate_expression_json(py_db, request, thread_id):
         else:
             frame = py_db.find_frame(thread_id, frame_id)
             eval_result = pydevd_vars.evaluate_expression(py_db, frame, expression, is_exec=False)
+            if context not in ('watch', 'hover', 'clipboard'):
+                # Watches/hovers aren't expected to have side effects, but anything else may
+                # have changed some value which had its representation cached.
+                py_db.suspended_frames_manager.clear_value_repr_caches()
             is_error = isinstance_checked(eval_result, ExceptionOnEvaluate)
             if is_error:
                 if context == 'hover':  # In a hover it doesn't make sense to do an exec.
@@ -1030,6 +1447,9 @@ def internal_evaluate_expression_json(py_db, request, thread_id):
                 # the debug console. So return the error message in result as well.
                 _evaluate_response(py_db, request, result=err, error_message=err)
                 return
+            finally:
+                # The exec may have changed some value which had its representation cached.
+                py_db.suspended_frames_manager.clear_value_repr_caches()
             # No result on exec.
             _evaluate_response(py_db, request, result='')
             return
@@ -1042,7 +1462,7 @@ def internal_evaluate_expression_json(py_db, request, thread_id):
             return
 
     variable = frame_tracker.obtain_as_variable(expression, eval_result, frame=frame)
-    var_data = variable.get_var_data(fmt=fmt)
+    var_data = variable.get_var_data(fmt=fmt, value_repr_cache=frame_tracker.get_value_repr_cache())
 
     body = pydevd_schema.EvaluateResponseBody(
         result=var_data['value'],
@@ -1056,12 +1476,88 @@ def internal_evaluate_expression_json(py_db, request, thread_id):
     py_db.writer.add_command(NetCommand(CMD_RETURN, 0, variables_response, is_json=True))
 
 
+def internal_evaluate_batch_json(py_db, request, thread_id):
+    '''
+    Evaluates all the expressions of the request in the same frame and sends the results in a
+    single response (the SafeRepr and frame tracker are shared by all the expressions).
+
+    :param PydevdEvaluateBatchRequest request:
+    '''
+    # : :type arguments: PydevdEvaluateBatchArguments
+    arguments = request.arguments
+    context = arguments.context or 'watch'
+    fmt = arguments.format
+    if hasattr(fmt, 'to_dict'):
+        fmt = fmt.to_dict()
+
+    frame = py_db.find_frame(thread_id, arguments.frameId)
+    frame_tracker = py_db.suspended_frames_manager.get_frame_tracker(thread_id)
+    if frame is None or frame_tracker is None:
+        response = pydevd_base_schema.build_response(request, kwargs={
+            'body': pydevd_schema.PydevdEvaluateBatchResponseBody(results=[]),
+            'success': False,
+            'message': 'Unable to find frame: %s in thread: %s.' % (arguments.frameId, thread_id)})
+        py_db.writer.add_command(NetCommand(CMD_RETURN, 0, response, is_json=True))
+        return
+
+    safe_repr = create_safe_repr(fmt)
+    # Note: as with a single evaluate, no render budget is used (the client shows whatever is
+    # returned for a watch and wouldn't request a value which wasn't rendered again).
+    # Note: the expressions are evaluated as watches/hovers (which aren't expected to have side
+    # effects), so, the representations cached are kept.
+    value_repr_cache = frame_tracker.get_value_repr_cache()
+    results = []
+    try:
+        for expression in arguments.expressions:
+            if IS_PY2 and isinstance(expression, unicode):
+                try:
+                    expression.encode('utf-8')
+                except:
+                    results.append(pydevd_schema.PydevdEvaluateBatchResult(
+                        success=False, result='', variablesReference=0, message='Expression is not valid utf-8.').to_dict())
+                    continue
+
+            eval_result = pydevd_vars.evaluate_expression(py_db, frame, expression, is_exec=False)
+            if isinstance_checked(eval_result, ExceptionOnEvaluate):
+                if context == 'hover':
+                    msg = 'Exception occurred during evaluation.'
+                    result = ''
+                else:
+                    msg = '%s: %s' % (eval_result.result.__class__.__name__, eval_result.result,)
+                    result = msg
+                results.append(pydevd_schema.PydevdEvaluateBatchResult(
+                    success=False, result=result, variablesReference=0, message=msg).to_dict())
+                continue
+
+            variable = frame_tracker.obtain_as_variable(expression, eval_result, frame=frame)
+            var_data = variable.get_var_data(
+                fmt=fmt, safe_repr=safe_repr, value_repr_cache=value_repr_cache)
+            results.append(pydevd_schema.PydevdEvaluateBatchResult(
+                success=True,
+                result=var_data['value'],
+                variablesReference=var_data.get('variablesReference', 0),
+                type=var_data.get('type'),
+                presentationHint=var_data.get('presentationHint'),
+                namedVariables=var_data.get('namedVariables'),
+                indexedVariables=var_data.get('indexedVariables'),
+            ).to_dict())
+    finally:
+        frame = None
+
+    body = pydevd_schema.PydevdEvaluateBatchResponseBody(results=results)
+    response = pydevd_base_schema.build_response(request, kwargs={'body': body})
+    py_db.writer.add_command(NetCommand(CMD_RETURN, 0, response, is_json=True))
+
+
 def internal_evaluate_expression(dbg, seq, thread_id, frame_id, expression, is_exec, trim_if_too_big, attr_to_set_result):
     ''' gets the value of a variable '''
     try:
         frame = dbg.find_frame(thread_id, frame_id)
         if frame is not None:
             result = pydevd_vars.evaluate_expression(dbg, frame, expression, is_exec)
+            # Note: it's not possible to know whether this is a watch or some code which may
+            # have changed some value which had its representation cached.
+            dbg.suspended_frames_manager.clear_value_repr_caches()
             if attr_to_set_result != "":
                 pydevd_vars.change_attr_expression(frame, attr_to_set_result, expression, dbg, result)
         else:
@@ -1112,6 +1608,7 @@ def internal_set_expression_json(py_db, request, thread_id):
     frame = py_db.find_frame(thread_id, frame_id)
     exec_code = '%s = (%s)' % (expression, value)
     result = pydevd_vars.evaluate_expression(py_db, frame, exec_code, is_exec=True)
+    py_db.suspended_frames_manager.clear_value_repr_caches()
     is_error = isinstance(result, ExceptionOnEvaluate)
 
     if is_error:
@@ -1401,6 +1898,8 @@ class InternalEvaluateConsoleExpression(InternalThreadCommand):
             if frame is not None:
                 console_message = pydevd_console.execute_console_command(
                     frame, self.thread_id, self.frame_id, self.line, self.buffer_output)
+                # The command may have changed some value which had its representation cached.
+                dbg.suspended_frames_manager.clear_value_repr_caches()
 
                 cmd = dbg.cmd_factory.make_send_console_message(self.sequence, console_message.to_xml())
             else:
@@ -89,6 +89,9 @@ CMD_AUTHENTICATE = 205
 
 CMD_STEP_INTO_COROUTINE = 206
 
+# Same as CMD_GET_ARRAY, but the contents of the slice are sent as raw (base64-encoded) buffers.
+CMD_GET_ARRAY_BINARY = 207
+
 CMD_VERSION = 501
 CMD_RETURN = 502
 CMD_SET_PROTOCOL = 503
@@ -179,6 +182,8 @@ ID_TO_MEANING = {
 
     '206': 'CMD_STEP_INTO_COROUTINE',
 
+    '207': 'CMD_GET_ARRAY_BINARY',
+
     '501': 'CMD_VERSION',
     '502': 'CMD_RETURN',
     '503': 'CMD_SET_PROTOCOL',
@@ -12,6 +12,7 @@ from _pydevd_bundle import pydevd_save_locals
 from _pydevd_bundle.pydevd_io import IOBuf
 from pydevd_tracing import get_exception_traceback_str
 from _pydevd_bundle.pydevd_xml import make_valid_xml_value
+from _pydevd_bundle.pydevd_code_cache import get_compiled_code_cache
 
 CONSOLE_OUTPUT = "output"
 CONSOLE_ERROR = "error"
@@ -73,6 +74,41 @@ class _DebugConsoleStdIn(BaseStdIn):
         return '\n'
 
 
+#=======================================================================================================================
+# _CachedCommandCompiler
+#=======================================================================================================================
+class _CachedCommandCompiler(object):
+    """Wraps the codeop.CommandCompiler used by the console so that the code compiled is
+    kept in the compiled code cache.
+    """
+
+    def __init__(self, command_compiler):
+        self._command_compiler = command_compiler
+
+    def __call__(self, source, filename="<input>", symbol="single"):
+        if '__future__' in source:
+            # Compiling a __future__ import changes the flags of the compiler, so, it must
+            # always be done by the compiler itself.
+            return self._command_compiler(source, filename, symbol)
+
+        # The flags are part of the key as a __future__ import may have changed them.
+        key = (source, filename, symbol, self._command_compiler.compiler.flags)
+        code = get_compiled_code_cache().get_code(key, lambda: self._compile(source, filename, symbol))
+        if code is _INCOMPLETE_INPUT:
+            return None
+        return code
+
+    def _compile(self, source, filename, symbol):
+        code = self._command_compiler(source, filename, symbol)
+        if code is None:
+            return _INCOMPLETE_INPUT
+        return code
+
+
+# Kept in the cache when the source compiled is incomplete (i.e.: more input is required).
+_INCOMPLETE_INPUT = object()
+
+
 #=======================================================================================================================
 # DebugConsole
 #=======================================================================================================================
@@ -81,6 +117,10 @@ class DebugConsole(InteractiveConsole, BaseInterpreterInterface):
     errors and outputs to the debug console
     """
 
+    def __init__(self, *args, **kwargs):
+        InteractiveConsole.__init__(self, *args, **kwargs)
+        self.compile = _CachedCommandCompiler(self.compile)
+
     @overrides(BaseInterpreterInterface.create_std_in)
     def create_std_in(self, *args, **kwargs):
         try:
@@ -114,6 +114,7 @@ IS_PY36_OR_GREATER = False
 IS_PY37_OR_GREATER = False
 IS_PY38_OR_GREATER = False
 IS_PY39_OR_GREATER = False
+IS_PY312_OR_GREATER = False
 IS_PY2 = True
 IS_PY27 = False
 IS_PY24 = False
@@ -126,6 +127,7 @@ try:
         IS_PY37_OR_GREATER = sys.version_info >= (3, 7)
         IS_PY38_OR_GREATER = sys.version_info >= (3, 8)
         IS_PY39_OR_GREATER = sys.version_info >= (3, 9)
+        IS_PY312_OR_GREATER = sys.version_info >= (3, 12)
     elif sys.version_info[0] == 2 and sys.version_info[1] == 7:
         IS_PY27 = True
     elif sys.version_info[0] == 2 and sys.version_info[1] == 4:
@@ -166,6 +168,21 @@ INTERACTIVE_MODE_AVAILABLE = sys.platform in ('darwin', 'win32') or os.getenv('D
 SHOW_COMPILE_CYTHON_COMMAND_LINE = os.getenv('PYDEVD_SHOW_COMPILE_CYTHON_COMMAND_LINE', 'False') == 'True'
 
 LOAD_VALUES_ASYNC = os.getenv('PYDEVD_LOAD_VALUES_ASYNC', 'False') == 'True'
+
+# Budgets to render the values of the variables in a single request (so that the variables view
+# stays responsive regardless of the objects in the program): the time (in seconds) to render all
+# the values and the maximum size of each value (0 means no limit). Values which can't be rendered
+# in the time budget are truncated (or, if LOAD_VALUES_ASYNC is set, left to be loaded asynchronously).
+VALUE_RENDER_TIME_BUDGET_SEC = float(os.getenv('PYDEVD_VALUE_RENDER_TIME_BUDGET_SEC', '1'))
+VALUE_RENDER_SIZE_BUDGET = int(os.getenv('PYDEVD_VALUE_RENDER_SIZE_BUDGET', str(2 ** 17)))
+
+# If True, the output redirected to the client (stdout/stderr) is buffered and sent in
+# time-windowed chunks (instead of one message for each write).
+BUFFER_OUTPUT = os.getenv('PYDEVD_BUFFER_OUTPUT', 'False') == 'True'
+
+# If True, a faster json encoder (orjson) is used to serialize the messages sent to the client
+# when it's available (the json module is still used otherwise).
+USE_FAST_JSON_ENCODER = os.getenv('PYDEVD_USE_FAST_JSON_ENCODER', 'True') == 'True'
 DEFAULT_VALUE = "__pydevd_value_async"
 ASYNC_EVAL_TIMEOUT_SEC = 60
 NEXT_VALUE_SEPARATOR = "__pydev_val__"
@@ -621,6 +638,20 @@ ARGUMENT_HTTP_JSON_PROTOCOL = 'json-dap-http'
 
 ARGUMENT_PPID = 'ppid'
 
+# Endpoints which may be given instead of a host (in which case the port is ignored).
+# i.e.: unix:/path/to/socket
+UNIX_SOCKET_ENDPOINT_PREFIX = 'unix:'
+# i.e.: fd:<file descriptor of an already connected socket inherited from the launcher>
+INHERITED_FD_ENDPOINT_PREFIX = 'fd:'
+
+
+def is_unix_socket_endpoint(host):
+    return bool(host) and host.startswith(UNIX_SOCKET_ENDPOINT_PREFIX)
+
+
+def is_inherited_fd_endpoint(host):
+    return bool(host) and host.startswith(INHERITED_FD_ENDPOINT_PREFIX)
+
 
 class _GlobalSettings:
     protocol = QUOTED_LINE_PROTOCOL
@@ -14,7 +14,7 @@ pydev_log.debug("Using Cython speedups")
 # from _pydevd_bundle.pydevd_frame import PyDBFrame
 # ENDIF
 
-version = 11
+version = 12
 
 if USE_CUSTOM_SYS_CURRENT_FRAMES:
 
@@ -180,7 +180,8 @@ import re
 from _pydev_bundle import pydev_log
 from _pydevd_bundle import pydevd_dont_trace
 from _pydevd_bundle.pydevd_constants import (dict_iter_values, IS_PY3K, RETURN_VALUES_DICT, NO_FTRACE)
-from _pydevd_bundle.pydevd_frame_utils import add_exception_to_frame, just_raised, remove_exception_from_frame, ignore_exception_trace
+from _pydevd_bundle.pydevd_frame_utils import add_exception_to_frame, just_raised, remove_exception_from_frame, ignore_exception_trace, \
+    get_code_lines
 from _pydevd_bundle.pydevd_utils import get_clsname_for_code
 from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame
 from _pydevd_bundle.pydevd_comm_constants import constant_to_str
@@ -209,15 +210,6 @@ DEBUG_START = ('pydevd.py', 'run')
 DEBUG_START_PY3K = ('_pydev_execfile.py', 'execfile')
 TRACE_PROPERTY = 'pydevd_traceproperty.py'
 
-import dis
-
-
-def _get_func_lines(f_code):
-    try:
-        return set(lineno for (_, lineno) in dis.findlinestarts(f_code))
-    except:
-        return None
-
 
 #=======================================================================================================================
 # PyDBFrame
@@ -555,7 +547,6 @@ cdef class PyDBFrame:
         cdef int breakpoints_in_frame_cache;
         cdef bint has_breakpoint_in_frame;
         cdef bint is_coroutine_or_generator;
-        cdef int bp_line;
         cdef object bp;
     # ELSE
 #     def trace_dispatch(self, frame, event, arg):
@@ -574,7 +565,6 @@ cdef class PyDBFrame:
         try:
             info.is_tracing += 1
             line = frame.f_lineno
-            line_cache_key = (frame_cache_key, line)
 
             if main_debugger.pydb_disposed:
                 return None if event == 'call' else NO_FTRACE
@@ -763,6 +753,8 @@ cdef class PyDBFrame:
                 else:
                     # When cached, 0 means we don't have a breakpoint and 1 means we have.
                     if can_skip:
+                        # Note: only create the key when actually needed (this is a hot path).
+                        line_cache_key = (frame_cache_key, line)
                         breakpoints_in_line_cache = frame_skips_cache.get(line_cache_key, -1)
                         if breakpoints_in_line_cache == 0:
                             return self.trace_dispatch
@@ -775,7 +767,7 @@ cdef class PyDBFrame:
                     else:
                         has_breakpoint_in_frame = False
 
-                        func_lines = _get_func_lines(frame.f_code)
+                        func_lines = get_code_lines(frame.f_code)
                         if func_lines is None:
                             # This is a fallback for implementations where we can't get the function
                             # lines -- i.e.: jython (in this case clients need to provide the function
@@ -795,10 +787,8 @@ cdef class PyDBFrame:
                                     has_breakpoint_in_frame = True
                                     break
                         else:
-                            for bp_line in breakpoints_for_file:  # iterate on keys
-                                if bp_line in func_lines:
-                                    has_breakpoint_in_frame = True
-                                    break
+                            # Note: the lines of the code are cached (so, this is just a set/dict intersection).
+                            has_breakpoint_in_frame = not func_lines.isdisjoint(breakpoints_for_file)
 
                         # Cache the value (1 or 0 or -1 for default because of cython).
                         if has_breakpoint_in_frame:
@@ -857,6 +847,11 @@ cdef class PyDBFrame:
                         elif breakpoint.is_logpoint:
                             stop = False
 
+                        if stop and breakpoint.is_snapshot:
+                            # Snapshot breakpoints never suspend (the snapshot is fetched later on by the client).
+                            main_debugger.snapshots.capture(main_debugger, breakpoint, thread, new_frame)
+                            stop = False
+
                     if is_call and frame.f_code.co_name in ('<module>', '<lambda>'):
                         # If we find a call for a module, it means that the module is being imported/executed for the
                         # first time. In this case we have to ignore this hit as it may later duplicated by a
@@ -901,7 +896,7 @@ cdef class PyDBFrame:
                 else:
                     if not breakpoint and is_line:
                         # No stop from anyone and no breakpoint found in line (cache that).
-                        frame_skips_cache[line_cache_key] = 0
+                        frame_skips_cache[(frame_cache_key, line)] = 0
 
             except:
                 pydev_log.exception()
@@ -1065,12 +1060,12 @@ cdef class PyDBFrame:
             info.is_tracing -= 1
 
         # end trace_dispatch
-from _pydev_bundle.pydev_is_thread_alive import is_thread_alive
 from _pydev_bundle.pydev_log import exception as pydev_log_exception
 from _pydev_imps._pydev_saved_modules import threading
-from _pydevd_bundle.pydevd_constants import (get_current_thread_id, NO_FTRACE,
-    USE_CUSTOM_SYS_CURRENT_FRAMES_MAP, ForkSafeLock)
-from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER
+from _pydevd_bundle.pydevd_constants import (NO_FTRACE,
+    USE_CUSTOM_SYS_CURRENT_FRAMES_MAP, ForkSafeLock, dict_items)
+from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER, \
+    get_abs_path_real_path_and_base_from_file
 
 # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
 from cpython.object cimport PyObject
@@ -1096,6 +1091,145 @@ cdef dict _global_notify_skipped_step_in
 global_cache_skips = {}
 global_cache_frame_skips = {}
 
+# IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+# On CPython 3.6 onwards the value in global_cache_skips is also kept in the code object extra
+# slot (so that checking it doesn't require creating a tuple and hashing it on each call).
+# The cached value is only valid while its generation matches _code_cache_skips_generation.
+cdef extern from *:
+    """
+    #if PY_VERSION_HEX >= 0x03060000 && !defined(PYPY_VERSION)
+    #define PYDEVD_HAS_CODE_EXTRA 1
+    static Py_ssize_t pydevd_code_skips_extra_index = -1;
+    static void pydevd_release_code_skips_extra(void *obj) {
+        Py_XDECREF((PyObject *) obj);
+    }
+    static PyObject* pydevd_get_code_skips_extra(PyObject *code) {
+        void *extra = NULL;
+        if (pydevd_code_skips_extra_index == -1) {
+            return NULL;
+        }
+        if (_PyCode_GetExtra(code, pydevd_code_skips_extra_index, &extra) != 0) {
+            PyErr_Clear();
+            return NULL;
+        }
+        return (PyObject *) extra;  /* Borrowed reference. */
+    }
+    static void pydevd_set_code_skips_extra(PyObject *code, PyObject *extra) {
+        if (pydevd_code_skips_extra_index == -1) {
+            pydevd_code_skips_extra_index = _PyEval_RequestCodeExtraIndex(pydevd_release_code_skips_extra);
+            if (pydevd_code_skips_extra_index == -1) {
+                PyErr_Clear();
+                return;
+            }
+        }
+        Py_INCREF(extra);
+        if (_PyCode_SetExtra(code, pydevd_code_skips_extra_index, extra) != 0) {
+            Py_DECREF(extra);
+            PyErr_Clear();
+        }
+    }
+    #else
+    #define PYDEVD_HAS_CODE_EXTRA 0
+    static PyObject* pydevd_get_code_skips_extra(PyObject *code) { return NULL; }
+    static void pydevd_set_code_skips_extra(PyObject *code, PyObject *extra) { }
+    #endif
+    """
+    bint PYDEVD_HAS_CODE_EXTRA
+    PyObject* pydevd_get_code_skips_extra(object code)
+    void pydevd_set_code_skips_extra(object code, object extra)
+cdef class _FileCacheSkipsGeneration:
+    cdef int generation
+cdef class _CodeCacheSkips:
+    cdef int cache_skip
+    cdef int generation
+    # Only set when the skip depends on the breakpoints of the file (cache_skip == 2).
+    cdef _FileCacheSkipsGeneration file_generation
+    cdef int file_generation_value
+cdef int _code_cache_skips_generation = 0
+cdef dict _filename_to_cache_skips_generation = {}
+cdef inline int _get_code_cache_skip(object code):
+    cdef _CodeCacheSkips code_cache_skips
+    cdef PyObject* extra = pydevd_get_code_skips_extra(code)
+    if extra == NULL:
+        return 0
+    code_cache_skips = <_CodeCacheSkips> extra
+    if code_cache_skips.generation != _code_cache_skips_generation:
+        return 0
+    if code_cache_skips.file_generation is not None and code_cache_skips.file_generation.generation != code_cache_skips.file_generation_value:
+        return 0
+    return code_cache_skips.cache_skip
+cdef _set_code_cache_skip(object code, int cache_skip, str filename):
+    cdef _CodeCacheSkips code_cache_skips
+    cdef _FileCacheSkipsGeneration file_generation
+    cdef PyObject* extra = pydevd_get_code_skips_extra(code)
+    if extra == NULL:
+        # Note: the instance set in the code object is never replaced (just updated).
+        code_cache_skips = _CodeCacheSkips()
+        pydevd_set_code_skips_extra(code, code_cache_skips)
+    else:
+        code_cache_skips = <_CodeCacheSkips> extra
+    code_cache_skips.cache_skip = cache_skip
+    code_cache_skips.generation = _code_cache_skips_generation
+    if cache_skip == 2:
+        file_generation = _filename_to_cache_skips_generation.get(filename)
+        if file_generation is None:
+            file_generation = _filename_to_cache_skips_generation[filename] = _FileCacheSkipsGeneration()
+        code_cache_skips.file_generation = file_generation
+        code_cache_skips.file_generation_value = file_generation.generation
+    else:
+        code_cache_skips.file_generation = None
+# ENDIF
+
+
+def _is_frame_cache_key_from_file(frame_cache_key, filename, co_filename_to_filename):
+    co_filename = frame_cache_key[2]
+    key_filename = co_filename_to_filename.get(co_filename)
+    if key_filename is None:
+        key_filename = co_filename_to_filename[co_filename] = get_abs_path_real_path_and_base_from_file(co_filename)[1]
+    return key_filename == filename
+
+
+def clear_cache_skips(filename=None):
+    '''
+    Clears the caches with the contexts which were skipped.
+
+    :param str filename:
+        If given, only the entries which may be affected by a change in the line breakpoints
+        of the given file are cleared (i.e.: contexts of that file skipped because they had no
+        breakpoints), otherwise all the entries are cleared.
+    '''
+    # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+    global _code_cache_skips_generation
+    cdef _FileCacheSkipsGeneration file_generation
+    # ENDIF
+    if filename is None:
+        global_cache_skips.clear()
+        global_cache_frame_skips.clear()
+        # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+        _code_cache_skips_generation += 1
+        # ENDIF
+        return
+
+    # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+    file_generation = _filename_to_cache_skips_generation.get(filename)
+    if file_generation is not None:
+        file_generation.generation += 1
+    # ENDIF
+
+    co_filename_to_filename = {}
+
+    # Note: entries skipped because of filters (1) don't depend on breakpoints.
+    for frame_cache_key, cache_skip in dict_items(global_cache_skips):
+        if cache_skip == 2 and _is_frame_cache_key_from_file(frame_cache_key, filename, co_filename_to_filename):
+            del global_cache_skips[frame_cache_key]
+
+    # Keys are frame_cache_key, (frame_cache_key, line) or (frame_cache_key, 'returns').
+    for key in list(global_cache_frame_skips):
+        frame_cache_key = key if len(key) == 3 else key[0]
+        if _is_frame_cache_key_from_file(frame_cache_key, filename, co_filename_to_filename):
+            del global_cache_frame_skips[key]
+
+
 _global_notify_skipped_step_in = False
 _global_notify_skipped_step_in_lock = ForkSafeLock()
 
@@ -1433,6 +1567,8 @@ cdef class ThreadTracer:
         cdef str base;
         cdef int pydev_step_cmd;
         cdef tuple frame_cache_key;
+        cdef int cache_skip;
+        cdef int back_frame_cache_skip;
         cdef dict cache_skips;
         cdef bint is_stepping;
         cdef tuple abs_path_real_path_and_base;
@@ -1452,35 +1588,60 @@ cdef class ThreadTracer:
             if py_db.pydb_disposed:
                 return None if event == 'call' else NO_FTRACE
 
-            # if thread is not alive, cancel trace_dispatch processing
-            if not is_thread_alive(t):
-                py_db.notify_thread_not_alive(get_current_thread_id(t))
+            # if thread is not alive, cancel trace_dispatch processing (note: it's marked when the exit
+            # is noticed -- see: PyDB.notify_thread_not_alive -- so, it's not checked at each call).
+            if additional_info.pydev_notify_kill:
                 return None if event == 'call' else NO_FTRACE
 
             # Note: it's important that the context name is also given because we may hit something once
             # in the global context and another in the local context.
-            frame_cache_key = (frame.f_code.co_firstlineno, frame.f_code.co_name, frame.f_code.co_filename)
-            if frame_cache_key in cache_skips:
+            # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+            if PYDEVD_HAS_CODE_EXTRA:
+                # Fast path: no tuple is created if the code object has the skip cached.
+                cache_skip = _get_code_cache_skip(frame.f_code)
+                frame_cache_key = None
+            else:
+                frame_cache_key = (frame.f_code.co_firstlineno, frame.f_code.co_name, frame.f_code.co_filename)
+                cache_skip = cache_skips.get(frame_cache_key, 0)
+            # ELSE
+#             frame_cache_key = (frame.f_code.co_firstlineno, frame.f_code.co_name, frame.f_code.co_filename)
+#             cache_skip = cache_skips.get(frame_cache_key, 0)
+            # ENDIF
+            if cache_skip != 0:
                 if not is_stepping:
                     # if DEBUG: print('skipped: trace_dispatch (cache hit)', frame_cache_key, frame.f_lineno, event, frame.f_code.co_name)
                     return None if event == 'call' else NO_FTRACE
                 else:
                     # When stepping we can't take into account caching based on the breakpoints (only global filtering).
-                    if cache_skips.get(frame_cache_key) == 1:
+                    if cache_skip == 1:
 
                         if additional_info.pydev_original_step_cmd in (107, 144) and not _global_notify_skipped_step_in:
                             notify_skipped_step_in_because_of_filters(py_db, frame)
 
                         back_frame = frame.f_back
                         if back_frame is not None and pydev_step_cmd in (107, 144, 109, 160):
-                            back_frame_cache_key = (back_frame.f_code.co_firstlineno, back_frame.f_code.co_name, back_frame.f_code.co_filename)
-                            if cache_skips.get(back_frame_cache_key) == 1:
+                            # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+                            if PYDEVD_HAS_CODE_EXTRA:
+                                back_frame_cache_skip = _get_code_cache_skip(back_frame.f_code)
+                            else:
+                                back_frame_cache_key = (back_frame.f_code.co_firstlineno, back_frame.f_code.co_name, back_frame.f_code.co_filename)
+                                back_frame_cache_skip = cache_skips.get(back_frame_cache_key, 0)
+                            # ELSE
+#                             back_frame_cache_key = (back_frame.f_code.co_firstlineno, back_frame.f_code.co_name, back_frame.f_code.co_filename)
+#                             back_frame_cache_skip = cache_skips.get(back_frame_cache_key, 0)
+                            # ENDIF
+                            if back_frame_cache_skip == 1:
                                 # if DEBUG: print('skipped: trace_dispatch (cache hit: 1)', frame_cache_key, frame.f_lineno, event, frame.f_code.co_name)
                                 return None if event == 'call' else NO_FTRACE
                         else:
                             # if DEBUG: print('skipped: trace_dispatch (cache hit: 2)', frame_cache_key, frame.f_lineno, event, frame.f_code.co_name)
                             return None if event == 'call' else NO_FTRACE
 
+            # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+            if frame_cache_key is None:
+                frame_cache_key = (frame.f_code.co_firstlineno, frame.f_code.co_name, frame.f_code.co_filename)
+            # ENDIF
+
             try:
                 # Make fast path faster!
                 abs_path_real_path_and_base = NORM_PATHS_AND_BASE_CONTAINER[frame.f_code.co_filename]
@@ -1495,15 +1656,24 @@ cdef class ThreadTracer:
                     if not py_db.in_project_scope(frame, abs_path_real_path_and_base[0]):
                         # if DEBUG: print('skipped: trace_dispatch (not in scope)', abs_path_real_path_and_base[-1], frame.f_lineno, event, frame.f_code.co_name, file_type)
                         cache_skips[frame_cache_key] = 1
+                        # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+                        _set_code_cache_skip(frame.f_code, 1, None)
+                        # ENDIF
                         return None if event == 'call' else NO_FTRACE
                 else:
                     # if DEBUG: print('skipped: trace_dispatch', abs_path_real_path_and_base[-1], frame.f_lineno, event, frame.f_code.co_name, file_type)
                     cache_skips[frame_cache_key] = 1
+                    # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+                    _set_code_cache_skip(frame.f_code, 1, None)
+                    # ENDIF
                     return None if event == 'call' else NO_FTRACE
 
             if py_db.is_files_filter_enabled:
                 if py_db.apply_files_filter(frame, filename, False):
                     cache_skips[frame_cache_key] = 1
+                    # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+                    _set_code_cache_skip(frame.f_code, 1, None)
+                    # ENDIF
 
                     if is_stepping and additional_info.pydev_original_step_cmd in (107, 144) and not _global_notify_skipped_step_in:
                         notify_skipped_step_in_because_of_filters(py_db, frame)
@@ -1516,6 +1686,9 @@ cdef class ThreadTracer:
                         if py_db.apply_files_filter(back_frame, back_frame.f_code.co_filename, False):
                             back_frame_cache_key = (back_frame.f_code.co_firstlineno, back_frame.f_code.co_name, back_frame.f_code.co_filename)
                             cache_skips[back_frame_cache_key] = 1
+                            # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+                            _set_code_cache_skip(back_frame.f_code, 1, None)
+                            # ENDIF
                             # if DEBUG: print('skipped: trace_dispatch (filtered out: 1)', frame_cache_key, frame.f_lineno, event, frame.f_code.co_name)
                             return None if event == 'call' else NO_FTRACE
                     else:
@@ -1535,6 +1708,9 @@ cdef class ThreadTracer:
                 # 1 means skipped because of filters.
                 # 2 means skipped because no breakpoints were hit.
                 cache_skips[frame_cache_key] = 2
+                # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
+                _set_code_cache_skip(frame.f_code, 2, filename)
+                # ENDIF
                 return None if event == 'call' else NO_FTRACE
 
             # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
@@ -45,6 +45,8 @@ global_cache_skips = mod.global_cache_skips
 
 global_cache_frame_skips = mod.global_cache_frame_skips
 
+clear_cache_skips = mod.clear_cache_skips
+
 _set_additional_thread_info_lock = mod._set_additional_thread_info_lock
 
 fix_top_level_trace_and_get_trace_func = mod.fix_top_level_trace_and_get_trace_func
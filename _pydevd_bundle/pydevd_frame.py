@@ -5,7 +5,8 @@ import re
 from _pydev_bundle import pydev_log
 from _pydevd_bundle import pydevd_dont_trace
 from _pydevd_bundle.pydevd_constants import (dict_iter_values, IS_PY3K, RETURN_VALUES_DICT, NO_FTRACE)
-from _pydevd_bundle.pydevd_frame_utils import add_exception_to_frame, just_raised, remove_exception_from_frame, ignore_exception_trace
+from _pydevd_bundle.pydevd_frame_utils import add_exception_to_frame, just_raised, remove_exception_from_frame, ignore_exception_trace, \
+    get_code_lines
 from _pydevd_bundle.pydevd_utils import get_clsname_for_code
 from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame
 from _pydevd_bundle.pydevd_comm_constants import constant_to_str
@@ -46,15 +47,6 @@ DEBUG_START = ('pydevd.py', 'run')
 DEBUG_START_PY3K = ('_pydev_execfile.py', 'execfile')
 TRACE_PROPERTY = 'pydevd_traceproperty.py'
 
-import dis
-
-
-def _get_func_lines(f_code):
-    try:
-        return set(lineno for (_, lineno) in dis.findlinestarts(f_code))
-    except:
-        return None
-
 
 #=======================================================================================================================
 # PyDBFrame
@@ -392,7 +384,6 @@ class PyDBFrame:
     #     cdef int breakpoints_in_frame_cache;
     #     cdef bint has_breakpoint_in_frame;
     #     cdef bint is_coroutine_or_generator;
-    #     cdef int bp_line;
     #     cdef object bp;
     # ELSE
     def trace_dispatch(self, frame, event, arg):
@@ -411,7 +402,6 @@ class PyDBFrame:
         try:
             info.is_tracing += 1
             line = frame.f_lineno
-            line_cache_key = (frame_cache_key, line)
 
             if main_debugger.pydb_disposed:
                 return None if event == 'call' else NO_FTRACE
@@ -600,6 +590,8 @@ class PyDBFrame:
                 else:
                     # When cached, 0 means we don't have a breakpoint and 1 means we have.
                     if can_skip:
+                        # Note: only create the key when actually needed (this is a hot path).
+                        line_cache_key = (frame_cache_key, line)
                         breakpoints_in_line_cache = frame_skips_cache.get(line_cache_key, -1)
                         if breakpoints_in_line_cache == 0:
                             return self.trace_dispatch
@@ -612,7 +604,7 @@ class PyDBFrame:
                     else:
                         has_breakpoint_in_frame = False
 
-                        func_lines = _get_func_lines(frame.f_code)
+                        func_lines = get_code_lines(frame.f_code)
                         if func_lines is None:
                             # This is a fallback for implementations where we can't get the function
                             # lines -- i.e.: jython (in this case clients need to provide the function
@@ -632,10 +624,8 @@ class PyDBFrame:
                                     has_breakpoint_in_frame = True
                                     break
                         else:
-                            for bp_line in breakpoints_for_file:  # iterate on keys
-                                if bp_line in func_lines:
-                                    has_breakpoint_in_frame = True
-                                    break
+                            # Note: the lines of the code are cached (so, this is just a set/dict intersection).
+                            has_breakpoint_in_frame = not func_lines.isdisjoint(breakpoints_for_file)
 
                         # Cache the value (1 or 0 or -1 for default because of cython).
                         if has_breakpoint_in_frame:
@@ -694,6 +684,11 @@ class PyDBFrame:
                         elif breakpoint.is_logpoint:
                             stop = False
 
+                        if stop and breakpoint.is_snapshot:
+                            # Snapshot breakpoints never suspend (the snapshot is fetched later on by the client).
+                            main_debugger.snapshots.capture(main_debugger, breakpoint, thread, new_frame)
+                            stop = False
+
                     if is_call and frame.f_code.co_name in ('<module>', '<lambda>'):
                         # If we find a call for a module, it means that the module is being imported/executed for the
                         # first time. In this case we have to ignore this hit as it may later duplicated by a
@@ -738,7 +733,7 @@ class PyDBFrame:
                 else:
                     if not breakpoint and is_line:
                         # No stop from anyone and no breakpoint found in line (cache that).
-                        frame_skips_cache[line_cache_key] = 0
+                        frame_skips_cache[(frame_cache_key, line)] = 0
 
             except:
                 pydev_log.exception()
@@ -1,6 +1,8 @@
 from _pydevd_bundle.pydevd_constants import IS_PY3K
 from _pydev_bundle import pydev_log
+import dis
 import sys
+import weakref
 
 
 class Frame(object):
@@ -75,6 +77,45 @@ def cached_call(obj, func, *args):
     return getattr(obj, cached_name)
 
 
+# Index with the lines of the code objects seen by the debugger:
+# id(code) -> (weakref(code), frozenset(lines in code)).
+# Note: the lines of a code object never change, so, unlike the skip caches, this isn't cleared
+# when breakpoints change (entries are only removed when the related code object is collected).
+_code_id_to_lines = {}
+
+
+def _on_code_collected(code_id, ref):
+    entry = _code_id_to_lines.get(code_id)
+    if entry is not None and entry[0] is ref:
+        del _code_id_to_lines[code_id]
+
+
+def get_code_lines(code):
+    '''
+    :return frozenset(int)|NoneType:
+        The lines which start some instruction in the given code object (or None if that's
+        not available -- i.e.: Jython).
+    '''
+    code_id = id(code)
+    entry = _code_id_to_lines.get(code_id)
+    if entry is not None and entry[0]() is code:
+        return entry[1]
+
+    try:
+        lines = frozenset(lineno for (_, lineno) in dis.findlinestarts(code) if lineno is not None)
+    except:
+        return None
+
+    try:
+        ref = weakref.ref(code, lambda ref, code_id=code_id: _on_code_collected(code_id, ref))
+    except TypeError:
+        # Code can't be weakly referenced (just don't cache it).
+        return lines
+
+    _code_id_to_lines[code_id] = (ref, lines)
+    return lines
+
+
 class FramesList(object):
 
     def __init__(self):
@@ -1,6 +1,9 @@
-from _pydevd_bundle.pydevd_constants import ForkSafeLock, get_global_debugger, IS_PY2
+from _pydevd_bundle.pydevd_constants import ForkSafeLock, get_global_debugger, IS_PY2, BUFFER_OUTPUT
+from _pydev_imps._pydev_saved_modules import threading
+from _pydev_imps._pydev_saved_modules import time
 import os
 import sys
+import weakref
 from contextlib import contextmanager
 
 
@@ -59,9 +62,186 @@ class IORedirector:
         raise AttributeError(name)
 
 
+class BufferedIoMessages(object):
+    '''
+    Merges the output written to the redirected streams into chunks which are sent to the client
+    in time windows (instead of sending an io message for each write).
+
+    The order of the stdout/stderr output is kept (consecutive writes to the same stream are
+    merged in a single io message).
+
+    If the client isn't able to keep up (i.e.: there are too many commands pending in the
+    writer), the output is kept buffered up to `max_buffered_size` and after that it's dropped
+    (the number of chars dropped is reported to the client when the output is sent again).
+
+    Note that writing never blocks on the debugger socket (the io messages are sent by a pydevd
+    daemon thread).
+    '''
+
+    # The output is sent at each interval (in seconds)...
+    flush_interval = 0.02
+
+    # ... or as soon as the output buffered reaches this size.
+    max_chunk_size = 64 * 1024
+
+    # Output over this size is dropped if it can't be sent.
+    max_buffered_size = 1024 * 1024
+
+    # If the writer has more than this number of commands pending the output is not sent.
+    max_writer_pending = 100
+
+    def __init__(self):
+        self._lock = ForkSafeLock()
+
+        # Held while sending (so that concurrent flushes don't change the order of the output).
+        self._flush_lock = ForkSafeLock(rlock=True)
+
+        # List(tuple(out_ctx, list(str)))
+        self._chunks = []
+        self._buffered_size = 0
+        self._dropped = 0
+
+        self._has_output = threading.Event()
+        self._max_chunk_size_reached = threading.Event()
+
+        # weakref to the py_db for which the flush thread is running.
+        self._flush_thread_py_db_ref = None
+        self._flush_thread = None
+
+    def write(self, py_db, s, out_ctx):
+        '''
+        :param str s:
+            The output (str on py3 and utf-8 bytes on py2).
+
+        :param out_ctx:
+            1=stdout and 2=stderr
+        '''
+        with self._lock:
+            if self._buffered_size >= self.max_buffered_size:
+                self._dropped += len(s)
+                return
+
+            chunks = self._chunks
+            if chunks and chunks[-1][0] == out_ctx:
+                chunks[-1][1].append(s)
+            else:
+                chunks.append((out_ctx, [s]))
+
+            self._buffered_size += len(s)
+            self._has_output.set()
+            if self._buffered_size >= self.max_chunk_size:
+                self._max_chunk_size_reached.set()
+
+            py_db_ref = self._flush_thread_py_db_ref
+            if py_db_ref is None or py_db_ref() is not py_db:
+                self._start_flush_thread(py_db)
+
+    def _start_flush_thread(self, py_db):
+        from _pydevd_bundle.pydevd_comm import run_as_pydevd_daemon_thread
+        py_db_ref = self._flush_thread_py_db_ref = weakref.ref(py_db)
+        self._flush_thread = run_as_pydevd_daemon_thread(py_db, self._flush_loop, py_db_ref)
+
+    def stop_flush_thread(self, timeout=None):
+        '''
+        Makes the flush thread exit (the output still buffered is kept and a new flush thread is
+        started on the next write).
+        '''
+        with self._lock:
+            self._flush_thread_py_db_ref = None
+            flush_thread = self._flush_thread
+            self._flush_thread = None
+
+        # Wake it up.
+        self._has_output.set()
+        self._max_chunk_size_reached.set()
+        if flush_thread is not None:
+            flush_thread.join(timeout)
+
+        with self._lock:
+            if not self._chunks:
+                self._has_output.clear()
+            if self._buffered_size < self.max_chunk_size:
+                self._max_chunk_size_reached.clear()
+
+    def _get_flush_thread_py_db(self, py_db_ref):
+        '''
+        :return PyDB:
+            The py_db for which the flush thread is running or None if it should exit.
+        '''
+        py_db = py_db_ref()
+        if py_db is None or py_db_ref is not self._flush_thread_py_db_ref or getattr(py_db, 'pydb_disposed', False):
+            return None
+        return py_db
+
+    def _flush_loop(self, py_db_ref):
+        while True:
+            if self._get_flush_thread_py_db(py_db_ref) is None:
+                return
+
+            if not self._has_output.wait(0.5):
+                continue
+
+            # Wait for the time window to elapse (or for the max chunk size to be reached).
+            self._max_chunk_size_reached.wait(self.flush_interval)
+            py_db = self._get_flush_thread_py_db(py_db_ref)
+            if py_db is None:
+                return
+
+            if not self.flush(py_db):
+                time.sleep(self.flush_interval)
+
+    def flush(self, py_db, force=False):
+        '''
+        Sends the buffered output to the client.
+
+        :param bool force:
+            If True the output is sent even if the client isn't able to keep up.
+
+        :return bool:
+            True if the output was sent and False if it's still buffered (because the writer
+            isn't available or the client isn't able to keep up).
+        '''
+        writer = py_db.writer
+        if writer is None:
+            return False
+
+        if not force and writer.get_pending_count() >= self.max_writer_pending:
+            return False
+
+        with self._flush_lock:
+            with self._lock:
+                chunks = self._chunks
+                dropped = self._dropped
+                self._chunks = []
+                self._buffered_size = 0
+                self._dropped = 0
+                self._has_output.clear()
+                self._max_chunk_size_reached.clear()
+
+            cmd_factory = py_db.cmd_factory
+            for out_ctx, contents in chunks:
+                writer.add_command(cmd_factory.make_io_message(''.join(contents), out_ctx))
+
+            if dropped:
+                writer.add_command(cmd_factory.make_io_message(
+                    'pydevd: %s chars of output dropped (the client is not able to keep up with the output).\n' % (dropped,), 2))
+        return True
+
+
+_buffered_io_messages = BufferedIoMessages()
+
+
+def flush_buffered_io_messages(py_db):
+    '''
+    Sends the output buffered (if the output is being buffered) to the client.
+    '''
+    if BUFFER_OUTPUT:
+        _buffered_io_messages.flush(py_db, force=True)
+
+
 class RedirectToPyDBIoMessages(object):
 
-    def __init__(self, out_ctx, wrap_stream, wrap_buffer, on_write=None):
+    def __init__(self, out_ctx, wrap_stream, wrap_buffer, on_write=None, buffered_io_messages=None):
         '''
         :param out_ctx:
             1=stdout and 2=stderr
@@ -77,6 +257,10 @@ class RedirectToPyDBIoMessages(object):
             May be a custom callable to be called when to write something.
             If not passed the default implementation will create an io message
             and send it through the debugger.
+
+        :param BufferedIoMessages buffered_io_messages:
+            If given, the output is buffered in it instead of creating an io message
+            for each write.
         '''
         encoding = getattr(wrap_stream, 'encoding', None)
         if not encoding:
@@ -84,15 +268,20 @@ class RedirectToPyDBIoMessages(object):
         self.encoding = encoding
         self._out_ctx = out_ctx
         if wrap_buffer:
-            self.buffer = RedirectToPyDBIoMessages(out_ctx, wrap_stream, wrap_buffer=False, on_write=on_write)
+            self.buffer = RedirectToPyDBIoMessages(
+                out_ctx, wrap_stream, wrap_buffer=False, on_write=on_write, buffered_io_messages=buffered_io_messages)
         self._on_write = on_write
+        self._buffered_io_messages = buffered_io_messages
 
     def get_pydb(self):
         # Note: separate method for mocking on tests.
         return get_global_debugger()
 
     def flush(self):
-        pass  # no-op here
+        if self._buffered_io_messages is not None:
+            py_db = self.get_pydb()
+            if py_db is not None:
+                self._buffered_io_messages.flush(py_db)
 
     def write(self, s):
         if self._on_write is not None:
@@ -115,6 +304,10 @@ class RedirectToPyDBIoMessages(object):
 
             py_db = self.get_pydb()
             if py_db is not None:
+                if self._buffered_io_messages is not None:
+                    self._buffered_io_messages.write(py_db, s, self._out_ctx)
+                    return
+
                 # Note that the actual message contents will be a xml with utf-8, although
                 # the entry is str on py3 and bytes on py2.
                 cmd = py_db.cmd_factory.make_io_message(s, self._out_ctx)
@@ -227,7 +420,9 @@ def redirect_stream_to_pydb_io_messages(std):
             wrap_buffer = True if not IS_PY2 else False
             original = getattr(sys, std)
 
-            redirect_to = RedirectToPyDBIoMessages(1 if std == 'stdout' else 2, original, wrap_buffer)
+            redirect_to = RedirectToPyDBIoMessages(
+                1 if std == 'stdout' else 2, original, wrap_buffer,
+                buffered_io_messages=_buffered_io_messages if BUFFER_OUTPUT else None)
             start_redirect(keep_original_redirection=True, std=std, redirect_to=redirect_to)
 
             stack = getattr(_RedirectionsHolder, '_stack_%s' % std)
@@ -248,6 +443,10 @@ def stop_redirect_stream_to_pydb_io_messages(std):
         if redirect_info is not None:  # :type redirect_info: _RedirectInfo
             setattr(_RedirectionsHolder, redirect_to_name, None)
 
+            py_db = get_global_debugger()
+            if py_db is not None:
+                flush_buffered_io_messages(py_db)
+
             stack = getattr(_RedirectionsHolder, '_stack_%s' % std)
             prev_info = stack.pop()
 
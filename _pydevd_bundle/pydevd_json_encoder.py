@@ -0,0 +1,49 @@
+'''
+Serialization of the json messages sent to the client.
+
+If available (and not disabled with PYDEVD_USE_FAST_JSON_ENCODER=False), orjson is used to
+serialize the messages (which is much faster than the json module); the json module is used as
+a fallback when it's not available or can't serialize some message (i.e.: lone surrogates in
+strings or integers which don't fit in 64 bits).
+'''
+import json
+
+from _pydev_bundle import pydev_log
+from _pydevd_bundle.pydevd_constants import USE_FAST_JSON_ENCODER, IS_PY2
+
+_orjson_dumps = None
+if USE_FAST_JSON_ENCODER and not IS_PY2:
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        try:
+            _orjson_dumps = orjson.dumps
+            _orjson_option = orjson.OPT_NON_STR_KEYS
+            _orjson_error = orjson.JSONEncodeError
+        except AttributeError:
+            # Too old.
+            pydev_log.info('orjson found but not used (version too old).')
+            _orjson_dumps = None
+
+
+def is_fast_json_encoder_available():
+    return _orjson_dumps is not None
+
+
+def dumps_to_bytes(obj):
+    '''
+    :return bytes:
+        The utf-8 encoded json representation of the given object.
+    '''
+    if _orjson_dumps is not None:
+        try:
+            return _orjson_dumps(obj, option=_orjson_option)
+        except _orjson_error:
+            pass  # Use the json module (which may be able to deal with it).
+
+    ret = json.dumps(obj)
+    if not IS_PY2:
+        ret = ret.encode('utf-8')
+    return ret
@@ -4,10 +4,46 @@ from _pydevd_bundle.pydevd_utils import quote_smart as quote, to_string
 from _pydevd_bundle.pydevd_comm_constants import ID_TO_MEANING, CMD_EXIT
 from _pydevd_bundle.pydevd_constants import HTTP_PROTOCOL, HTTP_JSON_PROTOCOL, \
     get_protocol, IS_JYTHON, ForkSafeLock
-import json
+from _pydevd_bundle.pydevd_json_encoder import dumps_to_bytes
 from _pydev_bundle import pydev_log
 
 
+# Maximum number of buffers passed in a single sendmsg call (must not be over IOV_MAX).
+_MAX_BUFFERS_PER_SENDMSG = 512
+
+# Up to this size it's cheaper to join the buffers and send them with a single sendall than
+# to have the kernel gather many small buffers.
+_MAX_JOIN_SIZE = 64 * 1024
+
+
+def send_buffers(sock, buffers):
+    '''
+    Sends all the given buffers to the socket (using a single `sendmsg` -- i.e.: writev -- call
+    whenever possible, otherwise the buffers are joined and sent with `sendall`).
+    '''
+    if len(buffers) == 1:
+        sock.sendall(buffers[0])
+        return
+
+    sendmsg = getattr(sock, 'sendmsg', None)
+    if sendmsg is None or sum(len(buf) for buf in buffers) <= _MAX_JOIN_SIZE:
+        sock.sendall(b''.join(buffers))
+        return
+
+    buffers = list(buffers)
+    i = 0
+    buffers_len = len(buffers)
+    while i < buffers_len:
+        sent = sendmsg(buffers[i:i + _MAX_BUFFERS_PER_SENDMSG])
+
+        # Skip what was sent (if a buffer was only partially sent, send the remainder next).
+        while i < buffers_len and sent >= len(buffers[i]):
+            sent -= len(buffers[i])
+            i += 1
+        if sent:
+            buffers[i] = memoryview(buffers[i])[sent:]
+
+
 class _BaseNetCommand(object):
 
     # Command id. Should be set in instance.
@@ -19,6 +55,9 @@ class _BaseNetCommand(object):
     def send(self, *args, **kwargs):
         pass
 
+    def get_send_buffers(self):
+        return ()
+
 
 class _NullNetCommand(_BaseNetCommand):
     pass
@@ -70,7 +109,13 @@ class NetCommand(_BaseNetCommand):
             as_dict['pydevd_cmd_id'] = cmd_id
             as_dict['seq'] = seq
             self.as_dict = as_dict
-            text = json.dumps(as_dict)
+
+            # Serialize straight to bytes (the utf-8 is only decoded back if needed to show it).
+            as_bytes = dumps_to_bytes(as_dict)
+            if DebugInfoHolder.DEBUG_TRACE_LEVEL >= 1:
+                self._show_debug_info(cmd_id, seq, as_bytes.decode('utf-8'))
+            self._as_bytes = as_bytes
+            return
 
         if IS_PY2:
             if isinstance(text, unicode):
@@ -83,15 +128,12 @@ class NetCommand(_BaseNetCommand):
         if DebugInfoHolder.DEBUG_TRACE_LEVEL >= 1:
             self._show_debug_info(cmd_id, seq, text)
 
-        if is_json:
-            msg = text
-        else:
-            if protocol not in (HTTP_PROTOCOL, HTTP_JSON_PROTOCOL):
-                encoded = quote(to_string(text), '/<>_=" \t')
-                msg = '%s\t%s\t%s\n' % (cmd_id, seq, encoded)
+        if protocol not in (HTTP_PROTOCOL, HTTP_JSON_PROTOCOL):
+            encoded = quote(to_string(text), '/<>_=" \t')
+            msg = '%s\t%s\t%s\n' % (cmd_id, seq, encoded)
 
-            else:
-                msg = '%s\t%s\t%s' % (cmd_id, seq, text)
+        else:
+            msg = '%s\t%s\t%s' % (cmd_id, seq, text)
 
         if IS_PY2:
             assert isinstance(msg, str)  # i.e.: bytes
@@ -104,12 +146,19 @@ class NetCommand(_BaseNetCommand):
             as_bytes = msg
         self._as_bytes = as_bytes
 
-    def send(self, sock):
+    def get_send_buffers(self):
+        '''
+        :return tuple(bytes):
+            The contents to be written to the socket for this command.
+        '''
         as_bytes = self._as_bytes
+        if get_protocol() in (HTTP_PROTOCOL, HTTP_JSON_PROTOCOL):
+            return (('Content-Length: %s\r\n\r\n' % len(as_bytes)).encode('ascii'), as_bytes)
+        return (as_bytes,)
+
+    def send(self, sock):
         try:
-            if get_protocol() in (HTTP_PROTOCOL, HTTP_JSON_PROTOCOL):
-                sock.sendall(('Content-Length: %s\r\n\r\n' % len(as_bytes)).encode('ascii'))
-            sock.sendall(as_bytes)
+            send_buffers(sock, self.get_send_buffers())
         except:
             if IS_JYTHON:
                 # Ignore errors in sock.sendall in Jython (seems to be common for Jython to
@@ -94,10 +94,30 @@ class NetCommandFactoryJson(NetCommandFactory):
     no longer use NetCommandFactory as the base class.
     '''
 
+    # Maximum number of `source` dicts cached (when reached the cache is cleared).
+    MAX_CACHED_SOURCES = 2000
+
     def __init__(self):
         NetCommandFactory.__init__(self)
         self.modules_manager = ModulesManager()
 
+        # client filename (in utf-8) -> `source` dict used in the stack frames (the same dict is
+        # reused in all the stackTrace responses -- note: it must not be changed).
+        self._client_filename_to_source = {}
+
+    def _get_stack_frame_source(self, filename_in_utf8):
+        source_reference = pydevd_file_utils.get_client_filename_source_reference(filename_in_utf8)
+        cache = self._client_filename_to_source
+        source = cache.get(filename_in_utf8)
+        if source is None or source['sourceReference'] != source_reference:
+            if len(cache) >= self.MAX_CACHED_SOURCES:
+                cache.clear()
+            source = cache[filename_in_utf8] = {
+                'path': filename_in_utf8,
+                'sourceReference': source_reference,
+            }
+        return source
+
     @overrides(NetCommandFactory.make_version_message)
     def make_version_message(self, seq):
         return NULL_NET_COMMAND  # Not a part of the debug adapter protocol
@@ -229,12 +249,19 @@ class NetCommandFactoryJson(NetCommandFactory):
                         presentation_hint = 'subtle'
 
                 formatted_name = self._format_frame_name(fmt, method_name, module_name, lineno, filename_in_utf8)
-                frames.append(pydevd_schema.StackFrame(
-                    frame_id, formatted_name, lineno, column=1, source={
-                        'path': filename_in_utf8,
-                        'sourceReference': pydevd_file_utils.get_client_filename_source_reference(filename_in_utf8),
-                    },
-                    presentationHint=presentation_hint).to_dict())
+
+                # Note: create the dict directly (same as pydevd_schema.StackFrame(...).to_dict())
+                # as this is done for each frame in each stackTrace request.
+                frame_dict = {
+                    'id': frame_id,
+                    'name': formatted_name,
+                    'line': lineno,
+                    'column': 1,
+                    'source': self._get_stack_frame_source(filename_in_utf8),
+                }
+                if presentation_hint is not None:
+                    frame_dict['presentationHint'] = presentation_hint
+                frames.append(frame_dict)
         finally:
             topmost_frame = None
 
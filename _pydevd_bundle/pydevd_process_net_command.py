@@ -12,7 +12,8 @@ from _pydevd_bundle.pydevd_comm import (pydevd_find_thread_by_id,
     InternalEvaluateConsoleExpression, InternalConsoleGetCompletions, InternalRunCustomOperation,
     internal_get_next_statement_targets)
 from _pydevd_bundle.pydevd_constants import IS_PY3K, NEXT_VALUE_SEPARATOR, IS_WINDOWS, IS_PY2
-from _pydevd_bundle.pydevd_comm_constants import ID_TO_MEANING, CMD_EXEC_EXPRESSION, CMD_AUTHENTICATE
+from _pydevd_bundle.pydevd_comm_constants import ID_TO_MEANING, CMD_EXEC_EXPRESSION, CMD_AUTHENTICATE, \
+    CMD_GET_ARRAY_BINARY
 from _pydevd_bundle.pydevd_api import PyDevdAPI
 from _pydev_bundle.pydev_imports import StringIO
 from _pydevd_bundle.pydevd_net_command import NetCommand
@@ -198,7 +199,12 @@ class _PyDevCommandProcessor(object):
         else:
             scope, attrs = (scopeattrs, None)
 
-        self.api.request_get_array(py_db, seq, roffset, coffset, rows, cols, format, thread_id, frame_id, scope, attrs)
+        self.api.request_get_array(
+            py_db, seq, roffset, coffset, rows, cols, format, thread_id, frame_id, scope, attrs,
+            binary=cmd_id == CMD_GET_ARRAY_BINARY)
+
+    # Same arguments as CMD_GET_ARRAY (only the way the contents are sent back is different).
+    cmd_get_array_binary = cmd_get_array
 
     def cmd_show_return_values(self, py_db, cmd_id, seq, text):
         show_return_values = text.split('\t')[1]
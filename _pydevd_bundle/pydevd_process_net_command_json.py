@@ -18,6 +18,7 @@ from _pydevd_bundle._debug_adapter.pydevd_schema import (
     Capabilities, PydevdAuthorizeRequest, Request)
 from _pydevd_bundle.pydevd_api import PyDevdAPI
 from _pydevd_bundle.pydevd_breakpoints import get_exception_class
+from _pydevd_bundle.pydevd_code_cache import get_compiled_code_cache
 from _pydevd_bundle.pydevd_comm_constants import (
     CMD_PROCESS_EVENT, CMD_RETURN, CMD_SET_NEXT_STATEMENT, CMD_STEP_INTO,
     CMD_STEP_INTO_MY_CODE, CMD_STEP_OVER, CMD_STEP_OVER_MY_CODE, file_system_encoding,
@@ -25,7 +26,7 @@ from _pydevd_bundle.pydevd_comm_constants import (
 from _pydevd_bundle.pydevd_filtering import ExcludeFilter
 from _pydevd_bundle.pydevd_json_debug_options import _extract_debug_options, DebugOptions
 from _pydevd_bundle.pydevd_net_command import NetCommand
-from _pydevd_bundle.pydevd_utils import convert_dap_log_message_to_expression
+from _pydevd_bundle.pydevd_utils import convert_dap_log_message_to_expression, is_string
 from _pydevd_bundle.pydevd_constants import (PY_IMPL_NAME, DebugInfoHolder, PY_VERSION_STR,
     PY_IMPL_VERSION_STR, IS_64BIT_PROCESS)
 from _pydevd_bundle.pydevd_trace_dispatch import USING_CYTHON
@@ -590,8 +591,22 @@ class PyDevJsonCommandProcessor(object):
                 is_logpoint = True
                 expression = convert_dap_log_message_to_expression(log_message)
 
+            # Custom (non-DAP) properties for snapshot breakpoints (the captured snapshots are
+            # later fetched with the `pydevdGetSnapshots` request).
+            is_snapshot = bool(source_breakpoint.kwargs.get('pydevdSnapshot')) and btype == 'python-line'
+            snapshot_locals = source_breakpoint.kwargs.get('pydevdSnapshotLocals')
+            if snapshot_locals is not None and (
+                    not isinstance(snapshot_locals, list) or not all(is_string(name) for name in snapshot_locals)):
+                breakpoints_set.append(pydevd_schema.Breakpoint(
+                    verified=False,
+                    line=line,
+                    message='Breakpoint not validated: pydevdSnapshotLocals must be a list of strings.',
+                    source=arguments.source).to_dict())
+                continue
+
             result = self.api.add_breakpoint(
-                py_db, filename, btype, breakpoint_id, line, condition, func_name, expression, suspend_policy, hit_condition, is_logpoint, adjust_line=True)
+                py_db, filename, btype, breakpoint_id, line, condition, func_name, expression, suspend_policy,
+                hit_condition, is_logpoint, is_snapshot=is_snapshot, snapshot_locals=snapshot_locals, adjust_line=True)
             error_code = result.error_code
 
             if error_code:
@@ -779,6 +794,29 @@ class PyDevJsonCommandProcessor(object):
                     })
                 return NetCommand(CMD_RETURN, 0, response, is_json=True)
 
+    def on_pydevdevaluatebatch_request(self, py_db, request):
+        '''
+        :param PydevdEvaluateBatchRequest request:
+        '''
+        # : :type arguments: PydevdEvaluateBatchArguments
+        arguments = request.arguments
+
+        thread_id = py_db.suspended_frames_manager.get_thread_id_for_variable_reference(
+            arguments.frameId)
+
+        if thread_id is not None:
+            self.api.request_evaluate_batch_json(py_db, request, thread_id)
+        else:
+            body = pydevd_schema.PydevdEvaluateBatchResponseBody(results=[])
+            response = pydevd_base_schema.build_response(
+                request,
+                kwargs={
+                    'body': body,
+                    'success': False,
+                    'message': 'Unable to find thread for evaluation.'
+                })
+            return NetCommand(CMD_RETURN, 0, response, is_json=True)
+
     def on_setexpression_request(self, py_db, request):
         # : :type arguments: SetExpressionArguments
         arguments = request.arguments
@@ -1010,9 +1048,17 @@ class PyDevJsonCommandProcessor(object):
             executable=sys.executable,
             bitness=64 if IS_64BIT_PROCESS else 32,
         )
+        compiled_code_cache_stats = get_compiled_code_cache().to_dict()
         pydevd_info = pydevd_schema.PydevdInfo(
             usingCython=USING_CYTHON,
             usingFrameEval=USING_FRAME_EVAL,
+            compiledCodeCache=pydevd_schema.PydevdCompiledCodeCacheInfo(
+                size=compiled_code_cache_stats['size'],
+                hits=compiled_code_cache_stats['hits'],
+                misses=compiled_code_cache_stats['misses'],
+                evictions=compiled_code_cache_stats['evictions'],
+                hitRate=compiled_code_cache_stats['hit_rate'],
+            ),
         )
         body = {
             'python': py_info,
@@ -1023,6 +1069,37 @@ class PyDevJsonCommandProcessor(object):
         response = pydevd_base_schema.build_response(request, kwargs={'body': body})
         return NetCommand(CMD_RETURN, 0, response, is_json=True)
 
+    def on_pydevdgetsnapshots_request(self, py_db, request):
+        '''
+        :param PydevdGetSnapshotsRequest request:
+        '''
+        arguments = request.arguments  # : :type arguments: PydevdGetSnapshotsArguments
+        max_count = arguments.maxCount if arguments is not None else None
+        snapshots, dropped_count = py_db.snapshots.fetch(max_count)
+
+        snapshots_list = []
+        for snapshot in snapshots:
+            snapshots_list.append(pydevd_schema.PydevdSnapshot(
+                id=snapshot.id,
+                threadId=snapshot.thread_id,
+                source=pydevd_schema.Source(path=snapshot.filename),
+                line=snapshot.line,
+                timestamp=snapshot.timestamp,
+                variables=[
+                    pydevd_schema.PydevdSnapshotVariable(name=name, value=value, type=type_name).to_dict()
+                    for (name, type_name, value) in snapshot.variables
+                ],
+                stackFrames=[
+                    pydevd_schema.PydevdSnapshotFrame(name=name, source=pydevd_schema.Source(path=path), line=line).to_dict()
+                    for (name, path, line) in snapshot.frames
+                ],
+            ).to_dict())
+
+        body = pydevd_schema.PydevdGetSnapshotsResponseBody(
+            snapshots=snapshots_list, droppedCount=dropped_count, remaining=len(py_db.snapshots))
+        response = pydevd_base_schema.build_response(request, kwargs={'body': body})
+        return NetCommand(CMD_RETURN, 0, response, is_json=True)
+
     def on_setpydevdsourcemap_request(self, py_db, request):
         args = request.arguments  # : :type args: SetPydevdSourceMapArguments
         SourceMappingEntry = self.api.SourceMappingEntry
@@ -8,7 +8,10 @@ import traceback
 from os.path import basename
 
 from functools import partial
-from _pydevd_bundle.pydevd_constants import dict_iter_items, dict_keys, xrange
+import itertools
+from _pydevd_bundle.pydevd_constants import dict_iter_items, dict_keys, xrange, get_global_debugger, \
+    get_current_thread_id
+from _pydev_imps._pydev_saved_modules import threading
 from _pydevd_bundle.pydevd_safe_repr import SafeRepr
 
 # Note: 300 is already a lot to see in the outline (after that the user should really use the shell to get things)
@@ -19,6 +22,40 @@ TOO_LARGE_MSG = 'Too large to show contents. Max items to show: ' + str(MAX_ITEM
 TOO_LARGE_ATTR = 'Unable to handle:'
 
 
+# Containers with more than MAX_ITEMS_TO_HANDLE items report their indexed items to the client (as
+# `indexedVariables` in the DAP), which then requests those in pages with `filter='indexed'` (the
+# resolvers which support that have a `get_indexed_count` method and may also have a cheap
+# `get_named_count` method, which must not actually collect the named children).
+FILTER_INDEXED = 'indexed'
+FILTER_NAMED = 'named'
+
+
+def _get_named_count(obj):
+    '''
+    :return int:
+        The number of named children of a builtin container (`__len__` plus, when the class extends
+        the builtin type, the fields in its instance `__dict__`, which are the ones usually shown).
+    '''
+    try:
+        return 1 + len(obj.__dict__)
+    except Exception:
+        return 1
+
+
+def _get_window(start, count, length=None):
+    '''
+    :return tuple(int, int|None):
+        The start/stop of the items to be shown given the `start` and `count` from the client.
+    '''
+    start = start or 0
+    if not count:
+        return start, length
+    stop = start + count
+    if length is not None and stop > length:
+        stop = length
+    return start, stop
+
+
 #=======================================================================================================================
 # UnableToResolveVariableException
 #=======================================================================================================================
@@ -236,6 +273,56 @@ class DefaultResolver:
         return d, used___dict__
 
 
+# Identifies the index of the keys of a dict in the ValueReprCache (see: _get_dict_item_by_key_id).
+_DICT_KEYS_INDEX_INFO_KEY = ('dict_keys_index',)
+
+
+def _get_dict_keys_index(dct):
+    '''
+    :return dict(id(key) -> tuple(key, value))|None:
+        An index of the dict items, kept in the ValueReprCache of the current thread (so, it's
+        only available while all the threads are suspended and is released when a thread is
+        resumed or some code which may change values is evaluated).
+    '''
+    py_db = get_global_debugger()
+    if py_db is None:
+        return None
+    value_repr_cache = py_db.suspended_frames_manager.get_value_repr_cache(
+        get_current_thread_id(threading.current_thread()))
+    if value_repr_cache is None:
+        return None
+
+    keys_index = value_repr_cache.get(dct, _DICT_KEYS_INDEX_INFO_KEY)
+    if keys_index is None:
+        keys_index = dict((id(key), (key, val)) for key, val in dict_iter_items(dct))
+        value_repr_cache.set(dct, _DICT_KEYS_INDEX_INFO_KEY, keys_index)
+    return keys_index
+
+
+def _get_dict_item_by_key_id(dct, expected_id):
+    '''
+    Note: keys are only compared by id (they're never hashed, as the hash of a key may have
+    changed after it was added to the dict).
+
+    :return tuple(key, value):
+        The item whose key has the given id.
+
+    :raises UnableToResolveVariableException:
+        If there's no key with the given id in the dict.
+    '''
+    keys_index = _get_dict_keys_index(dct)
+    if keys_index is not None:
+        item = keys_index.get(expected_id)
+        if item is not None:
+            return item
+
+    for key, val in dict_iter_items(dct):
+        if id(key) == expected_id:
+            return key, val
+
+    raise UnableToResolveVariableException()
+
+
 #=======================================================================================================================
 # DictResolver
 #=======================================================================================================================
@@ -253,14 +340,9 @@ class DictResolver:
             except:
                 return getattr(dict, key)
 
-        # ok, we have to iterate over the items to find the one that matches the id, because that's the only way
-        # to actually find the reference from the string we have before.
+        # The id of the key is embedded in the name.
         expected_id = int(key.split('(')[-1][:-1])
-        for key, val in dict_iter_items(dict):
-            if id(key) == expected_id:
-                return val
-
-        raise UnableToResolveVariableException()
+        return _get_dict_item_by_key_id(dict, expected_id)[1]
 
     def key_to_str(self, key, fmt=None):
         if fmt is not None:
@@ -273,7 +355,13 @@ class DictResolver:
     def init_dict(self):
         return {}
 
-    def get_contents_debug_adapter_protocol(self, dct, fmt=None):
+    def get_indexed_count(self, dct):
+        return len(dct)
+
+    def get_named_count(self, dct):
+        return _get_named_count(dct)
+
+    def get_contents_debug_adapter_protocol(self, dct, fmt=None, filter=None, start=None, count=None):
         '''
         This method is to be used in the case where the variables are all saved by its id (and as
         such don't need to have the `resolve` method called later on, so, keys don't need to
@@ -281,9 +369,27 @@ class DictResolver:
 
         Note that the return should be ordered.
 
+        :param str filter:
+            If FILTER_INDEXED only the items in the window given by `start` and `count` are
+            returned (in the dict iteration order) and if FILTER_NAMED only the other children
+            are returned.
+
         :return list(tuple(name:str, value:object, evaluateName:str))
         '''
+        if filter == FILTER_INDEXED:
+            ret = []
+            start, stop = _get_window(start, count)
+            for key, val in itertools.islice(dict_iter_items(dct), start, stop):
+                ret.append((self.key_to_str(key, fmt), val, '[%s]' % (self.key_to_str(key),)))
+            return ret
+
         ret = []
+        if filter == FILTER_NAMED:
+            ret.append(('__len__', len(dct), partial(_apply_evaluate_name, evaluate_name='len(%s)')))
+            from_default_resolver = defaultResolver.get_contents_debug_adapter_protocol(dct, fmt)
+            if from_default_resolver:
+                ret = from_default_resolver + ret
+            return sorted(ret, key=lambda tup: sorted_attributes_key(tup[0]))
 
         i = 0
         for key, val in dict_iter_items(dct):
@@ -345,7 +451,13 @@ class TupleResolver:  # to enumerate tuples and lists
         except:
             return getattr(var, attribute)
 
-    def get_contents_debug_adapter_protocol(self, lst, fmt=None):
+    def get_indexed_count(self, lst):
+        return len(lst)
+
+    def get_named_count(self, lst):
+        return _get_named_count(lst)
+
+    def get_contents_debug_adapter_protocol(self, lst, fmt=None, filter=None, start=None, count=None):
         '''
         This method is to be used in the case where the variables are all saved by its id (and as
         such don't need to have the `resolve` method called later on, so, keys don't need to
@@ -353,6 +465,10 @@ class TupleResolver:  # to enumerate tuples and lists
 
         Note that the return should be ordered.
 
+        :param str filter:
+            If FILTER_INDEXED only the items in the window given by `start` and `count` are
+            returned and if FILTER_NAMED only the other children are returned.
+
         :return list(tuple(name:str, value:object, evaluateName:str))
         '''
         l = len(lst)
@@ -362,6 +478,23 @@ class TupleResolver:  # to enumerate tuples and lists
         if fmt is not None and fmt.get('hex', False):
             format_str = '0x%0' + str(int(len(hex(l).lstrip('0x')))) + 'x'
 
+        if filter == FILTER_INDEXED:
+            start, stop = _get_window(start, count, l)
+            if isinstance(lst, (list, tuple)):
+                items = lst[start:stop]
+            else:
+                items = itertools.islice(lst, start, stop)
+            for i, item in enumerate(items, start):
+                ret.append((format_str % i, item, '[%s]' % i))
+            return ret
+
+        if filter == FILTER_NAMED:
+            ret.append(('__len__', l, partial(_apply_evaluate_name, evaluate_name='len(%s)')))
+            from_default_resolver = defaultResolver.get_contents_debug_adapter_protocol(lst, fmt=fmt)
+            if from_default_resolver:
+                ret = from_default_resolver + ret
+            return ret
+
         for i, item in enumerate(lst):
             ret.append((format_str % i, item, '[%s]' % i))
 
@@ -406,9 +539,34 @@ class SetResolver:
         Resolves a set as dict id(object)->object
     '''
 
-    def get_contents_debug_adapter_protocol(self, obj, fmt=None):
+    def get_indexed_count(self, obj):
+        return len(obj)
+
+    def get_named_count(self, obj):
+        return _get_named_count(obj)
+
+    def get_contents_debug_adapter_protocol(self, obj, fmt=None, filter=None, start=None, count=None):
+        '''
+        :param str filter:
+            If FILTER_INDEXED only the items in the window given by `start` and `count` are
+            returned (in the set iteration order) and if FILTER_NAMED only the other children
+            are returned.
+        '''
         ret = []
 
+        if filter == FILTER_INDEXED:
+            start, stop = _get_window(start, count)
+            for item in itertools.islice(obj, start, stop):
+                ret.append((str(id(item)), item, None))
+            return ret
+
+        if filter == FILTER_NAMED:
+            ret.append(('__len__', len(obj), partial(_apply_evaluate_name, evaluate_name='len(%s)')))
+            from_default_resolver = defaultResolver.get_contents_debug_adapter_protocol(obj, fmt=fmt)
+            if from_default_resolver:
+                ret = from_default_resolver + ret
+            return ret
+
         for i, item in enumerate(obj):
             ret.append((str(id(item)), item, None))
 
@@ -529,15 +687,8 @@ class MultiValueDictResolver(DictResolver):
         if key in ('__len__', TOO_LARGE_ATTR):
             return None
 
-        # ok, we have to iterate over the items to find the one that matches the id, because that's the only way
-        # to actually find the reference from the string we have before.
         expected_id = int(key.split('(')[-1][:-1])
-        for key in dict_keys(dict):
-            val = dict.getlist(key)
-            if id(key) == expected_id:
-                return val
-
-        raise UnableToResolveVariableException()
+        return dict.getlist(_get_dict_item_by_key_id(dict, expected_id)[0])
 
 
 #=======================================================================================================================
@@ -7,6 +7,7 @@ import sys
 from _pydevd_bundle.pydevd_constants import IS_PY2
 import locale
 import json
+import time
 
 # Py3 compat - alias unicode to str, and xrange to range
 try:
@@ -82,6 +83,33 @@ class SafeRepr(object):
     convert_to_hex = False
     raw_value = False
 
+    # Budgets for the representation: the maximum time (in seconds) to spend creating it and its
+    # maximum size (None means no limit). When a budget is exceeded the representation is cut
+    # with '...' and `truncated` is set to True after the call.
+    maxtime = None
+    maxsize = None
+
+    truncated = False
+    _timeout = None
+
+    def get_options_key(self):
+        '''
+        :return tuple:
+            The options which affect the representation (i.e.: representations created with the
+            same options key are the same for the same object).
+        '''
+        return (
+            self.__class__,
+            self.maxstring_outer,
+            self.maxstring_inner,
+            self.maxother_outer,
+            self.maxother_inner,
+            self.maxcollection,
+            self.convert_to_hex,
+            self.raw_value,
+            self.maxsize,
+        )
+
     def __call__(self, obj):
         '''
         :param object obj:
@@ -90,17 +118,42 @@ class SafeRepr(object):
         :return str:
             Returns bytes encoded as utf-8 on py2 and str on py3.
         '''
+        self.truncated = False
+        if self.maxtime is not None:
+            self._timeout = time.time() + self.maxtime
+        else:
+            self._timeout = None
         try:
+            parts = self._repr(obj, 0)
+            if self.maxsize is not None:
+                parts = self._limit_size(parts, self.maxsize)
+
             if IS_PY2:
-                return ''.join((x.encode('utf-8') if isinstance(x, unicode) else x) for x in self._repr(obj, 0))
+                return ''.join((x.encode('utf-8') if isinstance(x, unicode) else x) for x in parts)
             else:
-                return ''.join(self._repr(obj, 0))
+                return ''.join(parts)
         except Exception:
             try:
                 return 'An exception was raised: %r' % sys.exc_info()[1]
             except Exception:
                 return 'An exception was raised'
 
+    def _limit_size(self, parts, maxsize):
+        for p in parts:
+            maxsize -= len(p)
+            if maxsize < 0:
+                self.truncated = True
+                yield p[:maxsize]
+                yield '...'
+                return
+            yield p
+
+    def _is_out_of_time(self):
+        if self._timeout is not None and time.time() > self._timeout:
+            self.truncated = True
+            return True
+        return False
+
     def _repr(self, obj, level):
         '''Returns an iterable of the parts in the final repr string.'''
 
@@ -209,7 +262,7 @@ class SafeRepr(object):
                 yield_comma = True
 
                 count -= 1
-                if count <= 0:
+                if count <= 0 or self._is_out_of_time():
                     yield '...'
                     break
 
@@ -257,7 +310,7 @@ class SafeRepr(object):
             yield_comma = True
 
             count -= 1
-            if count <= 0:
+            if count <= 0 or self._is_out_of_time():
                 yield '...'
                 break
 
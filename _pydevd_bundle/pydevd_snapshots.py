@@ -0,0 +1,161 @@
+'''
+Support for snapshot breakpoints: breakpoints which never suspend the thread but instead capture a
+(bounded) snapshot of the locals and the stack when hit.
+
+The snapshots are kept in a fixed-size ring buffer (when it's full the oldest snapshots are
+discarded) and are fetched by the client in batches.
+'''
+from collections import deque
+import time
+
+from _pydev_bundle import pydev_log
+from _pydev_imps._pydev_saved_modules import threading
+from _pydevd_bundle.pydevd_constants import get_thread_id, dict_iter_items
+from _pydevd_bundle.pydevd_frame_utils import create_frames_list_from_frame
+from _pydevd_bundle.pydevd_safe_repr import SafeRepr
+import pydevd_file_utils
+
+
+class Snapshot(object):
+
+    __slots__ = ['id', 'thread_id', 'filename', 'line', 'timestamp', 'variables', 'frames']
+
+    def __init__(self, snapshot_id, thread_id, filename, line, timestamp, variables, frames):
+        self.id = snapshot_id
+        self.thread_id = thread_id
+        self.filename = filename
+        self.line = line
+        self.timestamp = timestamp
+
+        # List(tuple(name, type name, value repr))
+        self.variables = variables
+
+        # List(tuple(name, filename, line)) -- topmost frame first.
+        self.frames = frames
+
+    def __str__(self):
+        return 'Snapshot(%s - %s:%s)' % (self.id, self.filename, self.line)
+
+    __repr__ = __str__
+
+
+class SnapshotsBuffer(object):
+
+    # Maximum number of snapshots kept (when full, the oldest snapshot is discarded).
+    max_snapshots = 100
+
+    # Maximum number of variables captured per snapshot.
+    max_variables = 50
+
+    # Maximum number of frames captured per snapshot.
+    max_frames = 30
+
+    # Maximum length of the repr of each captured variable.
+    max_repr_len = 256
+
+    def __init__(self, max_snapshots=None):
+        if max_snapshots is not None:
+            self.max_snapshots = max_snapshots
+
+        self._lock = threading.Lock()
+        self._snapshots = deque(maxlen=self.max_snapshots)
+        self._next_id = 0
+
+        # Number of snapshots discarded (because the buffer was full) since the last fetch.
+        self._dropped_count = 0
+
+        self._safe_repr = SafeRepr()
+        self._safe_repr.maxstring_outer = self.max_repr_len
+        self._safe_repr.maxother_outer = self.max_repr_len
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def capture(self, py_db, breakpoint, thread, frame):
+        '''
+        Captures a snapshot of the given frame and adds it to the buffer.
+
+        :param LineBreakpoint breakpoint:
+            The breakpoint hit (its `snapshot_locals` may be used to restrict the captured locals).
+        '''
+        try:
+            variables = self._capture_variables(frame, breakpoint.snapshot_locals)
+            frames = self._capture_frames(py_db, frame)
+
+            abs_path_real_path_and_base = pydevd_file_utils.get_abs_path_real_path_and_base_from_frame(frame)
+            filename, line, _changed = py_db.source_mapping.map_to_client(abs_path_real_path_and_base[0], frame.f_lineno)
+            filename = pydevd_file_utils.norm_file_to_client(filename)
+
+            with self._lock:
+                self._next_id += 1
+                snapshot = Snapshot(
+                    self._next_id, get_thread_id(thread), filename, line, time.time(), variables, frames)
+
+                if len(self._snapshots) == self.max_snapshots:
+                    self._dropped_count += 1
+                self._snapshots.append(snapshot)
+        except:
+            pydev_log.exception('Error capturing snapshot.')
+
+    def _capture_variables(self, frame, snapshot_locals):
+        safe_repr = self._safe_repr
+        variables = []
+        f_locals = frame.f_locals
+
+        if snapshot_locals:
+            items = ((name, f_locals[name]) for name in snapshot_locals if name in f_locals)
+        else:
+            items = dict_iter_items(f_locals)
+
+        for name, value in items:
+            if len(variables) >= self.max_variables:
+                break
+            try:
+                value_repr = safe_repr(value)
+            except:
+                value_repr = '<error getting repr>'
+            variables.append((name, value.__class__.__name__, value_repr))
+        return variables
+
+    def _capture_frames(self, py_db, frame):
+        frames = []
+        for f in create_frames_list_from_frame(frame):
+            if len(frames) >= self.max_frames:
+                break
+
+            abs_path_real_path_and_base = pydevd_file_utils.get_abs_path_real_path_and_base_from_frame(f)
+            if py_db.get_file_type(f, abs_path_real_path_and_base) == py_db.PYDEV_FILE:
+                continue
+
+            filename, line, _changed = py_db.source_mapping.map_to_client(abs_path_real_path_and_base[0], f.f_lineno)
+            filename = pydevd_file_utils.norm_file_to_client(filename)
+            frames.append((f.f_code.co_name, filename, line))
+        return frames
+
+    def fetch(self, max_count=None):
+        '''
+        Removes snapshots from the buffer (oldest first).
+
+        :param int max_count:
+            The maximum number of snapshots to fetch (if None or <= 0, all the snapshots are fetched).
+
+        :return tuple(list(Snapshot), int):
+            The snapshots fetched and the number of snapshots discarded since the last fetch
+            (because the buffer was full).
+        '''
+        with self._lock:
+            snapshots = self._snapshots
+            if max_count is None or max_count <= 0 or max_count >= len(snapshots):
+                ret = list(snapshots)
+                snapshots.clear()
+            else:
+                ret = [snapshots.popleft() for _i in range(max_count)]
+
+            dropped_count = self._dropped_count
+            self._dropped_count = 0
+        return ret, dropped_count
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+            self._dropped_count = 0
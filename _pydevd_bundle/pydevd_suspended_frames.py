@@ -3,10 +3,12 @@ import sys
 
 from _pydev_imps._pydev_saved_modules import threading
 from _pydevd_bundle.pydevd_constants import get_frame, dict_items, RETURN_VALUES_DICT, \
-    dict_iter_items, ForkSafeLock
-from _pydevd_bundle.pydevd_xml import get_variable_details, get_type
+    dict_iter_items, ForkSafeLock, dict_values
+from _pydevd_bundle._debug_adapter.pydevd_base_schema import BaseSchema
+from _pydevd_bundle.pydevd_xml import get_variable_details, get_type, ValueReprCache
 from _pydev_bundle.pydev_override import overrides
-from _pydevd_bundle.pydevd_resolver import sorted_attributes_key, TOO_LARGE_ATTR
+from _pydevd_bundle.pydevd_resolver import sorted_attributes_key, TOO_LARGE_ATTR, MAX_ITEMS_TO_HANDLE, \
+    FILTER_INDEXED
 from _pydevd_bundle.pydevd_safe_repr import SafeRepr
 from _pydev_bundle import pydev_log
 from _pydevd_bundle import pydevd_vars
@@ -14,6 +16,18 @@ from _pydev_bundle.pydev_imports import Exec
 from _pydevd_bundle.pydevd_frame_utils import FramesList
 
 
+def create_safe_repr(fmt=None):
+    '''
+    :param dict fmt:
+        Format expected by the DAP (keys: 'hex': bool, 'rawString': bool)
+    '''
+    safe_repr = SafeRepr()
+    if fmt is not None:
+        safe_repr.convert_to_hex = fmt.get('hex', False)
+        safe_repr.raw_value = fmt.get('rawString', False)
+    return safe_repr
+
+
 class _AbstractVariable(object):
 
     # Default attributes in class, set in instance.
@@ -31,18 +45,29 @@ class _AbstractVariable(object):
     def get_variable_reference(self):
         return id(self.value)
 
-    def get_var_data(self, fmt=None):
+    def get_var_data(self, fmt=None, budget=None, safe_repr=None, value_repr_cache=None):
         '''
         :param dict fmt:
             Format expected by the DAP (keys: 'hex': bool, 'rawString': bool)
+
+        :param RenderBudget budget:
+            The budget to render the value (shared by the variables of a request).
+
+        :param SafeRepr safe_repr:
+            The SafeRepr to render the value (if given, `fmt` must already be applied to it).
+
+        :param ValueReprCache value_repr_cache:
+            If given, the representation is kept in it (see: _FramesTracker.get_value_repr_cache).
         '''
-        safe_repr = SafeRepr()
-        if fmt is not None:
-            safe_repr.convert_to_hex = fmt.get('hex', False)
-            safe_repr.raw_value = fmt.get('rawString', False)
+        if safe_repr is None:
+            safe_repr = create_safe_repr(fmt)
+
+        if budget is not None:
+            safe_repr.maxtime = budget.get_remaining_time()
+            safe_repr.maxsize = budget.max_size
 
         type_name, _type_qualifier, _is_exception_on_eval, resolver, value = get_variable_details(
-            self.value, to_string=safe_repr)
+            self.value, to_string=safe_repr, budget=budget, value_repr_cache=value_repr_cache)
 
         is_raw_string = type_name in ('str', 'unicode', 'bytes', 'bytearray')
 
@@ -51,6 +76,11 @@ class _AbstractVariable(object):
         if is_raw_string:
             attributes.append('rawString')
 
+        if budget is not None and budget.last_value_truncated:
+            # The value was truncated (or not rendered) because of the budget: the client may
+            # still request the full value (i.e.: by evaluating the evaluateName).
+            attributes.append('truncated')
+
         name = self.name
 
         if self._is_return_value:
@@ -71,6 +101,8 @@ class _AbstractVariable(object):
 
         if resolver is not None:  # I.e.: it's a container
             var_data['variablesReference'] = self.get_variable_reference()
+            if hasattr(resolver, 'get_indexed_count'):
+                self._add_paging_info(var_data, resolver, fmt)
         else:
             var_data['variablesReference'] = 0  # It's mandatory (although if == 0 it doesn't have children).
 
@@ -79,7 +111,27 @@ class _AbstractVariable(object):
 
         return var_data
 
-    def get_children_variables(self, fmt=None):
+    def _add_paging_info(self, var_data, resolver, fmt):
+        try:
+            indexed_count = resolver.get_indexed_count(self.value)
+            if indexed_count > MAX_ITEMS_TO_HANDLE:
+                # Let the client request the items in pages (see: get_children_variables).
+                var_data['indexedVariables'] = indexed_count
+                if hasattr(resolver, 'get_named_count'):
+                    # Note: the named children are not collected here (for some types that's
+                    # almost as expensive as collecting all the children).
+                    var_data['namedVariables'] = resolver.get_named_count(self.value)
+        except:
+            pydev_log.exception('Error getting the number of items of: %s', self.name)
+
+    def get_children_variables(self, fmt=None, filter=None, start=None, count=None):
+        '''
+        :param str filter:
+            If FILTER_INDEXED, only the indexed children in the window given by `start` and `count`
+            are returned and if FILTER_NAMED only the other children are returned (the filter is
+            only applied for containers with more than MAX_ITEMS_TO_HANDLE items, which report
+            `indexedVariables` in `get_var_data`).
+        '''
         raise NotImplementedError()
 
     def get_child_variable_named(self, name, fmt=None):
@@ -102,12 +154,20 @@ class _ObjectVariable(_AbstractVariable):
         self.evaluate_name = evaluate_name
 
     @overrides(_AbstractVariable.get_children_variables)
-    def get_children_variables(self, fmt=None):
+    def get_children_variables(self, fmt=None, filter=None, start=None, count=None):
         _type, _type_name, resolver = get_type(self.value)
 
         children_variables = []
         if resolver is not None:  # i.e.: it's a container.
-            if hasattr(resolver, 'get_contents_debug_adapter_protocol'):
+            if filter is not None and hasattr(resolver, 'get_indexed_count'):
+                lst = resolver.get_contents_debug_adapter_protocol(
+                    self.value, fmt=fmt, filter=filter, start=start, count=count)
+
+            elif filter == FILTER_INDEXED:
+                # Items can't be paged for this container (so, they're all shown as named).
+                lst = []
+
+            elif hasattr(resolver, 'get_contents_debug_adapter_protocol'):
                 # The get_contents_debug_adapter_protocol needs to return sorted.
                 lst = resolver.get_contents_debug_adapter_protocol(self.value, fmt=fmt)
             else:
@@ -143,6 +203,9 @@ class _ObjectVariable(_AbstractVariable):
         if children_variable is None:
             return None
 
+        # The representations of the changed value (and of its containers) must be recomputed.
+        py_db.suspended_frames_manager.clear_value_repr_caches()
+
         var_data = children_variable.get_var_data()
         evaluate_name = var_data.get('evaluateName')
 
@@ -203,8 +266,12 @@ class _FrameVariable(_AbstractVariable):
         return self.get_child_variable_named(name, fmt=fmt)
 
     @overrides(_AbstractVariable.get_children_variables)
-    def get_children_variables(self, fmt=None):
+    def get_children_variables(self, fmt=None, filter=None, start=None, count=None):
         children_variables = []
+        if filter == FILTER_INDEXED:
+            # Frames have only named variables.
+            return children_variables
+
         for key, val in dict_items(self.frame.f_locals):
             is_return_value = key == RETURN_VALUES_DICT
             if is_return_value:
@@ -256,6 +323,9 @@ class _FramesTracker(object):
 
         self._variable_reference_to_variable = {}
 
+        # The representations of the values shown while suspended (see: get_value_repr_cache).
+        self._value_repr_cache = ValueReprCache()
+
     def _register_variable(self, variable):
         variable_reference = variable.get_variable_reference()
         self._variable_reference_to_variable[variable_reference] = variable
@@ -276,6 +346,20 @@ class _FramesTracker(object):
     def get_main_thread_id(self):
         return self._main_thread_id
 
+    def get_value_repr_cache(self):
+        '''
+        While all the threads are suspended the same values are usually shown many times, so,
+        their representations are kept until a thread is resumed or some code which may change
+        values is evaluated (see: SuspendedFramesManager.clear_value_repr_caches).
+
+        :return ValueReprCache|None:
+            The cache to be used or None if some thread of the program is still running (in
+            which case values may be changed at any time, so, nothing is cached).
+        '''
+        if self._untracked or self.py_db is None or not self.py_db.are_all_threads_suspended():
+            return None
+        return self._value_repr_cache
+
     def get_variable(self, variable_reference):
         return self._variable_reference_to_variable[variable_reference]
 
@@ -327,6 +411,20 @@ class _FramesTracker(object):
             for frame_id in self._frame_id_to_frame:
                 del self._suspended_frames_manager._variable_reference_to_frames_tracker[frame_id]
 
+            # The frames/variables references are no longer valid, so, release the related dap
+            # ids (unless some other thread which is still suspended also references it).
+            other_trackers = set(dict_values(self._suspended_frames_manager._thread_id_to_tracker))
+            other_trackers.discard(self)
+            BaseSchema.release_ids([
+                variable_reference for variable_reference in self._variable_reference_to_variable
+                if not any(variable_reference in tracker._variable_reference_to_variable for tracker in other_trackers)
+            ])
+
+            # The resumed thread may change any value shown by threads which are still suspended.
+            self._value_repr_cache.clear()
+            for tracker in other_trackers:
+                tracker._value_repr_cache.clear()
+
             self._frame_id_to_frame.clear()
             self._frame_id_to_main_thread_id.clear()
             self._thread_id_to_frame_ids.clear()
@@ -401,6 +499,25 @@ class SuspendedFramesManager(object):
     def get_frame_tracker(self, thread_id):
         return self._thread_id_to_tracker.get(thread_id)
 
+    def get_value_repr_cache(self, thread_id):
+        '''
+        :return ValueReprCache|None:
+            The cache for the representations of the values shown while the given thread is
+            suspended (see: _FramesTracker.get_value_repr_cache).
+        '''
+        tracker = self._thread_id_to_tracker.get(thread_id)
+        if tracker is None:
+            return None
+        return tracker.get_value_repr_cache()
+
+    def clear_value_repr_caches(self):
+        '''
+        Clears the representations cached for all the suspended threads (should be called
+        whenever some code which may change values is evaluated).
+        '''
+        for tracker in set(dict_values(self._thread_id_to_tracker)):
+            tracker._value_repr_cache.clear()
+
     def get_variable(self, variable_reference):
         '''
         :raises KeyError
@@ -0,0 +1,507 @@
+'''
+Tracing engine based on `sys.monitoring` (PEP 669), available on Python 3.12 onwards.
+
+The idea is that instead of receiving a callback for every call in every thread (as happens
+with `sys.settrace`), we only ask for `PY_START`/`PY_RESUME` events (which are disabled for each
+code object right after the first time it's seen) and then enable `LINE` events only for the code
+objects which actually have breakpoints (lines without breakpoints are also disabled in the first
+time they're hit).
+
+Stepping, pausing and the programmatic `pydevd.settrace()` still rely on the regular tracer
+(which is set only for the thread which needs it). Caught exceptions and plugin breakpoints are
+also only handled by the regular tracer, so, when those are requested the debugger falls back to
+the `sys.settrace` mode (see: `PyDB._can_use_sys_monitoring`).
+'''
+import os
+import sys
+import weakref
+
+from _pydev_bundle import pydev_log
+from _pydev_imps._pydev_saved_modules import threading
+from _pydevd_bundle.pydevd_additional_thread_info import set_additional_thread_info
+from _pydevd_bundle.pydevd_comm_constants import CMD_SET_BREAK
+from _pydevd_bundle.pydevd_constants import (IS_PY312_OR_GREATER, IS_CPYTHON, STATE_SUSPEND,
+    GlobalDebuggerHolder)
+from _pydevd_bundle.pydevd_dont_trace_files import LIB_FILE
+from _pydevd_bundle.pydevd_frame_utils import get_code_lines
+from _pydevd_bundle.pydevd_utils import get_non_pydevd_threads
+from _pydevd_frame_eval.pydevd_frame_eval_main import USING_FRAME_EVAL
+from pydevd_file_utils import NORM_PATHS_AND_BASE_CONTAINER, get_abs_path_real_path_and_base_from_frame
+import pydevd_tracing
+
+USING_SYS_MONITORING = False
+
+# "NO" means we should not use sys.monitoring, 'YES' we should use it (and fail if not there) and unspecified uses if possible.
+use_sys_monitoring = os.environ.get('PYDEVD_USE_SYS_MONITORING', None)
+
+if use_sys_monitoring == 'NO':
+    pass
+
+elif use_sys_monitoring == 'YES':
+    if not hasattr(sys, 'monitoring'):
+        raise RuntimeError('PYDEVD_USE_SYS_MONITORING=YES requires sys.monitoring (Python 3.12 onwards).')
+    USING_SYS_MONITORING = True
+
+elif use_sys_monitoring is None:
+    # Frame evaluation has precedence if available.
+    USING_SYS_MONITORING = IS_PY312_OR_GREATER and IS_CPYTHON and not USING_FRAME_EVAL and hasattr(sys, 'monitoring')
+
+else:
+    raise RuntimeError('Unexpected value for PYDEVD_USE_SYS_MONITORING: %s (accepted: YES, NO)' % (use_sys_monitoring,))
+
+if USING_SYS_MONITORING:
+    monitoring = sys.monitoring
+    DEBUGGER_ID = monitoring.DEBUGGER_ID
+    DISABLE = monitoring.DISABLE
+
+    PY_START = monitoring.events.PY_START
+    PY_RESUME = monitoring.events.PY_RESUME
+    LINE = monitoring.events.LINE
+    PY_UNWIND = monitoring.events.PY_UNWIND
+
+
+class _MonitoringState(object):
+    '''
+    Keeps the global state for the engine (sys.monitoring is process-wide).
+    '''
+
+    started = False
+
+    # When some thread is marked to be suspended (i.e.: pause or suspend policy == 'ALL') line
+    # events are enabled for all the code so that the suspended threads can stop as soon as
+    # possible.
+    all_lines = False
+
+    # id(code) -> (weakref(code), frozenset(breakpoint lines in code), filename)
+    # Note: filename is None if the debugger can't stop in the code (i.e.: library or filtered out).
+    code_id_to_lines = {}
+
+
+_EMPTY_LINES = frozenset()
+
+_thread_local = threading.local()
+
+
+def _on_code_collected(code_id, ref):
+    entry = _MonitoringState.code_id_to_lines.get(code_id)
+    if entry is not None and entry[0] is ref:
+        _MonitoringState.code_id_to_lines.pop(code_id, None)
+
+
+def _get_abs_path_real_path_and_base(code, frame):
+    try:
+        # Make fast path faster!
+        return NORM_PATHS_AND_BASE_CONTAINER[code.co_filename]
+    except:
+        return get_abs_path_real_path_and_base_from_frame(frame)
+
+
+def _can_stop_in_file(py_db, frame, abs_path_real_path_and_base):
+    file_type = py_db.get_file_type(frame, abs_path_real_path_and_base)
+    if file_type is not None:
+        if file_type != LIB_FILE or not py_db.in_project_scope(frame, abs_path_real_path_and_base[0]):
+            return False
+
+    if py_db.is_files_filter_enabled and py_db.apply_files_filter(frame, abs_path_real_path_and_base[1], False):
+        return False
+    return True
+
+
+def _compute_breakpoint_lines(py_db, code, filename):
+    breakpoints_for_file = py_db.breakpoints.get(filename)
+    if not breakpoints_for_file:
+        return _EMPTY_LINES
+
+    func_lines = get_code_lines(code)
+    if func_lines is None:
+        pydev_log.info('Unable to collect lines for: %s', code)
+        return _EMPTY_LINES
+
+    return func_lines.intersection(breakpoints_for_file)
+
+
+def _get_breakpoint_lines(py_db, code, frame):
+    '''
+    :return frozenset(int):
+        The lines with breakpoints for the given code (computed only once per code object after
+        breakpoints change -- when computed, line events are enabled for code with breakpoints).
+    '''
+    code_id = id(code)
+    entry = _MonitoringState.code_id_to_lines.get(code_id)
+    if entry is not None and entry[0]() is code:
+        return entry[1]
+
+    abs_path_real_path_and_base = _get_abs_path_real_path_and_base(code, frame)
+    if _can_stop_in_file(py_db, frame, abs_path_real_path_and_base):
+        filename = abs_path_real_path_and_base[1]
+        lines = _compute_breakpoint_lines(py_db, code, filename)
+    else:
+        filename = None
+        lines = _EMPTY_LINES
+
+    ref = weakref.ref(code, lambda ref, code_id=code_id: _on_code_collected(code_id, ref))
+    _MonitoringState.code_id_to_lines[code_id] = (ref, lines, filename)
+    if lines:
+        monitoring.set_local_events(DEBUGGER_ID, code, LINE)
+    return lines
+
+
+def _get_thread_and_info(py_db):
+    thread = py_db.threading_active.get(py_db.threading_get_ident())
+    if thread is None or getattr(thread, 'pydev_do_not_trace', False):
+        return None, None
+
+    try:
+        additional_info = thread.additional_info
+        if additional_info is None:
+            raise AttributeError()
+    except:
+        additional_info = set_additional_thread_info(thread)
+    return thread, additional_info
+
+
+def _on_py_start(code, instruction_offset):
+    py_db = GlobalDebuggerHolder.global_dbg
+    if py_db is None or py_db.pydb_disposed:
+        return DISABLE
+
+    try:
+        _get_breakpoint_lines(py_db, code, sys._getframe(1))
+    except:
+        pydev_log.exception('Error handling sys.monitoring PY_START for: %s', code)
+    return DISABLE
+
+
+def _on_line(code, line):
+    py_db = GlobalDebuggerHolder.global_dbg
+    if py_db is None or py_db.pydb_disposed:
+        return DISABLE
+
+    thread, info = _get_thread_and_info(py_db)
+    if info is None or info.is_tracing:
+        return None
+
+    frame = sys._getframe(1)
+    resumed_at = _thread_local.__dict__.pop('resumed_at', None)
+    if resumed_at is not None and resumed_at == (id(frame), line):
+        # The regular tracer receives the line event first and it already stopped at this line.
+        return None
+
+    lines = _get_breakpoint_lines(py_db, code, frame)
+
+    if info.pydev_state == STATE_SUSPEND:
+        if not lines and not _can_stop_in_file(py_db, frame, _get_abs_path_real_path_and_base(code, frame)):
+            # i.e.: library or debugger file.
+            return None
+
+        # Pause requested or some other thread hit a breakpoint with suspend policy == 'ALL'.
+        info.is_tracing += 1
+        try:
+            py_db.do_wait_suspend(thread, frame, 'line', None)
+        finally:
+            info.is_tracing -= 1
+        return None
+
+    if info.pydev_step_cmd != -1:
+        # Stepping is handled by the regular tracer (make sure it's set for this thread).
+        if sys.gettrace() is None:
+            py_db.set_trace_for_frame_and_parents(frame)
+            pydevd_tracing.SetTrace(py_db.get_thread_local_trace_func())
+        return None
+
+    if line not in lines:
+        if _MonitoringState.all_lines:
+            return None
+        return DISABLE
+
+    abs_path_real_path_and_base = _get_abs_path_real_path_and_base(code, frame)
+    breakpoints_for_file = py_db.breakpoints.get(abs_path_real_path_and_base[1])
+    if not breakpoints_for_file:
+        return None
+
+    breakpoint = breakpoints_for_file.get(line)
+    if breakpoint is None:
+        return None
+
+    info.is_tracing += 1
+    try:
+        stop = True
+        eval_result = False
+        if breakpoint.has_condition:
+            eval_result = py_db.handle_breakpoint_condition(info, breakpoint, frame)
+
+        if breakpoint.expression is not None:
+            py_db.handle_breakpoint_expression(breakpoint, info, frame)
+            if breakpoint.is_logpoint and info.pydev_message is not None and len(info.pydev_message) > 0:
+                cmd = py_db.cmd_factory.make_io_message(info.pydev_message + os.linesep, '1')
+                py_db.writer.add_command(cmd)
+
+        if breakpoint.has_condition:
+            if not eval_result:
+                stop = False
+        elif breakpoint.is_logpoint:
+            stop = False
+
+        if stop and breakpoint.is_snapshot:
+            # Snapshot breakpoints never suspend (the snapshot is fetched later on by the client).
+            py_db.snapshots.capture(py_db, breakpoint, thread, frame)
+            stop = False
+
+        if stop:
+            py_db.set_suspend(
+                thread,
+                CMD_SET_BREAK,
+                suspend_other_threads=breakpoint.suspend_policy == "ALL",
+            )
+            if info.pydev_state == STATE_SUSPEND:
+                py_db.do_wait_suspend(thread, frame, 'line', None)
+    finally:
+        info.is_tracing -= 1
+    return None
+
+
+def _is_thread_entry_frame(frame):
+    # Note: must match the frames where the regular tracer deals with unhandled exceptions
+    # (see: pydevd_trace_dispatch_regular.fix_top_level_trace_and_get_trace_func).
+    name = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+    co_name = frame.f_code.co_name
+    if name == 'threading':
+        return co_name in ('__bootstrap_inner', '_bootstrap_inner')
+    elif name == 'pydev_monkey':
+        return co_name == '__call__'
+    elif name == 'pydevd':
+        return co_name == '_exec'
+    return False
+
+
+def _on_py_unwind(code, instruction_offset, exception):
+    py_db = GlobalDebuggerHolder.global_dbg
+    if py_db is None or py_db.pydb_disposed or not py_db.break_on_uncaught_exceptions:
+        return None
+
+    frame = sys._getframe(1)
+    back = frame.f_back
+    if back is not None and not _is_thread_entry_frame(back):
+        return None
+
+    thread, info = _get_thread_and_info(py_db)
+    if info is None or info.is_tracing or info.suspended_at_unhandled:
+        return None
+
+    info.suspended_at_unhandled = True
+    info.is_tracing += 1
+    try:
+        py_db.stop_on_unhandled_exception(py_db, thread, info, (type(exception), exception, exception.__traceback__))
+    finally:
+        info.is_tracing -= 1
+    return None
+
+
+def _update_global_events(py_db):
+    events = PY_START | PY_RESUME
+    if py_db.break_on_uncaught_exceptions:
+        events |= PY_UNWIND
+    if _MonitoringState.all_lines:
+        events |= LINE
+    monitoring.set_events(DEBUGGER_ID, events)
+
+
+def is_monitoring_active():
+    return _MonitoringState.started
+
+
+def start_monitoring(py_db):
+    '''
+    :return bool:
+        True if sys.monitoring is (or was already) set to be used for debugging and False
+        otherwise (i.e.: some other tool is already registered as the debugger).
+    '''
+    if _MonitoringState.started:
+        return True
+
+    try:
+        monitoring.use_tool_id(DEBUGGER_ID, 'pydevd')
+    except ValueError:
+        pydev_log.info('Unable to use sys.monitoring (tool id already in use by: %s).', monitoring.get_tool(DEBUGGER_ID))
+        return False
+
+    monitoring.register_callback(DEBUGGER_ID, PY_START, _on_py_start)
+    monitoring.register_callback(DEBUGGER_ID, PY_RESUME, _on_py_start)
+    monitoring.register_callback(DEBUGGER_ID, LINE, _on_line)
+    monitoring.register_callback(DEBUGGER_ID, PY_UNWIND, _on_py_unwind)
+    _MonitoringState.started = True
+
+    for t in get_non_pydevd_threads():
+        if _needs_regular_tracer(t):
+            # i.e.: stop on entry was requested.
+            _MonitoringState.all_lines = True
+            break
+
+    _update_global_events(py_db)
+    _arm_running_frames(py_db)
+    return True
+
+
+def stop_monitoring():
+    if not _MonitoringState.started:
+        return
+
+    _MonitoringState.started = False
+    _MonitoringState.all_lines = False
+    _clear_local_events()
+    monitoring.set_events(DEBUGGER_ID, 0)
+    for event in (PY_START, PY_RESUME, LINE, PY_UNWIND):
+        monitoring.register_callback(DEBUGGER_ID, event, None)
+    monitoring.free_tool_id(DEBUGGER_ID)
+
+
+def set_trace_to_threads(tracing_func):
+    '''
+    Sets the tracing function in all the threads (used when falling back from sys.monitoring to
+    sys.settrace, in which case the threads already running aren't traced).
+    '''
+    if hasattr(sys, '_settraceallthreads'):
+        # Threads which shouldn't be traced will remove the tracing from themselves in the first call.
+        sys._settraceallthreads(tracing_func)
+        return 0
+    return pydevd_tracing.set_trace_to_threads(tracing_func)
+
+
+def _clear_local_events():
+    code_id_to_lines = _MonitoringState.code_id_to_lines
+    _MonitoringState.code_id_to_lines = {}
+    for ref, lines, _filename in list(code_id_to_lines.values()):
+        if lines:
+            code = ref()
+            if code is not None:
+                monitoring.set_local_events(DEBUGGER_ID, code, 0)
+
+
+def _arm_running_frames(py_db):
+    # Code which is already running won't have a PY_START, so, we have to check the frames
+    # in the existing threads.
+    ignore_thread_ids = set(
+        t.ident for t in threading.enumerate()
+        if getattr(t, 'is_pydev_daemon_thread', False) or getattr(t, 'pydev_do_not_trace', False)
+    )
+
+    for thread_id, frame in sys._current_frames().items():
+        if thread_id in ignore_thread_ids:
+            continue
+        try:
+            while frame is not None:
+                _get_breakpoint_lines(py_db, frame.f_code, frame)
+                frame = frame.f_back
+        finally:
+            frame = None
+
+
+def _update_local_events_for_file(py_db, filename):
+    # Note: any code from the file which already started is in code_id_to_lines (and code which
+    # still didn't start will be checked in its PY_START), so, only those entries are updated.
+    lines_added = False
+    code_id_to_lines = _MonitoringState.code_id_to_lines
+    for code_id, (ref, lines, code_filename) in list(code_id_to_lines.items()):
+        if code_filename != filename:
+            continue
+        code = ref()
+        if code is None:
+            continue
+
+        new_lines = _compute_breakpoint_lines(py_db, code, filename)
+        code_id_to_lines[code_id] = (ref, new_lines, filename)
+        if new_lines and not lines:
+            monitoring.set_local_events(DEBUGGER_ID, code, LINE)
+        elif lines and not new_lines:
+            monitoring.set_local_events(DEBUGGER_ID, code, 0)
+
+        if not lines_added and not new_lines.issubset(lines):
+            lines_added = True
+
+    if lines_added:
+        # Line events which were previously disabled (with DISABLE) must be enabled again.
+        monitoring.restart_events()
+
+
+def restart_events(py_db, filename=None):
+    '''
+    Should be called whenever breakpoints change so that the information on which code objects
+    need line events is recomputed.
+
+    :param str filename:
+        If given, only the line breakpoints of the given file were changed.
+    '''
+    if not _MonitoringState.started:
+        return
+
+    if filename is not None:
+        _update_local_events_for_file(py_db, filename)
+        return
+
+    _clear_local_events()
+    _update_global_events(py_db)
+    monitoring.restart_events()
+    _arm_running_frames(py_db)
+
+
+def _needs_regular_tracer(thread):
+    additional_info = getattr(thread, 'additional_info', None)
+    if additional_info is None:
+        return False
+    return additional_info.pydev_state == STATE_SUSPEND or additional_info.pydev_step_cmd != -1
+
+
+def enable_tracing_for_current_thread(py_db):
+    '''
+    The current thread only needs the regular tracer if it's stepping or marked to be suspended.
+    '''
+    thread = py_db.threading_active.get(py_db.threading_get_ident())
+    if thread is not None and _needs_regular_tracer(thread):
+        pydevd_tracing.SetTrace(py_db.get_thread_local_trace_func())
+
+
+def on_thread_needs_tracing(py_db, thread):
+    '''
+    Called when some thread is marked to be suspended or to step (so, it must be traced by the
+    regular tracer).
+    '''
+    if not _MonitoringState.started:
+        return
+
+    if thread.ident == py_db.threading_get_ident():
+        if not thread.additional_info.is_tracing:
+            # i.e.: programmatic `pydevd.settrace()`: the current thread will stop at the next
+            # line through the regular tracer.
+            pydevd_tracing.SetTrace(py_db.get_thread_local_trace_func())
+
+    elif not _MonitoringState.all_lines:
+        _MonitoringState.all_lines = True
+        _update_global_events(py_db)
+        monitoring.restart_events()
+
+
+def on_thread_resumed(py_db, thread, frame):
+    '''
+    Called when a thread stops waiting in `PyDB._do_wait_suspend`.
+    '''
+    if not _MonitoringState.started:
+        return
+
+    if sys.gettrace() is not None:
+        # Stopped through the regular tracer: the sys.monitoring line event for the same line
+        # is still pending.
+        _thread_local.resumed_at = (id(frame), frame.f_lineno)
+
+    if thread.additional_info.pydev_step_cmd != -1:
+        # Stepping is done by the regular tracer.
+        pydevd_tracing.SetTrace(py_db.get_thread_local_trace_func())
+    else:
+        pydevd_tracing.SetTrace(None)
+
+    if _MonitoringState.all_lines:
+        for t in get_non_pydevd_threads():
+            if t is not thread and _needs_regular_tracer(t):
+                return
+
+        _MonitoringState.all_lines = False
+        _update_global_events(py_db)
@@ -37,17 +37,17 @@ def delete_old_compiled_extensions():
 
 if use_cython == 'YES':
     # We must import the cython version if forcing cython
-    from _pydevd_bundle.pydevd_cython_wrapper import trace_dispatch, global_cache_skips, global_cache_frame_skips, fix_top_level_trace_and_get_trace_func
+    from _pydevd_bundle.pydevd_cython_wrapper import trace_dispatch, global_cache_skips, global_cache_frame_skips, clear_cache_skips, fix_top_level_trace_and_get_trace_func
     USING_CYTHON = True
 
 elif use_cython == 'NO':
     # Use the regular version if not forcing cython
-    from _pydevd_bundle.pydevd_trace_dispatch_regular import trace_dispatch, global_cache_skips, global_cache_frame_skips, fix_top_level_trace_and_get_trace_func  # @UnusedImport
+    from _pydevd_bundle.pydevd_trace_dispatch_regular import trace_dispatch, global_cache_skips, global_cache_frame_skips, clear_cache_skips, fix_top_level_trace_and_get_trace_func  # @UnusedImport
 
 elif use_cython is None:
     # Regular: use fallback if not found and give message to user
     try:
-        from _pydevd_bundle.pydevd_cython_wrapper import trace_dispatch, global_cache_skips, global_cache_frame_skips, fix_top_level_trace_and_get_trace_func
+        from _pydevd_bundle.pydevd_cython_wrapper import trace_dispatch, global_cache_skips, global_cache_frame_skips, clear_cache_skips, fix_top_level_trace_and_get_trace_func
 
         # This version number is always available
         from _pydevd_bundle.pydevd_additional_thread_info_regular import version as regular_version
@@ -61,7 +61,7 @@ elif use_cython is None:
             USING_CYTHON = True
 
     except ImportError:
-        from _pydevd_bundle.pydevd_trace_dispatch_regular import trace_dispatch, global_cache_skips, global_cache_frame_skips, fix_top_level_trace_and_get_trace_func  # @UnusedImport
+        from _pydevd_bundle.pydevd_trace_dispatch_regular import trace_dispatch, global_cache_skips, global_cache_frame_skips, clear_cache_skips, fix_top_level_trace_and_get_trace_func  # @UnusedImport
         pydev_log.show_compile_cython_command_line()
 else:
     raise RuntimeError('Unexpected value for PYDEVD_USE_CYTHON: %s (accepted: YES, NO)' % (use_cython,))
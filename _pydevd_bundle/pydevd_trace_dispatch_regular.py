@@ -1,9 +1,9 @@
-from _pydev_bundle.pydev_is_thread_alive import is_thread_alive
 from _pydev_bundle.pydev_log import exception as pydev_log_exception
 from _pydev_imps._pydev_saved_modules import threading
-from _pydevd_bundle.pydevd_constants import (get_current_thread_id, NO_FTRACE,
-    USE_CUSTOM_SYS_CURRENT_FRAMES_MAP, ForkSafeLock)
-from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER
+from _pydevd_bundle.pydevd_constants import (NO_FTRACE,
+    USE_CUSTOM_SYS_CURRENT_FRAMES_MAP, ForkSafeLock, dict_items)
+from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER, \
+    get_abs_path_real_path_and_base_from_file
 
 # IFDEF CYTHON
 # from cpython.object cimport PyObject
@@ -33,6 +33,158 @@ CMD_STEP_RETURN_MY_CODE = 160
 global_cache_skips = {}
 global_cache_frame_skips = {}
 
+# IFDEF CYTHON
+# # On CPython 3.6 onwards the value in global_cache_skips is also kept in the code object extra
+# # slot (so that checking it doesn't require creating a tuple and hashing it on each call).
+# # The cached value is only valid while its generation matches _code_cache_skips_generation.
+# cdef extern from *:
+#     """
+#     #if PY_VERSION_HEX >= 0x03060000 && !defined(PYPY_VERSION)
+#     #define PYDEVD_HAS_CODE_EXTRA 1
+#     static Py_ssize_t pydevd_code_skips_extra_index = -1;
+#
+#     static void pydevd_release_code_skips_extra(void *obj) {
+#         Py_XDECREF((PyObject *) obj);
+#     }
+#
+#     static PyObject* pydevd_get_code_skips_extra(PyObject *code) {
+#         void *extra = NULL;
+#         if (pydevd_code_skips_extra_index == -1) {
+#             return NULL;
+#         }
+#         if (_PyCode_GetExtra(code, pydevd_code_skips_extra_index, &extra) != 0) {
+#             PyErr_Clear();
+#             return NULL;
+#         }
+#         return (PyObject *) extra;  /* Borrowed reference. */
+#     }
+#
+#     static void pydevd_set_code_skips_extra(PyObject *code, PyObject *extra) {
+#         if (pydevd_code_skips_extra_index == -1) {
+#             pydevd_code_skips_extra_index = _PyEval_RequestCodeExtraIndex(pydevd_release_code_skips_extra);
+#             if (pydevd_code_skips_extra_index == -1) {
+#                 PyErr_Clear();
+#                 return;
+#             }
+#         }
+#         Py_INCREF(extra);
+#         if (_PyCode_SetExtra(code, pydevd_code_skips_extra_index, extra) != 0) {
+#             Py_DECREF(extra);
+#             PyErr_Clear();
+#         }
+#     }
+#     #else
+#     #define PYDEVD_HAS_CODE_EXTRA 0
+#     static PyObject* pydevd_get_code_skips_extra(PyObject *code) { return NULL; }
+#     static void pydevd_set_code_skips_extra(PyObject *code, PyObject *extra) { }
+#     #endif
+#     """
+#     bint PYDEVD_HAS_CODE_EXTRA
+#     PyObject* pydevd_get_code_skips_extra(object code)
+#     void pydevd_set_code_skips_extra(object code, object extra)
+#
+#
+# cdef class _FileCacheSkipsGeneration:
+#     cdef int generation
+#
+#
+# cdef class _CodeCacheSkips:
+#     cdef int cache_skip
+#     cdef int generation
+#     # Only set when the skip depends on the breakpoints of the file (cache_skip == 2).
+#     cdef _FileCacheSkipsGeneration file_generation
+#     cdef int file_generation_value
+#
+#
+# cdef int _code_cache_skips_generation = 0
+# cdef dict _filename_to_cache_skips_generation = {}
+#
+#
+# cdef inline int _get_code_cache_skip(object code):
+#     cdef _CodeCacheSkips code_cache_skips
+#     cdef PyObject* extra = pydevd_get_code_skips_extra(code)
+#     if extra == NULL:
+#         return 0
+#     code_cache_skips = <_CodeCacheSkips> extra
+#     if code_cache_skips.generation != _code_cache_skips_generation:
+#         return 0
+#     if code_cache_skips.file_generation is not None and code_cache_skips.file_generation.generation != code_cache_skips.file_generation_value:
+#         return 0
+#     return code_cache_skips.cache_skip
+#
+#
+# cdef _set_code_cache_skip(object code, int cache_skip, str filename):
+#     cdef _CodeCacheSkips code_cache_skips
+#     cdef _FileCacheSkipsGeneration file_generation
+#     cdef PyObject* extra = pydevd_get_code_skips_extra(code)
+#     if extra == NULL:
+#         # Note: the instance set in the code object is never replaced (just updated).
+#         code_cache_skips = _CodeCacheSkips()
+#         pydevd_set_code_skips_extra(code, code_cache_skips)
+#     else:
+#         code_cache_skips = <_CodeCacheSkips> extra
+#     code_cache_skips.cache_skip = cache_skip
+#     code_cache_skips.generation = _code_cache_skips_generation
+#     if cache_skip == 2:
+#         file_generation = _filename_to_cache_skips_generation.get(filename)
+#         if file_generation is None:
+#             file_generation = _filename_to_cache_skips_generation[filename] = _FileCacheSkipsGeneration()
+#         code_cache_skips.file_generation = file_generation
+#         code_cache_skips.file_generation_value = file_generation.generation
+#     else:
+#         code_cache_skips.file_generation = None
+# ENDIF
+
+
+def _is_frame_cache_key_from_file(frame_cache_key, filename, co_filename_to_filename):
+    co_filename = frame_cache_key[2]
+    key_filename = co_filename_to_filename.get(co_filename)
+    if key_filename is None:
+        key_filename = co_filename_to_filename[co_filename] = get_abs_path_real_path_and_base_from_file(co_filename)[1]
+    return key_filename == filename
+
+
+def clear_cache_skips(filename=None):
+    '''
+    Clears the caches with the contexts which were skipped.
+
+    :param str filename:
+        If given, only the entries which may be affected by a change in the line breakpoints
+        of the given file are cleared (i.e.: contexts of that file skipped because they had no
+        breakpoints), otherwise all the entries are cleared.
+    '''
+    # IFDEF CYTHON
+    # global _code_cache_skips_generation
+    # cdef _FileCacheSkipsGeneration file_generation
+    # ENDIF
+    if filename is None:
+        global_cache_skips.clear()
+        global_cache_frame_skips.clear()
+        # IFDEF CYTHON
+        # _code_cache_skips_generation += 1
+        # ENDIF
+        return
+
+    # IFDEF CYTHON
+    # file_generation = _filename_to_cache_skips_generation.get(filename)
+    # if file_generation is not None:
+    #     file_generation.generation += 1
+    # ENDIF
+
+    co_filename_to_filename = {}
+
+    # Note: entries skipped because of filters (1) don't depend on breakpoints.
+    for frame_cache_key, cache_skip in dict_items(global_cache_skips):
+        if cache_skip == 2 and _is_frame_cache_key_from_file(frame_cache_key, filename, co_filename_to_filename):
+            del global_cache_skips[frame_cache_key]
+
+    # Keys are frame_cache_key, (frame_cache_key, line) or (frame_cache_key, 'returns').
+    for key in list(global_cache_frame_skips):
+        frame_cache_key = key if len(key) == 3 else key[0]
+        if _is_frame_cache_key_from_file(frame_cache_key, filename, co_filename_to_filename):
+            del global_cache_frame_skips[key]
+
+
 _global_notify_skipped_step_in = False
 _global_notify_skipped_step_in_lock = ForkSafeLock()
 
@@ -370,6 +522,8 @@ class ThreadTracer(object):
         # cdef str base;
         # cdef int pydev_step_cmd;
         # cdef tuple frame_cache_key;
+        # cdef int cache_skip;
+        # cdef int back_frame_cache_skip;
         # cdef dict cache_skips;
         # cdef bint is_stepping;
         # cdef tuple abs_path_real_path_and_base;
@@ -389,35 +543,60 @@ class ThreadTracer(object):
             if py_db.pydb_disposed:
                 return None if event == 'call' else NO_FTRACE
 
-            # if thread is not alive, cancel trace_dispatch processing
-            if not is_thread_alive(t):
-                py_db.notify_thread_not_alive(get_current_thread_id(t))
+            # if thread is not alive, cancel trace_dispatch processing (note: it's marked when the exit
+            # is noticed -- see: PyDB.notify_thread_not_alive -- so, it's not checked at each call).
+            if additional_info.pydev_notify_kill:
                 return None if event == 'call' else NO_FTRACE
 
             # Note: it's important that the context name is also given because we may hit something once
             # in the global context and another in the local context.
+            # IFDEF CYTHON
+            # if PYDEVD_HAS_CODE_EXTRA:
+            #     # Fast path: no tuple is created if the code object has the skip cached.
+            #     cache_skip = _get_code_cache_skip(frame.f_code)
+            #     frame_cache_key = None
+            # else:
+            #     frame_cache_key = (frame.f_code.co_firstlineno, frame.f_code.co_name, frame.f_code.co_filename)
+            #     cache_skip = cache_skips.get(frame_cache_key, 0)
+            # ELSE
             frame_cache_key = (frame.f_code.co_firstlineno, frame.f_code.co_name, frame.f_code.co_filename)
-            if frame_cache_key in cache_skips:
+            cache_skip = cache_skips.get(frame_cache_key, 0)
+            # ENDIF
+            if cache_skip != 0:
                 if not is_stepping:
                     # if DEBUG: print('skipped: trace_dispatch (cache hit)', frame_cache_key, frame.f_lineno, event, frame.f_code.co_name)
                     return None if event == 'call' else NO_FTRACE
                 else:
                     # When stepping we can't take into account caching based on the breakpoints (only global filtering).
-                    if cache_skips.get(frame_cache_key) == 1:
+                    if cache_skip == 1:
 
                         if additional_info.pydev_original_step_cmd in (CMD_STEP_INTO, CMD_STEP_INTO_MY_CODE) and not _global_notify_skipped_step_in:
                             notify_skipped_step_in_because_of_filters(py_db, frame)
 
                         back_frame = frame.f_back
                         if back_frame is not None and pydev_step_cmd in (CMD_STEP_INTO, CMD_STEP_INTO_MY_CODE, CMD_STEP_RETURN, CMD_STEP_RETURN_MY_CODE):
+                            # IFDEF CYTHON
+                            # if PYDEVD_HAS_CODE_EXTRA:
+                            #     back_frame_cache_skip = _get_code_cache_skip(back_frame.f_code)
+                            # else:
+                            #     back_frame_cache_key = (back_frame.f_code.co_firstlineno, back_frame.f_code.co_name, back_frame.f_code.co_filename)
+                            #     back_frame_cache_skip = cache_skips.get(back_frame_cache_key, 0)
+                            # ELSE
                             back_frame_cache_key = (back_frame.f_code.co_firstlineno, back_frame.f_code.co_name, back_frame.f_code.co_filename)
-                            if cache_skips.get(back_frame_cache_key) == 1:
+                            back_frame_cache_skip = cache_skips.get(back_frame_cache_key, 0)
+                            # ENDIF
+                            if back_frame_cache_skip == 1:
                                 # if DEBUG: print('skipped: trace_dispatch (cache hit: 1)', frame_cache_key, frame.f_lineno, event, frame.f_code.co_name)
                                 return None if event == 'call' else NO_FTRACE
                         else:
                             # if DEBUG: print('skipped: trace_dispatch (cache hit: 2)', frame_cache_key, frame.f_lineno, event, frame.f_code.co_name)
                             return None if event == 'call' else NO_FTRACE
 
+            # IFDEF CYTHON
+            # if frame_cache_key is None:
+            #     frame_cache_key = (frame.f_code.co_firstlineno, frame.f_code.co_name, frame.f_code.co_filename)
+            # ENDIF
+
             try:
                 # Make fast path faster!
                 abs_path_real_path_and_base = NORM_PATHS_AND_BASE_CONTAINER[frame.f_code.co_filename]
@@ -432,15 +611,24 @@ class ThreadTracer(object):
                     if not py_db.in_project_scope(frame, abs_path_real_path_and_base[0]):
                         # if DEBUG: print('skipped: trace_dispatch (not in scope)', abs_path_real_path_and_base[-1], frame.f_lineno, event, frame.f_code.co_name, file_type)
                         cache_skips[frame_cache_key] = 1
+                        # IFDEF CYTHON
+                        # _set_code_cache_skip(frame.f_code, 1, None)
+                        # ENDIF
                         return None if event == 'call' else NO_FTRACE
                 else:
                     # if DEBUG: print('skipped: trace_dispatch', abs_path_real_path_and_base[-1], frame.f_lineno, event, frame.f_code.co_name, file_type)
                     cache_skips[frame_cache_key] = 1
+                    # IFDEF CYTHON
+                    # _set_code_cache_skip(frame.f_code, 1, None)
+                    # ENDIF
                     return None if event == 'call' else NO_FTRACE
 
             if py_db.is_files_filter_enabled:
                 if py_db.apply_files_filter(frame, filename, False):
                     cache_skips[frame_cache_key] = 1
+                    # IFDEF CYTHON
+                    # _set_code_cache_skip(frame.f_code, 1, None)
+                    # ENDIF
 
                     if is_stepping and additional_info.pydev_original_step_cmd in (CMD_STEP_INTO, CMD_STEP_INTO_MY_CODE) and not _global_notify_skipped_step_in:
                         notify_skipped_step_in_because_of_filters(py_db, frame)
@@ -453,6 +641,9 @@ class ThreadTracer(object):
                         if py_db.apply_files_filter(back_frame, back_frame.f_code.co_filename, False):
                             back_frame_cache_key = (back_frame.f_code.co_firstlineno, back_frame.f_code.co_name, back_frame.f_code.co_filename)
                             cache_skips[back_frame_cache_key] = 1
+                            # IFDEF CYTHON
+                            # _set_code_cache_skip(back_frame.f_code, 1, None)
+                            # ENDIF
                             # if DEBUG: print('skipped: trace_dispatch (filtered out: 1)', frame_cache_key, frame.f_lineno, event, frame.f_code.co_name)
                             return None if event == 'call' else NO_FTRACE
                     else:
@@ -472,6 +663,9 @@ class ThreadTracer(object):
                 # 1 means skipped because of filters.
                 # 2 means skipped because no breakpoints were hit.
                 cache_skips[frame_cache_key] = 2
+                # IFDEF CYTHON
+                # _set_code_cache_skip(frame.f_code, 2, filename)
+                # ENDIF
                 return None if event == 'call' else NO_FTRACE
 
             # IFDEF CYTHON
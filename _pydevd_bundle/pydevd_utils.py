@@ -1,6 +1,6 @@
 from __future__ import nested_scopes
 import traceback
-import warnings
+import types
 from _pydev_bundle import pydev_log
 
 try:
@@ -24,12 +24,8 @@ def save_main_module(file, module_name):
     sys.modules[module_name] = sys.modules['__main__']
     sys.modules[module_name].__name__ = module_name
 
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", category=DeprecationWarning)
-        warnings.simplefilter("ignore", category=PendingDeprecationWarning)
-        from imp import new_module
-
-    m = new_module('__main__')
+    # Note: the `imp` module (which provided `new_module`) is no longer available on Python 3.12.
+    m = types.ModuleType('__main__')
     sys.modules['__main__'] = m
     if hasattr(sys.modules[module_name], '__loader__'):
         m.__loader__ = getattr(sys.modules[module_name], '__loader__')
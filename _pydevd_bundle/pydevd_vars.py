@@ -1,11 +1,14 @@
 """ pydevd_vars deals with variables:
     resolution/conversion to XML.
 """
+import base64
 import pickle
 from _pydevd_bundle.pydevd_constants import get_frame, get_current_thread_id, xrange, IS_PY2, \
-    iter_chars
+    iter_chars, MAXIMUM_VARIABLE_REPRESENTATION_SIZE
 
-from _pydevd_bundle.pydevd_xml import ExceptionOnEvaluate, get_type, var_to_xml
+from _pydevd_bundle.pydevd_xml import ExceptionOnEvaluate, get_type, var_to_xml, \
+    get_cached_value_info, make_valid_xml_value, get_variable_details
+from _pydev_bundle.pydev_imports import quote
 from _pydev_bundle import pydev_log
 import codecs
 import os
@@ -21,6 +24,7 @@ import traceback
 from _pydevd_bundle import pydevd_save_locals
 from _pydev_bundle.pydev_imports import Exec, execfile
 from _pydevd_bundle.pydevd_utils import to_string
+from _pydevd_bundle.pydevd_code_cache import get_compiled_code_cache
 
 SENTINEL_VALUE = []
 
@@ -191,6 +195,7 @@ def custom_operation(dbg, thread_id, frame_id, scope, attrs, style, code_or_file
     operation_fn_name: the name of the operation to execute after the exec (i.e.: pprint)
     """
     expressionValue = getVariable(dbg, thread_id, frame_id, scope, attrs)
+    dbg.suspended_frames_manager.clear_value_repr_caches()
 
     try:
         namespace = {'__name__': '<custom_operation>'}
@@ -250,10 +255,25 @@ def _expression_to_evaluate(expression):
     return expression
 
 
+def compile_expression(expression, mode):
+    '''
+    Compiles an expression received from the client (the code is kept in the compiled code cache,
+    so, an expression which was already compiled for the same mode isn't compiled again).
+
+    :param str mode:
+        The compile mode ('eval' or 'exec').
+
+    :raise:
+        The exception raised when compiling the expression if it's not valid for the given mode.
+    '''
+    return get_compiled_code_cache().get_code(
+        (expression, mode), lambda: compile(_expression_to_evaluate(expression), '<string>', mode))
+
+
 def eval_in_context(expression, globals, locals):
     result = None
     try:
-        result = eval(_expression_to_evaluate(expression), globals, locals)
+        result = eval(compile_expression(expression, 'eval'), globals, locals)
     except Exception:
         s = StringIO()
         traceback.print_exc(file=s)
@@ -315,9 +335,9 @@ def evaluate_expression(dbg, frame, expression, is_exec):
             try:
                 # try to make it an eval (if it is an eval we can print it, otherwise we'll exec it and
                 # it will have whatever the user actually did)
-                compiled = compile(_expression_to_evaluate(expression), '<string>', 'eval')
+                compiled = compile_expression(expression, 'eval')
             except:
-                Exec(_expression_to_evaluate(expression), updated_globals, frame.f_locals)
+                Exec(compile_expression(expression, 'exec'), updated_globals, frame.f_locals)
                 pydevd_save_locals.save_locals(frame)
             else:
                 result = eval(compiled, updated_globals, frame.f_locals)
@@ -344,6 +364,9 @@ def change_attr_expression(frame, attr, expression, dbg, value=SENTINEL_VALUE):
     if frame is None:
         return
 
+    # The representations of the changed value (and of its containers) must be recomputed.
+    dbg.suspended_frames_manager.clear_value_repr_caches()
+
     try:
         expression = expression.replace('@LINE@', '\n')
 
@@ -383,26 +406,40 @@ MAXIMUM_ARRAY_SIZE = 100
 MAX_SLICE_SIZE = 1000
 
 
-def table_like_struct_to_xml(array, name, roffset, coffset, rows, cols, format):
+def table_like_struct_to_xml(array, name, roffset, coffset, rows, cols, format, binary=False, value_repr_cache=None):
+    '''
+    :param bool binary:
+        If True, the contents of the slice requested are sent as raw buffers (base64-encoded)
+        instead of a var for each cell (see: array_to_binary_xml).
+
+    :param ValueReprCache value_repr_cache:
+        If given, the bounds of the array (or of the DataFrame columns) are kept in it (so,
+        they're computed only once while threads are suspended).
+    '''
     _, type_name, _ = get_type(array)
     if type_name == 'ndarray':
-        array, metaxml, r, c, f = array_to_meta_xml(array, name, format)
+        array, metaxml, r, c, f = array_to_meta_xml(array, name, format, value_repr_cache)
         xml = metaxml
         format = '%' + f
         if rows == -1 and cols == -1:
             rows = r
             cols = c
-        xml += array_to_xml(array, roffset, coffset, rows, cols, format)
+        if binary:
+            xml += array_to_binary_xml(array, roffset, coffset, rows, cols)
+        else:
+            xml += array_to_xml(array, roffset, coffset, rows, cols, format)
     elif type_name == 'DataFrame':
-        xml = dataframe_to_xml(array, name, roffset, coffset, rows, cols, format)
+        if binary:
+            xml = dataframe_to_binary_xml(array, name, roffset, coffset, rows, cols, format, value_repr_cache)
+        else:
+            xml = dataframe_to_xml(array, name, roffset, coffset, rows, cols, format, value_repr_cache)
     else:
         raise VariableError("Do not know how to convert type %s to table" % (type_name))
 
     return "<xml>%s</xml>" % xml
 
 
-def array_to_xml(array, roffset, coffset, rows, cols, format):
-    xml = ""
+def _slice_array(array, roffset, coffset, rows, cols):
     rows = min(rows, MAXIMUM_ARRAY_SIZE)
     cols = min(cols, MAXIMUM_ARRAY_SIZE)
 
@@ -422,8 +459,29 @@ def array_to_xml(array, roffset, coffset, rows, cols, format):
         elif coffset == 0 and cols == 1:
             array = array[roffset:]
             rows = min(rows, len(array))
+    return array, rows, cols
+
+
+def array_to_xml(array, roffset, coffset, rows, cols, format):
+    array, rows, cols = _slice_array(array, roffset, coffset, rows, cols)
+    xml = "<arraydata rows=\"%s\" cols=\"%s\"/>" % (rows, cols)
+
+    window = _get_array_window(array, rows, cols, format)
+    if window is not None:
+        try:
+            window_xml = _array_window_to_xml(window, format)
+        except Exception:
+            # Let the error (if any) be reported when formatting each cell.
+            pydev_log.debug('Unable to format the array window with numpy (formatting each cell).')
+            window_xml = None
+        if window_xml is not None:
+            return xml + window_xml
 
-    xml += "<arraydata rows=\"%s\" cols=\"%s\"/>" % (rows, cols)
+    return xml + _array_cells_to_xml(array, rows, cols, format)
+
+
+def _array_cells_to_xml(array, rows, cols, format):
+    xml = ''
     for row in xrange(rows):
         xml += "<row index=\"%s\"/>" % to_string(row)
         for col in xrange(cols):
@@ -446,7 +504,155 @@ def array_to_xml(array, roffset, coffset, rows, cols, format):
     return xml
 
 
-def array_to_meta_xml(array, name, format):
+def _can_format_with_numpy(dtype, format):
+    '''
+    :return bool:
+        Whether numpy.char.mod(format, values) provides the same strings as `format % value` for
+        each value of the given dtype.
+    '''
+    kind = dtype.kind
+    if kind not in 'biufcSUO':
+        return False
+
+    if kind in 'fc' and format[-1:] in ('s', 'r', 'a') and dtype.itemsize != (8 if kind == 'f' else 16):
+        # numpy.char.mod formats the cells converted to python floats/complex numbers, which have a
+        # str() different from the numpy scalar for other sizes.
+        return False
+    return True
+
+
+def _get_array_window(array, rows, cols, format):
+    '''
+    :return ndarray|None:
+        A 2d array with the cells which _array_cells_to_xml would format (or None if the cells
+        can't be formatted with _array_window_to_xml).
+    '''
+    if not _can_format_with_numpy(array.dtype, format):
+        return None
+
+    ndim = len(array.shape)
+    if ndim == 2 and rows > 1 and cols > 1:
+        window = array[:rows, :cols]
+    elif ndim == 1 and (rows == 1) != (cols == 1):
+        window = array[:rows * cols].reshape(rows, cols)
+    else:
+        return None
+
+    if window.shape != (rows, cols):
+        return None
+    return window
+
+
+def _array_window_to_xml(window, format):
+    '''
+    Provides the same xml as _array_cells_to_xml, but formats all the cells with numpy (instead of
+    calling var_to_xml for each cell).
+
+    :return str|None:
+        The xml for the rows or None if some cell can't be formatted this way.
+    '''
+    import numpy
+    return _formatted_rows_to_xml(numpy.char.mod(format, window).tolist(), '<row index="%s"/>')
+
+
+def _formatted_rows_to_xml(formatted_rows, row_header):
+    '''
+    Creates the same xml that var_to_xml would create for each of the (already formatted) cells,
+    but with a single quote() for each row.
+
+    :param list(list(str)) formatted_rows:
+        The formatted cells of each row.
+
+    :param str row_header:
+        The xml which starts each row (with a placeholder for the row index).
+
+    :return str|None:
+        The xml for the rows or None if some cell can't be converted this way.
+    '''
+    # The value which var_to_xml provides for a str is '<type name>: <str>'.
+    cell_type = str
+    value_prefix = get_variable_details(cell_type())[-1]
+
+    cell_prefix = '<var name="" type="%s" qualifier="%s" value="' % (
+        make_valid_xml_value(cell_type.__name__), make_valid_xml_value(cell_type.__module__))
+    cell_separator = '" />\n' + cell_prefix
+
+    xml = []
+    for row, row_values in enumerate(formatted_rows):
+        if not row_values:
+            return None
+        if len(value_prefix) + max(map(len, row_values)) > MAXIMUM_VARIABLE_REPRESENTATION_SIZE:
+            return None  # The value must be trimmed in var_to_xml.
+
+        # The cells are joined with '\0', which quote() converts to '%00' (this can't happen for
+        # other contents as '%' is converted to '%25').
+        joined = value_prefix + ('\0' + value_prefix).join(row_values)
+        if joined.__class__ != cell_type or joined.count('\0') != len(row_values) - 1:
+            return None
+        row_xml = make_valid_xml_value(quote(joined, '/>_= ')).replace('%00', cell_separator)
+
+        xml.append(row_header % (row,))
+        xml.append(cell_prefix + row_xml + '" />\n')
+    return ''.join(xml)
+
+
+def array_to_binary_xml(array, roffset, coffset, rows, cols):
+    '''
+    Provides the contents of the requested slice of the array as a raw buffer:
+
+    <arraydata rows="2" cols="3" encoding="base64" data="...">
+    <buffer index="0" dtype="&lt;f8" shape="2,3" strides="24,8" offset="0" nbytes="48"/>
+    </arraydata>
+    '''
+    array, rows, cols = _slice_array(array, roffset, coffset, rows, cols)
+    if len(array.shape) == 2:
+        window = array[:rows, :cols]
+    else:
+        window = array.reshape(-1)[:rows * cols].reshape(rows, cols)
+    return _buffers_to_xml(rows, cols, [window])
+
+
+def _buffers_to_xml(rows, cols, arrays):
+    '''
+    :param list(ndarray) arrays:
+        The arrays to be sent. Their contents are sent as little-endian C-contiguous buffers
+        (concatenated in a single base64-encoded data attribute). Arrays with python objects (or
+        other dtypes which can't be sent as raw buffers) are sent as unicode strings.
+    '''
+    import numpy
+
+    xml = []
+    contents = []
+    offset = 0
+    for i, array in enumerate(arrays):
+        array = numpy.asarray(array)
+        if array.dtype.kind in 'OV':
+            array = array.astype(numpy.unicode_ if IS_PY2 else str)
+        array = numpy.ascontiguousarray(array)
+        if array.dtype.byteorder == '>' or (array.dtype.byteorder == '=' and sys.byteorder == 'big'):
+            array = array.astype(array.dtype.newbyteorder('<'))
+
+        buf = array.tostring() if IS_PY2 else array.tobytes()
+        xml.append('<buffer index="%s" dtype="%s" shape="%s" strides="%s" offset="%s" nbytes="%s"/>\n' % (
+            i,
+            make_valid_xml_value(array.dtype.str),
+            ','.join(str(dim) for dim in array.shape),
+            ','.join(str(stride) for stride in array.strides),
+            offset,
+            len(buf),
+        ))
+        contents.append(buf)
+        offset += len(buf)
+
+    data = base64.b64encode(b''.join(contents))
+    if not IS_PY2:
+        data = data.decode('ascii')
+    return '<arraydata rows="%s" cols="%s" encoding="base64" data="%s">\n%s</arraydata>\n' % (
+        rows, cols, data, ''.join(xml))
+
+
+def array_to_meta_xml(array, name, format, value_repr_cache=None):
+    original_array = array
     type = array.dtype.kind
     slice = name
     l = len(array.shape)
@@ -502,13 +708,15 @@ def array_to_meta_xml(array, name, format):
 
     bounds = (0, 0)
     if type in "biufc":
-        bounds = (array.min(), array.max())
+        # The bounds are computed only once for each array while the thread is suspended.
+        bounds = get_cached_value_info(
+            original_array, ('array_bounds', slice), lambda: (array.min(), array.max()), value_repr_cache)
     xml = '<array slice=\"%s\" rows=\"%s\" cols=\"%s\" format=\"%s\" type=\"%s\" max=\"%s\" min=\"%s\"/>' % \
           (slice, rows, cols, format, type, bounds[1], bounds[0])
     return array, xml, rows, cols, format
 
 
-def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
+def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format, value_repr_cache=None):
     """
     :type df: pandas.core.frame.DataFrame
     :type name: str
@@ -520,6 +728,69 @@ def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
 
 
     """
+    df, xml, col_formats = _dataframe_to_header_xml(df, name, roffset, coffset, rows, cols, format, value_repr_cache)
+    rows, cols = df.shape
+
+    xml += "<arraydata rows=\"%s\" cols=\"%s\"/>\n" % (rows, cols)
+    try:
+        cells_xml = _dataframe_columns_to_xml(df, col_formats)
+    except Exception:
+        # Let the error (if any) be reported when formatting each cell.
+        pydev_log.debug('Unable to format the DataFrame columns with numpy (formatting each cell).')
+        cells_xml = None
+    if cells_xml is not None:
+        return xml + cells_xml
+
+    for row in xrange(rows):
+        xml += "<row index=\"%s\"/>\n" % str(row)
+        for col in xrange(cols):
+            value = df.iat[row, col]
+            value = col_formats[col] % value
+            xml += var_to_xml(value, '')
+    return xml
+
+
+def _dataframe_columns_to_xml(df, col_formats):
+    '''
+    Provides the same xml as formatting each cell of the DataFrame, but formats each column at
+    once with numpy (when possible).
+
+    :return str|None:
+        The xml for the rows or None if the cells can't be formatted this way.
+    '''
+    import numpy
+    columns = []
+    for col, col_format in enumerate(col_formats):
+        values = numpy.asarray(df.iloc[:, col].values)
+        if _can_format_with_numpy(values.dtype, col_format):
+            columns.append(numpy.char.mod(col_format, values).tolist())
+        else:
+            columns.append([col_format % df.iat[row, col] for row in xrange(len(values))])
+
+    if not columns:
+        return None
+    return _formatted_rows_to_xml(list(zip(*columns)), '<row index="%s"/>\n')
+
+
+def dataframe_to_binary_xml(df, name, roffset, coffset, rows, cols, format, value_repr_cache=None):
+    """
+    Same as dataframe_to_xml, but the contents of the requested slice are sent as a raw buffer
+    for each column (numeric columns are sent directly from their underlying arrays).
+    """
+    df, xml, _col_formats = _dataframe_to_header_xml(df, name, roffset, coffset, rows, cols, format, value_repr_cache)
+    rows, cols = df.shape
+
+    xml += _buffers_to_xml(rows, cols, [df.iloc[:, col].values for col in xrange(cols)])
+    return xml
+
+
+def _dataframe_to_header_xml(df, name, roffset, coffset, rows, cols, format, value_repr_cache=None):
+    '''
+    :return tuple(DataFrame, str, list(str)):
+        The slice of the DataFrame requested, the xml with its meta and header data and the
+        format for each column.
+    '''
+    original_df = df
     num_rows = min(df.shape[0], MAX_SLICE_SIZE)
     num_cols = min(df.shape[1], MAX_SLICE_SIZE)
     if (num_rows, num_cols) != df.shape:
@@ -537,14 +808,15 @@ def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
     rows = min(rows, MAXIMUM_ARRAY_SIZE)
     cols = min(min(cols, MAXIMUM_ARRAY_SIZE), num_cols)
     # need to precompute column bounds here before slicing!
+    # Note: the bounds of a column are only computed when it's first shown and are kept while
+    # the thread is suspended (so, scrolling doesn't recompute them).
+    columns_bounds = get_cached_value_info(
+        original_df, ('dataframe_columns_bounds', num_rows, num_cols), dict, value_repr_cache)
     col_bounds = [None] * cols
     for col in xrange(cols):
-        dtype = df.dtypes.iloc[coffset + col].kind
-        if dtype in "biufc":
-            cvalues = df.iloc[:, coffset + col]
-            bounds = (cvalues.min(), cvalues.max())
-        else:
-            bounds = (0, 0)
+        bounds = columns_bounds.get(coffset + col)
+        if bounds is None:
+            bounds = columns_bounds[coffset + col] = _get_dataframe_column_bounds(df, coffset + col)
         col_bounds[col] = bounds
 
     df = df.iloc[roffset: roffset + rows, coffset: coffset + cols]
@@ -556,8 +828,10 @@ def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
 
     get_label = lambda label: str(label) if not isinstance(label, tuple) else '/'.join(map(str, label))
 
+    dtypes = df.dtypes
+    labels = df.axes[1].values
     for col in xrange(cols):
-        dtype = df.dtypes.iloc[col].kind
+        dtype = dtypes.iloc[col].kind
         if dtype == 'f' and format:
             fmt = format
         elif dtype == 'f':
@@ -570,16 +844,17 @@ def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
         bounds = col_bounds[col]
 
         xml += '<colheader index=\"%s\" label=\"%s\" type=\"%s\" format=\"%s\" max=\"%s\" min=\"%s\" />\n' % \
-               (str(col), get_label(df.axes[1].values[col]), dtype, fmt, bounds[1], bounds[0])
+               (str(col), get_label(labels[col]), dtype, fmt, bounds[1], bounds[0])
     for row, label in enumerate(iter(df.axes[0])):
         xml += "<rowheader index=\"%s\" label = \"%s\"/>\n" % \
                (str(row), get_label(label))
     xml += "</headerdata>\n"
-    xml += "<arraydata rows=\"%s\" cols=\"%s\"/>\n" % (rows, cols)
-    for row in xrange(rows):
-        xml += "<row index=\"%s\"/>\n" % str(row)
-        for col in xrange(cols):
-            value = df.iat[row, col]
-            value = col_formats[col] % value
-            xml += var_to_xml(value, '')
-    return xml
+    return df, xml, col_formats
+
+
+def _get_dataframe_column_bounds(df, col):
+    dtype = df.dtypes.iloc[col].kind
+    if dtype in "biufc":
+        cvalues = df.iloc[:, col]
+        return (cvalues.min(), cvalues.max())
+    return (0, 0)
@@ -2,9 +2,10 @@ from _pydev_bundle import pydev_log
 from _pydevd_bundle import pydevd_extension_utils
 from _pydevd_bundle import pydevd_resolver
 import sys
+import time
 from _pydevd_bundle.pydevd_constants import dict_iter_items, dict_keys, IS_PY3K, \
     BUILTINS_MODULE_NAME, MAXIMUM_VARIABLE_REPRESENTATION_SIZE, RETURN_VALUES_DICT, LOAD_VALUES_ASYNC, \
-    DEFAULT_VALUE
+    DEFAULT_VALUE, VALUE_RENDER_TIME_BUDGET_SEC, VALUE_RENDER_SIZE_BUDGET
 from _pydev_bundle.pydev_imports import quote
 from _pydevd_bundle.pydevd_extension_api import TypeResolveProvider, StrPresentationProvider
 from _pydevd_bundle.pydevd_utils import isinstance_checked, hasattr_checked
@@ -141,8 +142,9 @@ class TypeResolveHandler(object):
         return self._get_type(o, type_object, type_name)
 
     def _get_type(self, o, type_object, type_name):
-        resolver = self._type_to_resolver_cache.get(type_object)
-        if resolver is not None:
+        # Note: the resolver cached may be None (i.e.: int, str), so, a sentinel is needed.
+        resolver = self._type_to_resolver_cache.get(type_object, self.NO_PROVIDER)
+        if resolver is not self.NO_PROVIDER:
             return type_object, type_name, resolver
 
         if not self._initialized:
@@ -223,8 +225,55 @@ def is_builtin(x):
     return getattr(x, '__module__', None) == BUILTINS_MODULE_NAME
 
 
+def is_fast_to_render(val):
+    return is_builtin(type(val)) and not isinstance_checked(val, (list, tuple, dict))
+
+
 def should_evaluate_full_value(val):
-    return not LOAD_VALUES_ASYNC or (is_builtin(type(val)) and not isinstance_checked(val, (list, tuple, dict)))
+    return not LOAD_VALUES_ASYNC or is_fast_to_render(val)
+
+
+# The value shown when the time budget to render the values was exceeded (when LOAD_VALUES_ASYNC is
+# set, DEFAULT_VALUE is used instead so that the value is loaded asynchronously).
+TIME_BUDGET_EXCEEDED_VALUE = '<not rendered: time budget exceeded>'
+
+
+class RenderBudget(object):
+    '''
+    The budget to render the values of the variables in a single request.
+
+    Values requested after the time is over are not rendered (unless they're fast to render or
+    their representation is already cached) and values bigger than `max_size` are truncated.
+
+    After a value is rendered, `last_value_truncated` tells whether it was truncated (or not
+    rendered at all) because of the budget (so that the client can be told that the full value
+    may still be requested).
+    '''
+
+    def __init__(self, max_time=VALUE_RENDER_TIME_BUDGET_SEC, max_size=VALUE_RENDER_SIZE_BUDGET):
+        self.last_value_truncated = False
+
+        if max_time > 0:
+            self._timeout = time.time() + max_time
+        else:
+            self._timeout = None
+
+        if max_size > 0:
+            self.max_size = max_size
+        else:
+            self.max_size = None
+
+    def get_remaining_time(self):
+        '''
+        :return float|None:
+            The time remaining (or None if there's no time limit).
+        '''
+        if self._timeout is None:
+            return None
+        return max(0, self._timeout - time.time())
+
+    def is_time_exceeded(self):
+        return self._timeout is not None and time.time() > self._timeout
 
 
 def return_values_from_dict_to_xml(return_dict):
@@ -234,11 +283,15 @@ def return_values_from_dict_to_xml(return_dict):
     return res
 
 
-def frame_vars_to_xml(frame_f_locals, hidden_ns=None):
+def frame_vars_to_xml(frame_f_locals, hidden_ns=None, value_repr_cache=None):
     """ dumps frame variables to XML
     <var name="var_name" scope="local" type="type" value="value"/>
+
+    :param ValueReprCache value_repr_cache:
+        If given, the representations are kept in it (and reused while threads are suspended).
     """
     xml = ""
+    budget = RenderBudget()
 
     keys = dict_keys(frame_f_locals)
     if hasattr(keys, 'sort'):
@@ -260,9 +313,11 @@ def frame_vars_to_xml(frame_f_locals, hidden_ns=None):
             else:
                 if hidden_ns is not None and k in hidden_ns:
                     xml += var_to_xml(v, str(k), additional_in_xml=' isIPythonHidden="True"',
-                                      evaluate_full_value=eval_full_val)
+                                      evaluate_full_value=eval_full_val, budget=budget,
+                                      value_repr_cache=value_repr_cache)
                 else:
-                    xml += var_to_xml(v, str(k), evaluate_full_value=eval_full_val)
+                    xml += var_to_xml(v, str(k), evaluate_full_value=eval_full_val, budget=budget,
+                                      value_repr_cache=value_repr_cache)
         except Exception:
             pydev_log.exception("Unexpected error, recovered safely.")
 
@@ -270,7 +325,14 @@ def frame_vars_to_xml(frame_f_locals, hidden_ns=None):
     return return_values_xml + xml
 
 
-def get_variable_details(val, evaluate_full_value=True, to_string=None):
+def get_variable_details(val, evaluate_full_value=True, to_string=None, budget=None, value_repr_cache=None):
+    '''
+    :param RenderBudget budget:
+        If given, the value may not be rendered (or may be truncated) if the budget is exceeded.
+
+    :param ValueReprCache value_repr_cache:
+        If given, the representation is kept in it (and reused while threads are suspended).
+    '''
     try:
         # This should be faster than isinstance (but we have to protect against not having a '__class__' attribute).
         is_exception_on_eval = val.__class__ == ExceptionOnEvaluate
@@ -284,48 +346,157 @@ def get_variable_details(val, evaluate_full_value=True, to_string=None):
 
     _type, type_name, resolver = get_type(v)
     type_qualifier = getattr(_type, "__module__", "")
+    if budget is not None:
+        budget.last_value_truncated = False
+
     if not evaluate_full_value:
         value = DEFAULT_VALUE
     else:
-        try:
-            str_from_provider = _str_from_providers(v, _type, type_name)
-            if str_from_provider is not None:
-                value = str_from_provider
-
-            elif to_string is not None:
-                value = to_string(v)
-
-            elif hasattr_checked(v, '__class__'):
-                if v.__class__ == frame_type:
-                    value = pydevd_resolver.frameResolver.get_frame_name(v)
-
-                elif v.__class__ in (list, tuple):
-                    if len(v) > 300:
-                        value = '%s: %s' % (str(v.__class__), '<Too big to print. Len: %s>' % (len(v),))
-                    else:
-                        value = '%s: %s' % (str(v.__class__), v)
-                else:
-                    try:
-                        cName = str(v.__class__)
-                        if cName.find('.') != -1:
-                            cName = cName.split('.')[-1]
+        value = _get_value_repr(v, _type, type_name, to_string, budget, value_repr_cache)
+
+    return type_name, type_qualifier, is_exception_on_eval, resolver, value
+
+
+class ValueReprCache(object):
+    '''
+    Keeps the representations of values (and other info computed from them, such as the bounds
+    of an array shown in the array viewer) while threads are suspended.
+
+    It's owned by the _FramesTracker of a suspension (see: _FramesTracker.get_value_repr_cache),
+    which clears it when a thread is resumed or some code which may change values is evaluated.
+    '''
+
+    # When the cache has more entries than this it's cleared.
+    MAX_SIZE = 5000
+
+    def __init__(self):
+        # (id(value), key) -> tuple(value, info)
+        # Note: the value is kept alive so that its id isn't reused while it's in the cache.
+        self._cache = {}
+
+    def get(self, v, key, default=None):
+        entry = self._cache.get((id(v), key))
+        if entry is not None and entry[0] is v:
+            return entry[1]
+        return default
 
-                        elif cName.find("'") != -1:  # does not have '.' (could be something like <type 'int'>)
-                            cName = cName[cName.index("'") + 1:]
+    def set(self, v, key, info):
+        if len(self._cache) >= self.MAX_SIZE:
+            self._cache.clear()
+        self._cache[(id(v), key)] = (v, info)
 
-                        if cName.endswith("'>"):
-                            cName = cName[:-2]
-                    except:
-                        cName = str(v.__class__)
+    def clear(self):
+        self._cache.clear()
 
-                    value = '%s: %s' % (cName, v)
+    def __len__(self):
+        return len(self._cache)
+
+
+_NOT_CACHED = object()
+
+
+def get_cached_value_info(v, info_key, compute_info, value_repr_cache=None):
+    '''
+    Provides some info computed from a value (such as the bounds of an array shown in the array
+    viewer).
+
+    :param tuple info_key:
+        Identifies the info requested (must not clash with the SafeRepr options keys).
+
+    :param callable compute_info:
+        Called to compute the info if it's not cached.
+
+    :param ValueReprCache value_repr_cache:
+        If given, the info is kept in it (so, it's computed only once while threads are
+        suspended).
+    '''
+    if value_repr_cache is None:
+        return compute_info()
+
+    info = value_repr_cache.get(v, info_key, _NOT_CACHED)
+    if info is _NOT_CACHED:
+        info = compute_info()
+        value_repr_cache.set(v, info_key, info)
+    return info
+
+
+def _get_value_repr(v, _type, type_name, to_string, budget=None, value_repr_cache=None):
+    options_key = None
+    if value_repr_cache is not None and to_string is not None:
+        get_options_key = getattr(to_string, 'get_options_key', None)
+        if get_options_key is None:
+            value_repr_cache = None  # Unknown options: don't cache.
+        else:
+            options_key = get_options_key()
+
+    if value_repr_cache is not None:
+        value = value_repr_cache.get(v, options_key)
+        if value is not None:
+            return value
+
+    if budget is not None:
+        if budget.is_time_exceeded() and not is_fast_to_render(v):
+            budget.last_value_truncated = True
+            return DEFAULT_VALUE if LOAD_VALUES_ASYNC else TIME_BUDGET_EXCEEDED_VALUE
+
+        value = _create_value_repr(v, _type, type_name, to_string)
+        truncated = getattr(to_string, 'truncated', False)
+        if budget.max_size is not None and len(value) > budget.max_size:
+            value = value[:budget.max_size] + '...'
+            truncated = True
+
+        if truncated:
+            # Don't cache it (a full representation may still be requested afterwards).
+            budget.last_value_truncated = True
+            return value
+    else:
+        value = _create_value_repr(v, _type, type_name, to_string)
+
+    if value_repr_cache is not None:
+        value_repr_cache.set(v, options_key, value)
+    return value
+
+
+def _create_value_repr(v, _type, type_name, to_string):
+    try:
+        str_from_provider = _str_from_providers(v, _type, type_name)
+        if str_from_provider is not None:
+            value = str_from_provider
+
+        elif to_string is not None:
+            value = to_string(v)
+
+        elif hasattr_checked(v, '__class__'):
+            if v.__class__ == frame_type:
+                value = pydevd_resolver.frameResolver.get_frame_name(v)
+
+            elif v.__class__ in (list, tuple):
+                if len(v) > 300:
+                    value = '%s: %s' % (str(v.__class__), '<Too big to print. Len: %s>' % (len(v),))
+                else:
+                    value = '%s: %s' % (str(v.__class__), v)
             else:
-                value = str(v)
+                try:
+                    cName = str(v.__class__)
+                    if cName.find('.') != -1:
+                        cName = cName.split('.')[-1]
+
+                    elif cName.find("'") != -1:  # does not have '.' (could be something like <type 'int'>)
+                        cName = cName[cName.index("'") + 1:]
+
+                    if cName.endswith("'>"):
+                        cName = cName[:-2]
+                except:
+                    cName = str(v.__class__)
+
+                value = '%s: %s' % (cName, v)
+        else:
+            value = str(v)
+    except:
+        try:
+            value = repr(v)
         except:
-            try:
-                value = repr(v)
-            except:
-                value = 'Unable to get repr for %s' % v.__class__
+            value = 'Unable to get repr for %s' % v.__class__
 
     # fix to work with unicode values
     try:
@@ -338,14 +509,15 @@ def get_variable_details(val, evaluate_full_value=True, to_string=None):
     except TypeError:
         pass
 
-    return type_name, type_qualifier, is_exception_on_eval, resolver, value
+    return value
 
 
-def var_to_xml(val, name, trim_if_too_big=True, additional_in_xml='', evaluate_full_value=True):
+def var_to_xml(val, name, trim_if_too_big=True, additional_in_xml='', evaluate_full_value=True, budget=None,
+               value_repr_cache=None):
     """ single variable or dictionary to xml representation """
 
     type_name, type_qualifier, is_exception_on_eval, resolver, value = get_variable_details(
-        val, evaluate_full_value)
+        val, evaluate_full_value, budget=budget, value_repr_cache=value_repr_cache)
 
     try:
         name = quote(name, '/>_= ')  # TODO: Fix PY-5834 without using quote
@@ -377,4 +549,9 @@ def var_to_xml(val, name, trim_if_too_big=True, additional_in_xml='', evaluate_f
         else:
             xml_container = ''
 
+    if budget is not None and budget.last_value_truncated:
+        # The value was truncated (or not rendered) because of the budget: the client may still
+        # request the full value (i.e.: by evaluating it).
+        xml_container += ' isTruncated="True"'
+
     return ''.join((xml, xml_qualifier, xml_value, xml_container, additional_in_xml, ' />\n'))
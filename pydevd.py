@@ -28,6 +28,7 @@ from _pydev_imps._pydev_saved_modules import time
 from _pydevd_bundle import pydevd_extension_utils, pydevd_frame_utils, pydevd_constants
 from _pydevd_bundle.pydevd_filtering import FilesFiltering
 from _pydevd_bundle import pydevd_io, pydevd_vm_type
+from _pydevd_bundle.pydevd_code_cache import get_compiled_code_cache
 from _pydevd_bundle import pydevd_utils
 from _pydev_bundle.pydev_console_utils import DebugConsoleStdIn
 from _pydevd_bundle.pydevd_additional_thread_info import set_additional_thread_info
@@ -37,10 +38,10 @@ from _pydevd_bundle.pydevd_comm_constants import (CMD_THREAD_SUSPEND, CMD_STEP_I
     CMD_SET_NEXT_STATEMENT, CMD_STEP_RETURN, CMD_ADD_EXCEPTION_BREAK, CMD_STEP_RETURN_MY_CODE,
     CMD_STEP_OVER_MY_CODE, constant_to_str, CMD_STEP_INTO_COROUTINE)
 from _pydevd_bundle.pydevd_constants import (IS_JYTH_LESS25, get_thread_id, get_current_thread_id,
-    dict_keys, dict_iter_items, DebugInfoHolder, PYTHON_SUSPEND, STATE_SUSPEND, STATE_RUN, get_frame,
+    dict_keys, dict_values, dict_iter_items, DebugInfoHolder, PYTHON_SUSPEND, STATE_SUSPEND, STATE_RUN, get_frame,
     clear_cached_thread_id, INTERACTIVE_MODE_AVAILABLE, SHOW_DEBUG_INFO_ENV, IS_PY34_OR_GREATER, IS_PY2, NULL,
     NO_FTRACE, IS_IRONPYTHON, JSON_PROTOCOL, IS_CPYTHON, HTTP_JSON_PROTOCOL, USE_CUSTOM_SYS_CURRENT_FRAMES_MAP, call_only_once,
-    ForkSafeLock)
+    ForkSafeLock, is_inherited_fd_endpoint, is_unix_socket_endpoint)
 from _pydevd_bundle.pydevd_defaults import PydevdCustomization  # Note: import alias used on pydev_monkey.
 from _pydevd_bundle.pydevd_custom_frames import CustomFramesContainer, custom_frames_container_init
 from _pydevd_bundle.pydevd_dont_trace_files import DONT_TRACE, PYDEV_FILE, LIB_FILE, DONT_TRACE_DIRS
@@ -48,19 +49,22 @@ from _pydevd_bundle.pydevd_extension_api import DebuggerEventHandler
 from _pydevd_bundle.pydevd_frame_utils import add_exception_to_frame, remove_exception_from_frame
 from _pydevd_bundle.pydevd_net_command_factory_xml import NetCommandFactory
 from _pydevd_bundle.pydevd_trace_dispatch import (
-    trace_dispatch as _trace_dispatch, global_cache_skips, global_cache_frame_skips, fix_top_level_trace_and_get_trace_func)
+    trace_dispatch as _trace_dispatch, clear_cache_skips, fix_top_level_trace_and_get_trace_func)
 from _pydevd_bundle.pydevd_utils import save_main_module, is_current_thread_main_thread
 from _pydevd_frame_eval.pydevd_frame_eval_main import (
     frame_eval_func, dummy_trace_dispatch)
+from _pydevd_bundle import pydevd_sys_monitoring
+from _pydevd_bundle.pydevd_sys_monitoring import USING_SYS_MONITORING
 import pydev_ipython  # @UnusedImport
 from _pydevd_bundle.pydevd_source_mapping import SourceMapping
+from _pydevd_bundle.pydevd_snapshots import SnapshotsBuffer
 from pydevd_concurrency_analyser.pydevd_concurrency_logger import ThreadingLogger, AsyncioLogger, send_concurrency_message, cur_time
 from pydevd_concurrency_analyser.pydevd_thread_wrappers import wrap_threads
 from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER, get_abs_path_real_path_and_base_from_file
 from pydevd_file_utils import get_fullname, rPath, get_package_dir
 import pydevd_tracing
 from _pydevd_bundle.pydevd_comm import (InternalThreadCommand, InternalThreadCommandForAnyThread,
-    create_server_socket)
+    create_server_socket, socket_from_inherited_fd)
 from _pydevd_bundle.pydevd_comm import(InternalConsoleExec,
     PyDBDaemonThread, _queue, ReaderThread, GetGlobalDebugger, get_global_debugger,
     set_global_debugger, WriterThread,
@@ -153,6 +157,39 @@ _CACHE_FILE_TYPE = {}
 pydev_log.debug('Using GEVENT_SUPPORT: %s', pydevd_constants.SUPPORT_GEVENT)
 
 
+#=======================================================================================================================
+# _InternalCommandsQueue
+#=======================================================================================================================
+class _InternalCommandsQueue(_queue.Queue):
+    '''
+    The queue with the internal commands to be processed by a thread.
+
+    A suspended thread waits on it (see: `wait_for_commands`) until a command is posted to it
+    (see: `PyDB.post_internal_command`) or it's woken up because its state may have changed
+    (i.e.: it was resumed).
+    '''
+
+    def __init__(self):
+        _queue.Queue.__init__(self)
+        self._wake_up_event = threading.Event()
+
+    def wake_up(self):
+        self._wake_up_event.set()
+
+    def wait_for_commands(self, timeout):
+        self._wake_up_event.wait(timeout)
+        self._wake_up_event.clear()
+
+
+# Threads started through pydev_monkey notify about their creation/exit when it happens, so, the
+# check of all the threads (for the ones which aren't started through it) is done just from time to time.
+_THREADS_RECONCILE_INTERVAL = 1.
+
+# A suspended thread is always woken up when needed (when a command is posted to it, when it's
+# resumed or when the debugger is disposed), so, this is just a safety net.
+_WAIT_SUSPEND_MAX_WAIT = 1.
+
+
 #=======================================================================================================================
 # PyDBCommandThread
 #=======================================================================================================================
@@ -463,7 +500,7 @@ class PyDB(object):
         self.py_db_command_thread = None
         self.quitting = None
         self.cmd_factory = NetCommandFactory()
-        self._cmd_queue = defaultdict(_queue.Queue)  # Key is thread id or '*', value is Queue
+        self._cmd_queue = defaultdict(_InternalCommandsQueue)  # Key is thread id or '*', value is _InternalCommandsQueue
         self.suspended_frames_manager = SuspendedFramesManager()
         self._files_filtering = FilesFiltering()
         self.source_mapping = SourceMapping()
@@ -478,6 +515,9 @@ class PyDB(object):
         # These are the breakpoints meant to be consumed during runtime.
         self.breakpoints = {}
 
+        # Snapshots captured by snapshot breakpoints (which don't suspend) until fetched by the client.
+        self.snapshots = SnapshotsBuffer()
+
         # Set communication protocol
         PyDevdAPI().set_protocol(self, 0, PydevdCustomization.DEFAULT_PROTOCOL)
 
@@ -530,6 +570,11 @@ class PyDB(object):
         # Note: also access '_enable_thread_notifications' with '_lock_running_thread_ids'
         self._enable_thread_notifications = False
 
+        # Threads started through pydev_monkey notify about their creation/exit themselves, so, all
+        # the threads only need to be checked from time to time (see: _reconcile_running_threads).
+        # Note: also access '_next_threads_reconcile_time' with '_lock_running_thread_ids'
+        self._next_threads_reconcile_time = 0
+
         self._set_breakpoints_with_id = False
 
         # This attribute holds the file-> lines which have an @IgnoreException.
@@ -586,6 +631,10 @@ class PyDB(object):
         self.frame_eval_func = frame_eval_func
         self.dummy_trace_dispatch = dummy_trace_dispatch
 
+        # Set to True if sys.monitoring can't be used anymore (i.e.: caught exceptions were
+        # requested or some other tool is registered as the debugger in sys.monitoring).
+        self._sys_monitoring_fallback = False
+
         # Note: this is different from pydevd_constants.thread_get_ident because we want Jython
         # to be None here because it also doesn't have threading._active.
         try:
@@ -699,7 +748,12 @@ class PyDB(object):
             if not condition:
                 return False
 
-            return eval(condition, new_frame.f_globals, new_frame.f_locals)
+            condition_code = pybreakpoint.condition_code
+            if condition_code is None:
+                # Unable to compile it: evaluate the source so that the error is reported.
+                condition_code = condition
+
+            return eval(condition_code, new_frame.f_globals, new_frame.f_locals)
         except Exception as e:
             if IS_PY2:
                 # Must be bytes on py2.
@@ -735,7 +789,10 @@ class PyDB(object):
     def handle_breakpoint_expression(self, pybreakpoint, info, new_frame):
         try:
             try:
-                val = eval(pybreakpoint.expression, new_frame.f_globals, new_frame.f_locals)
+                expression_code = pybreakpoint.expression_code
+                if expression_code is None:
+                    expression_code = pybreakpoint.expression
+                val = eval(expression_code, new_frame.f_globals, new_frame.f_locals)
             except:
                 val = sys.exc_info()[1]
         finally:
@@ -897,6 +954,15 @@ class PyDB(object):
                 pydevd_tracing.set_trace_to_threads(self.dummy_trace_dispatch)
             return
 
+        if (thread_trace_func is None or apply_to_all_threads) and self._can_use_sys_monitoring():
+            if pydevd_sys_monitoring.start_monitoring(self):
+                # The sys.monitoring callbacks are global (the tracing function only needs to be
+                # set for the current thread if it's stepping).
+                if not apply_to_all_threads:
+                    pydevd_sys_monitoring.enable_tracing_for_current_thread(self)
+                return
+            self._switch_from_sys_monitoring_to_settrace()
+
         if apply_to_all_threads:
             # If applying to all threads, don't use the local thread trace function.
             assert thread_trace_func is not None
@@ -913,24 +979,63 @@ class PyDB(object):
     def disable_tracing(self):
         pydevd_tracing.SetTrace(None)
 
-    def on_breakpoints_changed(self, removed=False):
+    def _can_use_sys_monitoring(self):
+        # Note: caught exceptions and plugin breakpoints are only available in the regular tracer.
+        return (
+            USING_SYS_MONITORING and
+            not self._sys_monitoring_fallback and
+            not self.break_on_caught_exceptions and
+            not self.has_plugin_line_breaks and
+            not self.has_plugin_exception_breaks
+        )
+
+    def _switch_from_sys_monitoring_to_settrace(self):
+        self._sys_monitoring_fallback = True
+        if not pydevd_sys_monitoring.is_monitoring_active():
+            return
+
+        pydev_log.debug('Switching from sys.monitoring to sys.settrace based tracing.')
+        pydevd_sys_monitoring.stop_monitoring()
+        try:
+            threading.settrace(self.trace_dispatch)  # for all future threads
+        except:
+            pass
+        pydevd_sys_monitoring.set_trace_to_threads(self.trace_dispatch)
+
+    def on_breakpoints_changed(self, removed=False, filename=None):
         '''
         When breakpoints change, we have to re-evaluate all the assumptions we've made so far.
+
+        :param str filename:
+            If given, only the line breakpoints of the given file were changed (so, only the
+            contexts related to that file have to be re-evaluated).
         '''
         if not self.ready_to_run:
             # No need to do anything if we're still not running.
             return
 
         self.mtime += 1
+        if pydevd_sys_monitoring.is_monitoring_active():
+            if self._can_use_sys_monitoring():
+                pydevd_sys_monitoring.restart_events(self, filename)
+                return
+            self._switch_from_sys_monitoring_to_settrace()
+            removed = False
+            filename = None
+
         if not removed:
             # When removing breakpoints we can leave tracing as was, but if a breakpoint was added
             # we have to reset the tracing for the existing functions to be re-evaluated.
-            self.set_tracing_for_untraced_contexts()
+            self.set_tracing_for_untraced_contexts(filename)
 
-    def set_tracing_for_untraced_contexts(self):
-        # Enable the tracing for existing threads (because there may be frames being executed that
-        # are currently untraced).
+    def set_tracing_for_untraced_contexts(self, filename=None):
+        '''
+        Enable the tracing for existing threads (because there may be frames being executed that
+        are currently untraced).
 
+        :param str filename:
+            If given, only frames from the given file are traced.
+        '''
         if IS_CPYTHON:
             # Note: use sys._current_frames instead of threading.enumerate() because this way
             # we also see C/C++ threads, not only the ones visible to the threading module.
@@ -943,7 +1048,10 @@ class PyDB(object):
 
             for thread_id, frame in tid_to_frame.items():
                 if thread_id not in ignore_thread_ids:
-                    self.set_trace_for_frame_and_parents(frame)
+                    if filename is None:
+                        self.set_trace_for_frame_and_parents(frame)
+                    else:
+                        self._set_trace_for_frames_from_file(frame, filename)
 
         else:
             try:
@@ -956,7 +1064,10 @@ class PyDB(object):
                     frame = additional_info.get_topmost_frame(t)
                     try:
                         if frame is not None:
-                            self.set_trace_for_frame_and_parents(frame)
+                            if filename is None:
+                                self.set_trace_for_frame_and_parents(frame)
+                            else:
+                                self._set_trace_for_frames_from_file(frame, filename)
                     finally:
                         frame = None
             finally:
@@ -1206,11 +1317,20 @@ class PyDB(object):
 
         time.sleep(0.1)  # give threads time to start
 
-    def connect(self, host, port):
-        if host:
+    def connect(self, host, port, server=False):
+        '''
+        :param host:
+            The host to connect to, a `unix:/path/to/socket` endpoint or an inherited
+            `fd:<file descriptor>` endpoint (in which case the socket is used as is).
+
+        :param server:
+            If True and the host is a `unix:/path/to/socket` endpoint we listen at it instead of
+            connecting to it (for any other host it's ignored and we connect to it as usual).
+        '''
+        if host and not (server and is_unix_socket_endpoint(host)):
             s = start_client(host, port)
         else:
-            s = start_server(port)
+            s = start_server(port, host or '')
 
         self.initialize_network(s)
 
@@ -1245,6 +1365,16 @@ class PyDB(object):
             host = SetupHolder.setup['client']
             port = SetupHolder.setup['port']
 
+            if is_inherited_fd_endpoint(host):
+                # The connection is already available (there's nothing to listen to).
+                self.py_db._server_socket_name = host
+                self.py_db.set_server_socket_ready()
+                try:
+                    self.py_db.initialize_network(socket_from_inherited_fd(host), terminate_on_socket_close=False)
+                except:
+                    pydev_log.exception('Error using inherited socket: %s', host)
+                return
+
             self._server_socket = create_server_socket(host=host, port=port)
             self.py_db._server_socket_name = self._server_socket.getsockname()
             self.py_db.set_server_socket_ready()
@@ -1299,14 +1429,28 @@ class PyDB(object):
         else:
             internal_cmd = InternalThreadCommand(thread_id, method, *args, **kwargs)
         self.post_internal_command(internal_cmd, thread_id)
-        if thread_id == '*':
-            # Notify so that the command is handled as soon as possible.
-            self._py_db_command_thread_event.set()
 
     def post_internal_command(self, int_cmd, thread_id):
         """ if thread_id is *, post to the '*' queue"""
         queue = self.get_internal_queue(thread_id)
         queue.put(int_cmd)
+        if thread_id == '*':
+            # Notify so that the command is handled as soon as possible.
+            self._py_db_command_thread_event.set()
+        else:
+            # Wake up the thread if it's suspended waiting for commands.
+            queue.wake_up()
+
+    def wake_up_thread(self, thread_id):
+        '''
+        Wakes up the given thread if it's suspended waiting for commands (so that it checks
+        whether its state changed -- i.e.: it was resumed).
+        '''
+        self.get_internal_queue(thread_id).wake_up()
+
+    def _wake_up_all_threads(self):
+        for queue in list(dict_values(self._cmd_queue)):
+            queue.wake_up()
 
     def enable_output_redirection(self, redirect_stdout, redirect_stderr):
         global _global_redirect_stdout_to_server
@@ -1383,6 +1527,23 @@ class PyDB(object):
     def notify_skipped_step_in_because_of_filters(self, frame):
         self.writer.add_command(self.cmd_factory.make_skipped_step_in_because_of_filters(self, frame))
 
+    def are_all_threads_suspended(self):
+        '''
+        :return bool:
+            True if all the threads of the program are suspended (so, no thread may change the
+            values being inspected).
+        '''
+        with self._lock_running_thread_ids:
+            threads = list(dict_values(self._running_thread_ids))
+
+        if not threads:
+            return False  # The threads aren't known yet.
+
+        for t in threads:
+            if set_additional_thread_info(t).pydev_state != STATE_SUSPEND:
+                return False
+        return True
+
     def notify_thread_created(self, thread_id, thread, use_lock=True):
         if self.writer is None:
             # Protect about threads being created before the communication structure is in place
@@ -1438,6 +1599,63 @@ class PyDB(object):
                     # (so, clear the cache related to that).
                     self._running_thread_ids = {}
 
+    def _reconcile_running_threads(self):
+        '''
+        Checks all the threads to notify about the ones created/exited which weren't notified
+        already (threads started through pydev_monkey notify about it themselves, but the main
+        thread, threads started before the debugger was attached or while threads weren't
+        patched need this).
+
+        As it needs to check all the threads, it's done at most once every
+        `_THREADS_RECONCILE_INTERVAL` seconds (unless the running threads were reset).
+
+        :return bool:
+            False if all the program threads are dead (and True otherwise or if the threads
+            weren't checked).
+        '''
+        curr_time = time.time()
+        with self._lock_running_thread_ids:
+            if self._running_thread_ids and curr_time < self._next_threads_reconcile_time:
+                return True
+            self._next_threads_reconcile_time = curr_time + _THREADS_RECONCILE_INTERVAL
+
+        all_threads = threadingEnumerate()
+        program_threads_alive = {}
+        program_threads_dead = []
+        with self._lock_running_thread_ids:
+            reset_cache = not self._running_thread_ids
+
+            for t in all_threads:
+                if getattr(t, 'is_pydev_daemon_thread', False):
+                    pass  # I.e.: skip the DummyThreads created from pydev daemon threads
+                elif isinstance(t, PyDBDaemonThread):
+                    pydev_log.error_once('Error in debugger: Found PyDBDaemonThread not marked with is_pydev_daemon_thread=True.')
+
+                elif is_thread_alive(t):
+                    if reset_cache:
+                        # Fix multiprocessing debug with breakpoints in both main and child processes
+                        # (https://youtrack.jetbrains.com/issue/PY-17092) When the new process is created, the main
+                        # thread in the new process already has the attribute 'pydevd_id', so the new thread doesn't
+                        # get new id with its process number and the debugger loses access to both threads.
+                        # Therefore we should update thread_id for every main thread in the new process.
+                        clear_cached_thread_id(t)
+
+                    thread_id = get_thread_id(t)
+                    program_threads_alive[thread_id] = t
+
+                    self.notify_thread_created(thread_id, t, use_lock=False)
+
+            # Compute and notify about threads which are no longer alive.
+            thread_ids = list(self._running_thread_ids.keys())
+            for thread_id in thread_ids:
+                if thread_id not in program_threads_alive:
+                    program_threads_dead.append(thread_id)
+
+            for thread_id in program_threads_dead:
+                self.notify_thread_not_alive(thread_id, use_lock=False)
+
+        return len(program_threads_alive) > 0
+
     def process_internal_commands(self):
         '''
         This function processes internal commands.
@@ -1448,46 +1666,10 @@ class PyDB(object):
 
         dispose = False
         with self._main_lock:
-            program_threads_alive = {}
             if ready_to_run:
                 self.check_output_redirect()
 
-                all_threads = threadingEnumerate()
-                program_threads_dead = []
-                with self._lock_running_thread_ids:
-                    reset_cache = not self._running_thread_ids
-
-                    for t in all_threads:
-                        if getattr(t, 'is_pydev_daemon_thread', False):
-                            pass  # I.e.: skip the DummyThreads created from pydev daemon threads
-                        elif isinstance(t, PyDBDaemonThread):
-                            pydev_log.error_once('Error in debugger: Found PyDBDaemonThread not marked with is_pydev_daemon_thread=True.')
-
-                        elif is_thread_alive(t):
-                            if reset_cache:
-                                # Fix multiprocessing debug with breakpoints in both main and child processes
-                                # (https://youtrack.jetbrains.com/issue/PY-17092) When the new process is created, the main
-                                # thread in the new process already has the attribute 'pydevd_id', so the new thread doesn't
-                                # get new id with its process number and the debugger loses access to both threads.
-                                # Therefore we should update thread_id for every main thread in the new process.
-                                clear_cached_thread_id(t)
-
-                            thread_id = get_thread_id(t)
-                            program_threads_alive[thread_id] = t
-
-                            self.notify_thread_created(thread_id, t, use_lock=False)
-
-                    # Compute and notify about threads which are no longer alive.
-                    thread_ids = list(self._running_thread_ids.keys())
-                    for thread_id in thread_ids:
-                        if thread_id not in program_threads_alive:
-                            program_threads_dead.append(thread_id)
-
-                    for thread_id in program_threads_dead:
-                        self.notify_thread_not_alive(thread_id, use_lock=False)
-
-            # Without self._lock_running_thread_ids
-            if len(program_threads_alive) == 0 and ready_to_run:
+            if ready_to_run and not self._reconcile_running_threads():
                 dispose = True
             else:
                 # Actually process the commands now (make sure we don't have a lock for _lock_running_thread_ids
@@ -1540,11 +1722,14 @@ class PyDB(object):
             break_dict[pybreakpoint.line] = pybreakpoint
 
         breakpoints[file] = break_dict
-        self._clear_skip_caches()
+        if breakpoints is self.breakpoints:
+            # A change in the line breakpoints of a file only affects the caches related to that file.
+            self._clear_skip_caches(file)
+        else:
+            self._clear_skip_caches()
 
-    def _clear_skip_caches(self):
-        global_cache_skips.clear()
-        global_cache_frame_skips.clear()
+    def _clear_skip_caches(self, filename=None):
+        clear_cache_skips(filename)
 
     def add_break_on_exception(
         self,
@@ -1630,6 +1815,7 @@ class PyDB(object):
             self._threads_suspended_single_notification.on_pause()
 
         info = self._mark_suspend(thread, stop_reason, original_step_cmd=original_step_cmd)
+        pydevd_sys_monitoring.on_thread_needs_tracing(self, thread)
 
         if is_pause:
             # Must set tracing after setting the state to suspend.
@@ -1661,6 +1847,7 @@ class PyDB(object):
                     if t is thread:
                         continue
                     info = self._mark_suspend(t, CMD_THREAD_SUSPEND)
+                    pydevd_sys_monitoring.on_thread_needs_tracing(self, t)
                     frame = info.get_topmost_frame(t)
 
                     # Reset the time as in this case this was not the main thread suspended.
@@ -1796,6 +1983,10 @@ class PyDB(object):
             for f in frames_list:
                 pydev_log.debug('  Stack: %s, %s, %s', f.f_code.co_filename, f.f_code.co_name, f.f_lineno)
 
+        # The output printed before stopping must reach the client before the suspend message
+        # (note: flushing from this thread makes the writer keep that order).
+        pydevd_io.flush_buffered_io_messages(self)
+
         with self.suspended_frames_manager.track_frames(self) as frames_tracker:
             frames_tracker.track(thread_id, frames_list)
             cmd = frames_tracker.create_thread_suspend_command(thread_id, stop_reason, message, suspend_type)
@@ -1839,6 +2030,8 @@ class PyDB(object):
             # before every stop check if matplotlib modules were imported inside script code
             self._activate_mpl_if_needed()
 
+        thread_id = get_current_thread_id(thread)
+        queue = self.get_internal_queue(thread_id)
         while True:
             with self._main_lock:  # Use lock to check if suspended state changed
                 if info.pydev_state != STATE_SUSPEND or (self.pydb_disposed and not self.terminate_requested):
@@ -1850,9 +2043,17 @@ class PyDB(object):
                 self._call_mpl_hook()
 
             self.process_internal_commands()
-            time.sleep(0.01)
 
-        self.cancel_async_evaluation(get_current_thread_id(thread), str(id(frame)))
+            if info.pydev_state != STATE_SUSPEND:
+                continue  # A command processed by this thread resumed it (i.e.: step).
+
+            if in_main_thread and self.mpl_in_use:
+                # The matplotlib input hook must be called periodically.
+                queue.wait_for_commands(0.01)
+            else:
+                queue.wait_for_commands(_WAIT_SUSPEND_MAX_WAIT)
+
+        self.cancel_async_evaluation(thread_id, str(id(frame)))
 
         # process any stepping instructions
         if info.pydev_step_cmd in (CMD_STEP_INTO, CMD_STEP_INTO_MY_CODE):
@@ -1936,6 +2137,7 @@ class PyDB(object):
                 info.pydev_step_cmd = -1
                 info.pydev_state = STATE_RUN
 
+        pydevd_sys_monitoring.on_thread_resumed(self, thread, frame)
         del frame
         cmd = self.cmd_factory.make_thread_run_message(get_current_thread_id(thread), info.pydev_step_cmd)
         self.writer.add_command(cmd)
@@ -1984,6 +2186,26 @@ class PyDB(object):
 
         del frame
 
+    def _set_trace_for_frames_from_file(self, frame, filename):
+        '''
+        Sets the tracing only for the given frame and parents which are from the given file.
+        '''
+        while frame is not None:
+            try:
+                # Make fast path faster!
+                abs_path_real_path_and_base = NORM_PATHS_AND_BASE_CONTAINER[frame.f_code.co_filename]
+            except:
+                abs_path_real_path_and_base = get_abs_path_real_path_and_base_from_frame(frame)
+
+            if abs_path_real_path_and_base[1] == filename and frame.f_trace is not self.trace_dispatch:
+                if self.get_file_type(frame, abs_path_real_path_and_base) is None:
+                    pydev_log.debug('Set tracing of frame: %s - %s', frame.f_code.co_filename, frame.f_code.co_name)
+                    frame.f_trace = self.trace_dispatch
+
+            frame = frame.f_back
+
+        del frame
+
     def _create_pydb_command_thread(self):
         curr_pydb_command_thread = self.py_db_command_thread
         if curr_pydb_command_thread is not None:
@@ -2064,6 +2286,9 @@ class PyDB(object):
                 disposed = self.pydb_disposed
                 self.pydb_disposed = True
 
+            # Suspended threads must check that the debugger was disposed.
+            self._wake_up_all_threads()
+
             if disposed:
                 if wait:
                     pydev_log.debug("PyDB.dispose_and_kill_all_pydevd_threads (already disposed - wait)")
@@ -2073,6 +2298,10 @@ class PyDB(object):
                 return
 
             pydev_log.debug("PyDB.dispose_and_kill_all_pydevd_threads (first call)")
+            pydev_log.debug("PyDB.dispose_and_kill_all_pydevd_threads (%s)", get_compiled_code_cache())
+
+            # Send any output still buffered before finishing.
+            pydevd_io.flush_buffered_io_messages(self)
 
             # Wait until a time when there are no commands being processed to kill the threads.
             started_at = time.time()
@@ -2115,11 +2344,12 @@ class PyDB(object):
         self.start_auxiliary_daemon_threads()
 
     def patch_threads(self):
-        try:
-            # not available in jython!
-            threading.settrace(self.trace_dispatch)  # for all future threads
-        except:
-            pass
+        if not self._can_use_sys_monitoring():
+            try:
+                # not available in jython!
+                threading.settrace(self.trace_dispatch)  # for all future threads
+            except:
+                pass
 
         from _pydev_bundle.pydev_monkey import patch_thread_modules
         patch_thread_modules()
@@ -2371,6 +2601,11 @@ def dump_threads(stream=None):
 def usage(doExit=0):
     sys.stdout.write('Usage:\n')
     sys.stdout.write('pydevd.py --port N [(--client hostname) | --server] --file executable [file_options]\n')
+    sys.stdout.write('\n')
+    sys.stdout.write('Note: instead of a hostname, --client also accepts a unix:/path/to/socket endpoint (to\n')
+    sys.stdout.write('connect to a unix domain socket or listen at it if --server is also passed) or an\n')
+    sys.stdout.write('fd:<file descriptor> endpoint (with an already connected socket inherited from the\n')
+    sys.stdout.write('launcher), in which case --port is ignored.\n')
     if doExit:
         sys.exit(0)
 
@@ -2399,10 +2634,12 @@ def _enable_attach(
     Meant to be used with the DAP (Debug Adapter Protocol) with _wait_for_attach().
 
     :param address: (host, port)
+        Note: the host may also be a `unix:/path/to/socket` endpoint or an inherited
+        `fd:<file descriptor>` endpoint (in which case the port is ignored and may be None).
     :type address: tuple(str, int)
     '''
     host = address[0]
-    port = int(address[1])
+    port = int(address[1] or 0)
 
     if SetupHolder.setup is not None:
         if port != SetupHolder.setup['port']:
@@ -2471,7 +2708,9 @@ def settrace(
     '''Sets the tracing function with the pydev debug function and initializes needed facilities.
 
     :param host: the user may specify another host, if the debug server is not in the same machine (default is the local
-        host)
+        host). A `unix:/path/to/socket` endpoint (to connect through a unix domain socket) or a `fd:<file descriptor>`
+        endpoint (to use an already connected socket inherited from the launcher) may also be given (in which case
+        the port is ignored).
 
     :param stdout_to_server: when this is true, the stdout is passed to the debug server
 
@@ -2673,6 +2912,7 @@ def _locked_settrace(
             additional_info.pydev_step_cmd = CMD_STEP_OVER
             additional_info.pydev_step_stop = stop_at_frame
             additional_info.suspend_type = PYTHON_SUSPEND
+            pydevd_sys_monitoring.on_thread_needs_tracing(py_db, t)
         else:
             # Ask to break as soon as possible.
             py_db.set_suspend(t, CMD_SET_BREAK)
@@ -2681,6 +2921,7 @@ def _locked_settrace(
 def stoptrace():
     pydev_log.debug("pydevd.stoptrace()")
     pydevd_tracing.restore_sys_set_trace_func()
+    pydevd_sys_monitoring.stop_monitoring()
     sys.settrace(None)
     try:
         # not available in jython!
@@ -2816,7 +3057,11 @@ def settrace_forked(setup_tracing=True):
     pydevd_tracing.restore_sys_set_trace_func()
 
     if setup_tracing:
-        if port is not None:
+        if is_inherited_fd_endpoint(host):
+            # The inherited socket can't be shared with the forked process.
+            pydev_log.debug('Not tracing forked process (connection is done through inherited socket: %s).', host)
+
+        elif port is not None:
             custom_frames_container_init()
 
             if clear_thread_local_info is not None:
@@ -3110,7 +3355,7 @@ def main():
         apply_debugger_options(setup)
 
         try:
-            debugger.connect(host, port)
+            debugger.connect(host, port, server=setup['server'])
         except:
             sys.stderr.write("Could not connect to %s: %s\n" % (host, port))
             pydev_log.exception()
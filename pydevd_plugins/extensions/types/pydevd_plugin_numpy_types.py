@@ -1,5 +1,7 @@
 from _pydevd_bundle.pydevd_extension_api import TypeResolveProvider
-from _pydevd_bundle.pydevd_resolver import defaultResolver, MAX_ITEMS_TO_HANDLE, TOO_LARGE_ATTR, TOO_LARGE_MSG
+from _pydevd_bundle.pydevd_constants import dict_iter_items, xrange
+from _pydevd_bundle.pydevd_resolver import defaultResolver, MAX_ITEMS_TO_HANDLE, TOO_LARGE_ATTR, TOO_LARGE_MSG, \
+    FILTER_INDEXED, FILTER_NAMED, sorted_attributes_key
 from .pydevd_helpers import find_mod_attr
 
 
@@ -58,7 +60,35 @@ class NDArrayTypeResolveProvider(object):
             return container
         return None
 
+    def get_indexed_count(self, obj):
+        if obj.ndim == 0:
+            return 0
+        return len(obj)
+
+    def get_named_count(self, obj):
+        return 6  # __internals__, min, max, shape, dtype, size
+
+    def get_contents_debug_adapter_protocol(self, obj, fmt=None, filter=None, start=None, count=None):
+        '''
+        :param str filter:
+            If FILTER_INDEXED only the items in the window given by `start` and `count` are
+            returned and if FILTER_NAMED only the other children are returned.
+        '''
+        if filter == FILTER_INDEXED:
+            length = self.get_indexed_count(obj)
+            start = start or 0
+            stop = length if not count else min(length, start + count)
+            format_str = '%0' + str(int(len(str(length - 1)))) + 'd'
+            return [(format_str % i, obj[i], '[%s]' % (i,)) for i in xrange(start, stop)]
+
+        ret = self._get_dictionary(obj, include_items=filter != FILTER_NAMED)
+        lst = sorted(dict_iter_items(ret), key=lambda tup: sorted_attributes_key(tup[0]))
+        return [(key, value, None) for (key, value) in lst]
+
     def get_dictionary(self, obj):
+        return self._get_dictionary(obj, include_items=True)
+
+    def _get_dictionary(self, obj, include_items):
         ret = dict()
         ret['__internals__'] = defaultResolver.get_dictionary(obj)
         if obj.size > 1024 * 1024:
@@ -77,7 +107,8 @@ class NDArrayTypeResolveProvider(object):
         ret['shape'] = obj.shape
         ret['dtype'] = obj.dtype
         ret['size'] = obj.size
-        ret['[0:%s] ' % (len(obj))] = list(obj[0:MAX_ITEMS_TO_HANDLE])
+        if include_items:
+            ret['[0:%s] ' % (len(obj))] = list(obj[0:MAX_ITEMS_TO_HANDLE])
         return ret
 
 
@@ -0,0 +1,143 @@
+'''
+Microbenchmarks for the array viewer (i.e.: the xml created for the CMD_GET_ARRAY requests).
+
+Run with:
+
+    python -m tests_python.performance_check_arrays
+'''
+import sys
+import time
+
+import numpy
+
+from _pydev_bundle.pydev_imports import quote
+from _pydevd_bundle import pydevd_vars
+from _pydevd_bundle.pydevd_xml import ValueReprCache
+
+RUNS = 5
+
+
+def _create_arrays():
+    arrays = []
+    for shape in ((100, 100), (1000, 1000), (10000,), (5000, 200)):
+        size = 1
+        for dim in shape:
+            size *= dim
+        arrays.append(('float', numpy.random.random(shape)))
+        arrays.append(('int', numpy.arange(size).reshape(shape)))
+        arrays.append(('str', numpy.array(['item %s' % (i,) for i in range(size)]).reshape(shape)))
+    return arrays
+
+
+def check_array_to_xml(array, mode, count):
+    '''
+    Creates the xml for the first viewport of the given array `count` times (as done for the
+    initial CMD_GET_ARRAY request).
+
+    :param str mode:
+        'per_cell' to format each cell individually (as was done before the numpy formatting
+        was available), 'numpy' to format the cells with numpy or 'binary' to send the contents
+        as raw buffers (as done for CMD_GET_ARRAY_BINARY).
+
+    :return tuple(float, str):
+        The average time (in seconds) to create the xml and the xml created.
+    '''
+    get_array_window = pydevd_vars._get_array_window
+    if mode == 'per_cell':
+        pydevd_vars._get_array_window = lambda *args: None
+    try:
+        initial_time = time.time()
+        for _i in range(count):
+            xml = pydevd_vars.table_like_struct_to_xml(array, 'arr', 0, 0, -1, -1, '%', binary=mode == 'binary')
+        return (time.time() - initial_time) / count, xml
+    finally:
+        pydevd_vars._get_array_window = get_array_window
+
+
+def check_array_to_meta_xml(array, cached, count):
+    '''
+    Creates the meta xml for the given array `count` times (as done for each CMD_GET_ARRAY request).
+
+    :param bool cached:
+        If False, the array bounds are computed for each call.
+
+    :return float:
+        The average time (in seconds) to create the meta xml.
+    '''
+    value_repr_cache = ValueReprCache() if cached else None
+    initial_time = time.time()
+    for _i in range(count):
+        pydevd_vars.array_to_meta_xml(array, 'arr', '%', value_repr_cache)
+    return (time.time() - initial_time) / count
+
+
+def check_dataframe_to_xml(df, per_cell, cached, count):
+    '''
+    Creates the xml for the first viewport of the given DataFrame `count` times (as done when
+    scrolling in the DataFrame viewer).
+
+    :param bool per_cell:
+        If True, each cell is formatted individually (instead of each column with numpy).
+
+    :param bool cached:
+        If False, the columns bounds are computed for each call.
+
+    :return tuple(float, str):
+        The average time (in seconds) to create the xml and the xml created.
+    '''
+    dataframe_columns_to_xml = pydevd_vars._dataframe_columns_to_xml
+    if per_cell:
+        pydevd_vars._dataframe_columns_to_xml = lambda *args: None
+    value_repr_cache = ValueReprCache() if cached else None
+    try:
+        initial_time = time.time()
+        for _i in range(count):
+            xml = pydevd_vars.table_like_struct_to_xml(
+                df, 'df', 0, 0, -1, -1, '%', value_repr_cache=value_repr_cache)
+        return (time.time() - initial_time) / count, xml
+    finally:
+        pydevd_vars._dataframe_columns_to_xml = dataframe_columns_to_xml
+
+
+def main():
+    for kind, array in _create_arrays():
+        results = {}
+        for name, mode in (('per cell (baseline)', 'per_cell'), ('numpy formatting', 'numpy'), ('binary', 'binary')):
+            times_and_xml = [check_array_to_xml(array, mode, 5) for _i in range(RUNS)]
+            results[mode] = times_and_xml[0][1]
+            sys.stdout.write('%s - %s array %s: %.2fms (best of %s) - %s bytes\n' % (
+                name, kind, array.shape, min(t for t, _xml in times_and_xml) * 1000, RUNS,
+                len(quote(results[mode], '/<>_=" \t'))))
+        assert results['per_cell'] == results['numpy'], 'The xml created for %s array %s differs.' % (kind, array.shape)
+
+        if kind != 'str':
+            for name, cached in (('bounds computed (baseline)', False), ('bounds cached', True)):
+                times = [check_array_to_meta_xml(array, cached, 20) for _i in range(RUNS)]
+                sys.stdout.write('%s - %s array %s meta: %.3fms (best of %s)\n' % (
+                    name, kind, array.shape, min(times) * 1000, RUNS))
+
+
+    try:
+        import pandas
+    except ImportError:
+        return
+
+    for shape in ((1000, 10), (100000, 100)):
+        df = pandas.DataFrame(numpy.random.random(shape))
+        df[0] = numpy.arange(shape[0])
+        df[1] = ['item %s' % (i,) for i in range(shape[0])]
+        results = {}
+        for name, per_cell, cached in (
+                ('per cell, bounds computed (baseline)', True, False),
+                ('per column, bounds computed', False, False),
+                ('per column, bounds cached', False, True),
+            ):
+            times_and_xml = [check_dataframe_to_xml(df, per_cell, cached, 5) for _i in range(RUNS)]
+            results[name] = times_and_xml[0][1]
+            sys.stdout.write('%s - DataFrame %s: %.2fms (best of %s)\n' % (
+                name, shape, min(t for t, _xml in times_and_xml) * 1000, RUNS))
+        assert len(set(results.values())) == 1, 'The xml created for the DataFrame %s differs.' % (shape,)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+'''
+Microbenchmarks for the communication layer (i.e.: reading/writing messages from/to the client).
+
+Run with:
+
+    python -m tests_python.performance_check_comm
+'''
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from _pydev_bundle.pydev_imports import _queue
+from _pydevd_bundle._debug_adapter import pydevd_base_schema
+from _pydevd_bundle.pydevd_comm import SocketReader, WriterThread, create_server_socket, start_client
+from _pydevd_bundle.pydevd_comm_constants import CMD_WRITE_TO_CONSOLE
+from _pydevd_bundle.pydevd_constants import set_protocol, HTTP_JSON_PROTOCOL
+from _pydevd_bundle.pydevd_net_command import NetCommand, NULL_EXIT_COMMAND
+
+RUNS = 5
+
+
+class _BytesConcatReader(object):
+    '''
+    The reader previously used in the ReaderThread (which concatenates the contents received to
+    an immutable bytes and slices it to consume it) -- used as the baseline in the benchmark.
+    '''
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._buffer = b''
+
+    def read(self, size):
+        while True:
+            buffer_len = len(self._buffer)
+            if buffer_len == size:
+                ret = self._buffer
+                self._buffer = b''
+                return ret
+
+            if buffer_len > size:
+                ret = self._buffer[:size]
+                self._buffer = self._buffer[size:]
+                return ret
+
+            r = self.sock.recv(max(size - buffer_len, 1024))
+            if not r:
+                return b''
+            self._buffer += r
+
+    def read_line(self):
+        while True:
+            i = self._buffer.find(b'\n')
+            if i != -1:
+                i += 1
+                ret = self._buffer[:i]
+                self._buffer = self._buffer[i:]
+                return ret
+            else:
+                r = self.sock.recv(1024)
+                if not r:
+                    return b''
+                self._buffer += r
+
+
+def _create_message(size):
+    body = b'{"command": "evaluate", "arguments": {"expression": "' + (b'x' * size) + b'"}}'
+    return b'Content-Length: %d\r\n\r\n%s' % (len(body), body)
+
+
+def check_reader(reader_class, message_size, messages_count):
+    '''
+    Feeds `messages_count` messages with `message_size` bytes through a reader created from
+    `reader_class` (writing from another thread through a socket pair).
+
+    :return float:
+        The time taken to read all the messages.
+    '''
+    sock1, sock2 = socket.socketpair()
+    try:
+        message = _create_message(message_size)
+
+        def write_all():
+            for _i in range(messages_count):
+                sock2.sendall(message)
+            sock2.close()
+
+        reader = reader_class(sock1)
+        t = threading.Thread(target=write_all)
+        t.daemon = True
+
+        initial_time = time.time()
+        t.start()
+        read = 0
+        while True:
+            line = reader.read_line()
+            if not line:
+                break
+            if line.startswith(b'Content-Length:'):
+                content_len = int(line.strip().split(b':', 1)[1])
+                continue
+            if line == b'\r\n':
+                assert len(reader.read(content_len)) == content_len
+                read += 1
+        assert read == messages_count
+        elapsed = time.time() - initial_time
+        t.join()
+        return elapsed
+    finally:
+        sock1.close()
+
+
+class _PyDbForWriter(object):
+    '''
+    Just what's needed by the WriterThread from the PyDB.
+    '''
+
+    def __init__(self):
+        self.created_pydb_daemon_threads = {}
+        self.dap_messages_listeners = []
+
+    def dispose_and_kill_all_pydevd_threads(self):
+        pass
+
+
+class _OneByOneWriterThread(threading.Thread):
+    '''
+    The writer previously used (which writes one command at a time, with a sendall for the
+    header and another for the body) -- used as the baseline in the benchmark.
+    '''
+
+    def __init__(self, sock):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.sock = sock
+        self._cmd_queue = _queue.Queue()
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.commands = 0
+
+    def add_command(self, cmd):
+        self._cmd_queue.put((cmd, time.time()), False)
+
+    def run(self):
+        while True:
+            cmd, add_time = self._cmd_queue.get()
+            if cmd is NULL_EXIT_COMMAND:
+                return
+            as_bytes = cmd._as_bytes
+            self.sock.sendall(('Content-Length: %s\r\n\r\n' % len(as_bytes)).encode('ascii'))
+            self.sock.sendall(as_bytes)
+
+            latency = time.time() - add_time
+            self.commands += 1
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+    def get_flush_stats(self):
+        return {
+            'flushes': self.commands,
+            'avg_latency': self.total_latency / self.commands,
+            'max_latency': self.max_latency,
+        }
+
+
+def check_writer(create_writer, messages_count):
+    '''
+    Adds `messages_count` output events to a writer (created with `create_writer(sock)`) in a
+    burst and waits for all of them to be received in the other end of a socket pair.
+
+    :return tuple(float, dict):
+        The time taken until all the messages were received and the writer flush stats.
+    '''
+    set_protocol(HTTP_JSON_PROTOCOL)
+    sock1, sock2 = socket.socketpair()
+    try:
+        cmds = [
+            NetCommand(CMD_WRITE_TO_CONSOLE, 0, {
+                'type': 'event', 'event': 'output', 'body': {'category': 'stdout', 'output': 'line %s\n' % (i,)}},
+                is_json=True)
+            for i in range(messages_count)
+        ]
+        expected_size = sum(len(buf) for cmd in cmds for buf in cmd.get_send_buffers())
+
+        writer = create_writer(sock1)
+        writer.start()
+
+        initial_time = time.time()
+        for cmd in cmds:
+            writer.add_command(cmd)
+
+        # Just check the size received (we're measuring the writer, not the reader).
+        received = 0
+        while received < expected_size:
+            received += len(sock2.recv(1024 * 1024))
+        elapsed = time.time() - initial_time
+
+        writer.add_command(NULL_EXIT_COMMAND)
+        writer.join()
+        return elapsed, writer.get_flush_stats()
+    finally:
+        sock1.close()
+        sock2.close()
+
+
+def _read_message(reader):
+    content_len = None
+    while True:
+        line = reader.read_line()
+        if not line:
+            return b''
+        if line.startswith(b'Content-Length:'):
+            content_len = int(line.strip().split(b':', 1)[1])
+        elif line == b'\r\n':
+            return reader.read(content_len)
+
+
+def _create_tcp_sockets():
+    server = create_server_socket('127.0.0.1', 0)
+    try:
+        server.listen(1)
+        client = start_client('127.0.0.1', server.getsockname()[1])
+        accepted, _addr = server.accept()
+    finally:
+        server.close()
+    return client, accepted
+
+
+def _create_unix_socket_sockets():
+    directory = tempfile.mkdtemp()
+    try:
+        endpoint = 'unix:' + os.path.join(directory, 'pydevd.sock')
+        server = create_server_socket(endpoint, None)
+        try:
+            server.listen(1)
+            client = start_client(endpoint, None)
+            accepted, _addr = server.accept()
+        finally:
+            server.close()
+    finally:
+        shutil.rmtree(directory)
+    return client, accepted
+
+
+def _create_inherited_fd_sockets():
+    sock1, sock2 = socket.socketpair()
+    client = start_client('fd:%s' % (os.dup(sock1.fileno()),), None)
+    sock1.close()
+    return client, sock2
+
+
+def check_transport_latency(create_sockets, round_trips):
+    '''
+    Does `round_trips` request/response round trips (with small DAP-like messages) through the
+    sockets created by `create_sockets()` (the other end just echoes the messages back).
+
+    :return float:
+        The average time (in seconds) for a round trip.
+    '''
+    client, server = create_sockets()
+    try:
+
+        def echo():
+            reader = SocketReader(server)
+            while True:
+                msg = _read_message(reader)
+                if not msg:
+                    return
+                server.sendall(b'Content-Length: %d\r\n\r\n%s' % (len(msg), msg))
+
+        t = threading.Thread(target=echo)
+        t.daemon = True
+        t.start()
+
+        message = _create_message(150)
+        reader = SocketReader(client)
+        initial_time = time.time()
+        for _i in range(round_trips):
+            client.sendall(message)
+            assert _read_message(reader)
+        elapsed = time.time() - initial_time
+
+        client.shutdown(socket.SHUT_WR)
+        t.join()
+        return elapsed / round_trips
+    finally:
+        client.close()
+        server.close()
+
+
+_REQUESTS_TO_DECODE = {
+    'threads': b'{"command": "threads", "type": "request", "seq": 3}',
+    'stackTrace': b'{"command": "stackTrace", "arguments": {"threadId": 1, "startFrame": 0, "levels": 20, "format": {}}, "type": "request", "seq": 5}',
+    'variables': b'{"command": "variables", "arguments": {"variablesReference": 1}, "type": "request", "seq": 7}',
+    'evaluate': b'{"command": "evaluate", "arguments": {"expression": "obj.attr", "frameId": 1, "context": "hover"}, "type": "request", "seq": 9}',
+}
+
+
+def check_request_decode(json_msg, lazy_requests, count):
+    '''
+    Decodes the given request `count` times (translating the ids from the client as it's done
+    in the ReaderThread) and accesses the fields used by its handler.
+
+    :return float:
+        The average time (in seconds) to decode the request.
+    '''
+    from_json = pydevd_base_schema.from_json
+    initial_time = time.time()
+    for _i in range(count):
+        request = from_json(json_msg, True, lazy_requests=lazy_requests)
+        request.seq
+        arguments = request.arguments
+        if arguments is not None:
+            arguments.format
+    return (time.time() - initial_time) / count
+
+
+def main():
+    for message_size, messages_count in (
+            (200, 20000),
+            (1024 * 1024, 20),
+            (8 * 1024 * 1024, 4),
+        ):
+        for name, reader_class in (
+                ('bytes concat (baseline)', _BytesConcatReader),
+                ('SocketReader', SocketReader),
+            ):
+            times = [check_reader(reader_class, message_size, messages_count) for _i in range(RUNS)]
+            sys.stdout.write('%s - %s messages with %s bytes: %.3fs (best of %s)\n' % (
+                name, messages_count, message_size, min(times), RUNS))
+
+    for name, create_writer in (
+            ('one by one writer (baseline)', _OneByOneWriterThread),
+            ('WriterThread', lambda sock: WriterThread(sock, py_db)),
+        ):
+        py_db = _PyDbForWriter()
+        results = sorted(check_writer(create_writer, 20000) for _i in range(RUNS))
+        elapsed, flush_stats = results[0]
+        sys.stdout.write('%s - 20000 output events: %.3fs (best of %s) - flushes: %s, avg latency: %.4fs, max latency: %.4fs\n' % (
+            name, elapsed, RUNS, flush_stats['flushes'], flush_stats['avg_latency'], flush_stats['max_latency']))
+
+    transports = [('tcp (loopback)', _create_tcp_sockets)]
+    if hasattr(socket, 'AF_UNIX'):
+        transports.append(('unix socket', _create_unix_socket_sockets))
+        transports.append(('inherited fd (socketpair)', _create_inherited_fd_sockets))
+
+    for name, create_sockets in transports:
+        latencies = [check_transport_latency(create_sockets, 5000) for _i in range(RUNS)]
+        sys.stdout.write('%s - request/response round trip: %.1fus (best of %s)\n' % (
+            name, min(latencies) * 1000000, RUNS))
+
+    # Ids 1 are used as the thread/frame/variables reference in the requests decoded.
+    pydevd_base_schema.BaseSchema._translate_id_to_dap(1)
+    for command, json_msg in sorted(_REQUESTS_TO_DECODE.items()):
+        for name, lazy_requests in (('full decode (baseline)', False), ('lazy decode', True)):
+            times = [check_request_decode(json_msg, lazy_requests, 20000) for _i in range(RUNS)]
+            sys.stdout.write('%s - %s request: %.2fus (best of %s)\n' % (
+                name, command, min(times) * 1000000, RUNS))
+
+
+if __name__ == '__main__':
+    main()
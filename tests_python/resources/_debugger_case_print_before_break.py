@@ -0,0 +1,3 @@
+print('output before break')
+a = 10  # Break here
+print('TEST SUCEEDED')
@@ -3,6 +3,7 @@ from collections import namedtuple
 import json
 from os.path import normcase
 import os.path
+import socket
 import sys
 import time
 
@@ -16,7 +17,8 @@ from _pydevd_bundle._debug_adapter.pydevd_schema import (ThreadEvent, ModuleEven
     InitializeRequestArguments, TerminateArguments, TerminateRequest, TerminatedEvent)
 from _pydevd_bundle.pydevd_comm_constants import file_system_encoding
 from _pydevd_bundle.pydevd_constants import (int_types, IS_64BIT_PROCESS,
-    PY_VERSION_STR, PY_IMPL_VERSION_STR, PY_IMPL_NAME, IS_PY36_OR_GREATER, IS_PY39_OR_GREATER)
+    PY_VERSION_STR, PY_IMPL_VERSION_STR, PY_IMPL_NAME, IS_PY36_OR_GREATER, IS_PY39_OR_GREATER,
+    IS_PY312_OR_GREATER)
 from tests_python import debugger_unittest
 from tests_python.debug_constants import TEST_CHERRYPY, IS_PY2, TEST_DJANGO, TEST_FLASK, IS_PY26, \
     IS_PY27, IS_CPYTHON, TEST_GEVENT
@@ -180,15 +182,19 @@ class JsonFacade(object):
             condition = None
             hit_condition = None
             log_message = None
+            kwargs = {}
 
             if line in line_to_info:
                 line_info = line_to_info.get(line)
                 condition = line_info.get('condition')
                 hit_condition = line_info.get('hit_condition')
                 log_message = line_info.get('log_message')
+                if line_info.get('snapshot'):
+                    kwargs['pydevdSnapshot'] = True
+                    kwargs['pydevdSnapshotLocals'] = line_info.get('snapshot_locals')
 
             breakpoints.append(pydevd_schema.SourceBreakpoint(
-                line, condition=condition, hitCondition=hit_condition, logMessage=log_message).to_dict())
+                line, condition=condition, hitCondition=hit_condition, logMessage=log_message, **kwargs).to_dict())
 
         arguments = pydevd_schema.SetBreakpointsArguments(source, breakpoints)
         request = pydevd_schema.SetBreakpointsRequest(arguments)
@@ -539,6 +545,112 @@ def test_case_json_hit_count_and_step(case_setup):
         writer.finished_ok = True
 
 
+def test_case_json_snapshot_breakpoints_invalid_locals(case_setup):
+    with case_setup.test_file('_debugger_case_hit_count.py') as writer:
+        json_facade = JsonFacade(writer)
+
+        json_facade.write_launch()
+        print_line = writer.get_line_index_with_content('print line')
+        end_line = writer.get_line_index_with_content('TEST SUCEEDED')
+        response = json_facade.write_set_breakpoints(
+            [print_line, end_line],
+            line_to_info={
+                print_line: {'snapshot': True, 'snapshot_locals': 'i'},
+                end_line: {'snapshot': True, 'snapshot_locals': ['i', 1]},
+            },
+            verified=False)
+        assert [b['message'] for b in response.body.breakpoints] == [
+            'Breakpoint not validated: pydevdSnapshotLocals must be a list of strings.'] * 2
+
+        # Breakpoints not validated aren't added.
+        json_facade.write_make_initial_run()
+
+        writer.finished_ok = True
+
+
+def test_case_json_snapshot_breakpoints(case_setup):
+    with case_setup.test_file('_debugger_case_hit_count.py') as writer:
+        json_facade = JsonFacade(writer)
+
+        json_facade.write_launch()
+        print_line = writer.get_line_index_with_content('print line')
+        end_line = writer.get_line_index_with_content('TEST SUCEEDED')
+        json_facade.write_set_breakpoints(
+            [print_line, end_line],
+            line_to_info={
+                print_line: {'snapshot': True, 'snapshot_locals': ['i']}
+        })
+        json_facade.write_make_initial_run()
+
+        # The snapshot breakpoint never suspends (so, only the one at the end is hit).
+        json_hit = json_facade.wait_for_thread_stopped(line=end_line)
+
+        def get_snapshots(max_count=None):
+            response = json_facade.wait_for_response(json_facade.write_request(
+                pydevd_schema.PydevdGetSnapshotsRequest(arguments=pydevd_schema.PydevdGetSnapshotsArguments(maxCount=max_count))))
+            assert response.success
+            return response.body
+
+        body = get_snapshots(4)
+        assert body.remaining == 6
+        assert body.droppedCount == 0
+        snapshots = body.snapshots
+        assert [snapshot['variables'] for snapshot in snapshots] == [
+            [{'name': 'i', 'value': str(i), 'type': 'int'}] for i in range(4)]
+
+        snapshot = snapshots[0]
+        assert snapshot['threadId'] == json_hit.thread_id
+        assert snapshot['line'] == print_line
+        assert snapshot['source']['path'] == writer.TEST_FILE
+        assert snapshot['stackFrames'][0]['name'] == '<module>'
+        assert snapshot['stackFrames'][0]['line'] == print_line
+
+        body = get_snapshots()
+        assert len(body.snapshots) == 6
+        assert body.remaining == 0
+        assert [snapshot['id'] for snapshot in body.snapshots] == list(range(5, 11))
+
+        json_facade.write_continue()
+
+        writer.finished_ok = True
+
+
+@pytest.mark.skipif(not IS_PY312_OR_GREATER, reason='sys.monitoring only available on Python 3.12 onwards.')
+def test_case_json_sys_monitoring_breakpoint_and_step(case_setup):
+
+    def get_environ(writer):
+        env = os.environ.copy()
+        env['PYDEVD_USE_SYS_MONITORING'] = 'YES'
+        return env
+
+    with case_setup.test_file('_debugger_case_hit_count.py', get_environ=get_environ) as writer:
+        json_facade = JsonFacade(writer)
+
+        json_facade.write_launch()
+        for_line = writer.get_line_index_with_content('for line')
+        print_line = writer.get_line_index_with_content('print line')
+        json_facade.write_set_breakpoints([print_line])
+        json_facade.write_make_initial_run()
+
+        json_hit = json_facade.wait_for_thread_stopped(line=print_line)
+        i_local_var = json_facade.get_local_var(json_hit.frame_id, 'i')
+        assert i_local_var.value == '0'
+
+        json_facade.write_step_in(json_hit.thread_id)
+        json_hit = json_facade.wait_for_thread_stopped('step', line=for_line)
+
+        json_facade.write_continue()
+        json_hit = json_facade.wait_for_thread_stopped(line=print_line)
+        i_local_var = json_facade.get_local_var(json_hit.frame_id, 'i')
+        assert i_local_var.value == '1'
+
+        # Removing the breakpoint must stop the line events.
+        json_facade.write_set_breakpoints([])
+        json_facade.write_continue()
+
+        writer.finished_ok = True
+
+
 def test_case_process_event(case_setup):
     with case_setup.test_file('_debugger_case_change_breaks.py') as writer:
         json_facade = JsonFacade(writer)
@@ -568,6 +680,41 @@ def test_case_json_change_breaks(case_setup):
         writer.finished_ok = True
 
 
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='Unix domain sockets not available.')
+def test_case_json_unix_socket_transport(case_setup, tmpdir):
+    socket_path = str(tmpdir.join('pydevd.sock'))
+
+    def run(writer):
+        # Listen in a unix domain socket instead of a tcp port.
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server_socket.bind(socket_path)
+        server_socket.listen(1)
+        writer._sequence = -1
+        writer.server_socket = server_socket
+        writer.port = 0
+        new_socket, _addr = server_socket.accept()
+        writer._set_socket(new_socket)
+
+    def update_command_line_args(writer, args):
+        args[args.index('--client') + 1] = 'unix:' + socket_path
+        return args
+
+    with case_setup.test_file(
+            '_debugger_case_change_breaks.py', run=run, update_command_line_args=update_command_line_args) as writer:
+        json_facade = JsonFacade(writer)
+
+        break1_line = writer.get_line_index_with_content('break 1')
+        json_facade.write_launch()
+        json_facade.write_set_breakpoints(break1_line)
+        json_facade.write_make_initial_run()
+
+        json_facade.wait_for_thread_stopped(line=break1_line)
+        json_facade.write_set_breakpoints([])
+        json_facade.write_continue()
+
+        writer.finished_ok = True
+
+
 def test_case_handled_exception_no_break_on_generator(case_setup):
     with case_setup.test_file('_debugger_case_ignore_exceptions.py') as writer:
         json_facade = JsonFacade(writer)
@@ -1125,7 +1272,8 @@ def test_case_completions_json(case_setup):
 
                 response = json_facade.wait_for_response(completions_request)
                 assert not response.success
-                assert response.message == 'Thread to get completions seems to have resumed already.'
+                # Its id is released when the thread is resumed.
+                assert response.message == 'Wrong ID sent from the client: %s' % (first_hit.frame_id,)
 
                 # Check with a never frameId which never existed.
                 completions_arguments = pydevd_schema.CompletionsArguments(
@@ -1684,9 +1832,10 @@ def test_get_variable_errors(case_setup):
                 first_hit = json_hit
 
             if i == 1:
-                # Now, check with a previously existing frameId.
+                # Now, check with a previously existing frameId (its id is released when the
+                # thread is resumed).
                 response = json_facade.get_variables_response(first_hit.frame_id, success=False)
-                assert response.message == 'Unable to find thread to evaluate variable reference.'
+                assert response.message == 'Wrong ID sent from the client: %s' % (first_hit.frame_id,)
 
             json_facade.write_continue(wait_for_response=i == 0)
             if i == 0:
@@ -1891,6 +2040,10 @@ def test_stack_and_variables(case_setup):
         json_facade.write_step_next(json_hit.thread_id)
         json_hit = json_facade.wait_for_thread_stopped('step')
 
+        # The references are released when the thread is resumed, so, get it again.
+        json_hit = json_facade.get_stack_as_json_hit(json_hit.thread_id)
+        frame_variables_reference = json_facade.get_name_to_scope(json_hit.frame_id)['Locals'].variablesReference
+
         variables_response = json_facade.get_variables_response(frame_variables_reference)
         # : :type variables_response: VariablesResponse
         assert variables_response.body.variables == [{
@@ -2294,7 +2447,8 @@ def test_evaluate_failures(case_setup):
                     pydevd_schema.EvaluateRequest(pydevd_schema.EvaluateArguments('a = 10', frameId=first_hit.frame_id, context='repl')))
                 exec_response = json_facade.wait_for_response(exec_request)
                 assert exec_response.success == False
-                assert exec_response.message == 'Unable to find thread for evaluation.'
+                # Its id is released when the thread is resumed.
+                assert exec_response.message == 'Wrong ID sent from the client: %s' % (first_hit.frame_id,)
 
             json_facade.write_continue(wait_for_response=i == 0)
             if i == 0:
@@ -2303,6 +2457,77 @@ def test_evaluate_failures(case_setup):
         writer.finished_ok = True
 
 
+def test_evaluate_batch(case_setup):
+    with case_setup.test_file('_debugger_case_evaluate.py') as writer:
+        json_facade = JsonFacade(writer)
+
+        json_facade.write_set_breakpoints(writer.get_line_index_with_content('Break here'))
+        json_facade.write_make_initial_run()
+
+        json_hit = json_facade.wait_for_thread_stopped()
+        json_hit = json_facade.get_stack_as_json_hit(json_hit.thread_id)
+
+        def evaluate_batch(expressions, context=None, frame_id=json_hit.frame_id, success=True):
+            response = json_facade.wait_for_response(json_facade.write_request(
+                pydevd_schema.PydevdEvaluateBatchRequest(pydevd_schema.PydevdEvaluateBatchArguments(
+                    expressions, frame_id, context=context, format={'hex': True}))))
+            assert response.success == success
+            return response
+
+        results = evaluate_batch(['var_1', 'invalid_var', '[var_1, 2]', 'var_1 = 6']).body.results
+        assert [(result['success'], result['result']) for result in results] == [
+            (True, '0x5'),
+            (False, "NameError: name 'invalid_var' is not defined"),
+            (True, '[0x5, 0x2]'),
+            (False, results[3]['result']),  # Statements are not executed.
+        ]
+        assert 'SyntaxError' in results[3]['result']
+        assert results[0]['type'] == 'int'
+        assert results[0]['variablesReference'] == 0
+
+        # The variables references in the results can be used to get the children.
+        name_to_var = json_facade.get_name_to_var(results[2]['variablesReference'])
+        assert name_to_var['0'].value == '5'
+
+        results = evaluate_batch(['invalid_var', 'var_1'], context='hover').body.results
+        assert [(result['success'], result['result']) for result in results] == [(False, ''), (True, '0x5')]
+
+        response = evaluate_batch(['var_1'], frame_id=9999, success=False)
+        assert response.message == 'Wrong ID sent from the client: 9999'
+
+        json_facade.write_continue()
+
+        writer.finished_ok = True
+
+
+def test_evaluate_batch_no_time_budget(case_setup):
+
+    def get_environ(self):
+        env = os.environ.copy()
+        # The time budget is always exceeded when rendering the variables.
+        env['PYDEVD_VALUE_RENDER_TIME_BUDGET_SEC'] = '0.000001'
+        return env
+
+    with case_setup.test_file('_debugger_case_evaluate.py', get_environ=get_environ) as writer:
+        json_facade = JsonFacade(writer)
+
+        json_facade.write_set_breakpoints(writer.get_line_index_with_content('Break here'))
+        json_facade.write_make_initial_run()
+
+        json_hit = json_facade.wait_for_thread_stopped()
+        json_hit = json_facade.get_stack_as_json_hit(json_hit.thread_id)
+
+        # The watches are always rendered (the time budget only applies to the variables).
+        response = json_facade.wait_for_response(json_facade.write_request(
+            pydevd_schema.PydevdEvaluateBatchRequest(pydevd_schema.PydevdEvaluateBatchArguments(
+                ['[var_1, 2]', '(var_1, 3)'], json_hit.frame_id))))
+        assert [result['result'] for result in response.body.results] == ['[5, 2]', '(5, 3)']
+
+        json_facade.write_continue()
+
+        writer.finished_ok = True
+
+
 @pytest.mark.parametrize('max_frames', ['default', 'all', 10])  # -1 = default, 0 = all, 10 = 10 frames
 def test_exception_details(case_setup, max_frames):
     with case_setup.test_file('_debugger_case_large_exception_stack.py') as writer:
@@ -3180,6 +3405,32 @@ def test_case_flask_exceptions(case_setup_flask, jmc):
 
 
 @pytest.mark.skipif(IS_APPVEYOR or IS_JYTHON, reason='Flaky on appveyor / Jython encoding issues (needs investigation).')
+def test_buffered_output_before_stop(case_setup):
+
+    def get_environ(writer):
+        env = os.environ.copy()
+        env['PYDEVD_BUFFER_OUTPUT'] = 'True'
+        return env
+
+    with case_setup.test_file('_debugger_case_print_before_break.py', get_environ=get_environ) as writer:
+        json_facade = JsonFacade(writer)
+
+        json_facade.write_launch(redirectOutput=True)
+        break_line = writer.get_line_index_with_content('Break here')
+        json_facade.write_set_breakpoints(break_line)
+        json_facade.write_make_initial_run()
+
+        # The output printed before the breakpoint must be received before the stopped event
+        # (note: messages are consumed in order, so, waiting for the output first would skip
+        # the stopped event if it was received before it).
+        json_facade.wait_for_json_message(
+            OutputEvent, lambda msg: msg.body.category == 'stdout' and 'output before break' in msg.body.output)
+        json_facade.wait_for_thread_stopped(line=break_line)
+
+        json_facade.write_continue()
+        writer.finished_ok = True
+
+
 def test_redirect_output(case_setup):
 
     def get_environ(writer):
@@ -3567,6 +3818,11 @@ def test_pydevd_systeminfo(case_setup):
         assert 'usingCython' in body['pydevd']
         assert 'usingFrameEval' in body['pydevd']
 
+        # The breakpoint condition/evaluations aren't used here, so, the cache may be empty.
+        compiled_code_cache = body['pydevd']['compiledCodeCache']
+        assert sorted(compiled_code_cache) == ['evictions', 'hitRate', 'hits', 'misses', 'size']
+        assert 0. <= compiled_code_cache['hitRate'] <= 1.
+
         use_cython = os.getenv('PYDEVD_USE_CYTHON')
         if use_cython is not None:
             using_cython = use_cython == 'YES'
@@ -1,6 +1,7 @@
 # coding: utf-8
 import os
 import sys
+import threading
 
 import pytest
 
@@ -230,3 +231,79 @@ def test_monkey_patch_args_module_single_arg():
         ]
     finally:
         SetupHolder.setup = original
+
+
+def test_monkey_patch_args_unix_socket_and_inherited_fd_endpoints():
+    original = SetupHolder.setup
+
+    try:
+        SetupHolder.setup = {'client': 'unix:/tmp/pydevd.sock', 'port': 0, 'ppid': os.getpid(), 'protocol-quoted-line': True}
+        res = pydev_monkey.patch_args(['C:\\bin\\python.exe', '-u', '-c', 'connect("127.0.0.1")'])
+        assert "pydevd.settrace(host='unix:/tmp/pydevd.sock', port=0, " in res[3]
+
+        res = pydev_monkey.patch_args(['C:\\bin\\python.exe', 'target.py'])
+        assert res[res.index('--client') + 1] == 'unix:/tmp/pydevd.sock'
+        assert res[-2:] == ['--file', 'target.py']
+
+        # An inherited socket can't be shared with subprocesses (so, the args aren't patched).
+        SetupHolder.setup = {'client': 'fd:3', 'port': 0, 'ppid': os.getpid(), 'protocol-quoted-line': True}
+        check = ['C:\\bin\\python.exe', '-u', '-c', 'connect("127.0.0.1")']
+        assert pydev_monkey.patch_args(check) == check
+        check = ['C:\\bin\\python.exe', 'target.py']
+        assert pydev_monkey.patch_args(check) == check
+    finally:
+        SetupHolder.setup = original
+
+
+def test_new_thread_startup_notifies_created_and_exited():
+    from _pydevd_bundle.pydevd_constants import GlobalDebuggerHolder, get_current_thread_id
+
+    try:
+        import thread
+    except ImportError:
+        import _thread as thread  # @UnresolvedImport
+
+    events = []
+    exited = threading.Event()
+
+    class _DummyPyDB(object):
+
+        def notify_thread_created(self, thread_id, t):
+            events.append(('created', thread_id))
+
+        def notify_thread_not_alive(self, thread_id):
+            events.append(('exited', thread_id))
+            exited.set()
+
+        def enable_tracing(self):
+            events.append(('enable_tracing',))
+
+    def func(raise_error):
+        events.append(('run', get_current_thread_id(threading.currentThread())))
+        if raise_error:
+            raise RuntimeError('Error in thread')
+
+    original = GlobalDebuggerHolder.global_dbg
+    GlobalDebuggerHolder.global_dbg = _DummyPyDB()
+    try:
+        for raise_error in (False, True):
+            del events[:]
+            exited.clear()
+
+            # The creation is notified before the function runs and the exit after it returns (even
+            # if it raises an exception), so, the threads don't need to be enumerated for that.
+            startup = pydev_monkey._NewThreadStartupWithTrace(func, (raise_error,), {})
+
+            def run():
+                try:
+                    startup()
+                except RuntimeError:
+                    pass
+
+            thread.start_new_thread(run, ())
+            assert exited.wait(5)
+            thread_id = events[0][1]
+            assert events == [
+                ('created', thread_id), ('enable_tracing',), ('run', thread_id), ('exited', thread_id)]
+    finally:
+        GlobalDebuggerHolder.global_dbg = original
@@ -33,11 +33,15 @@ def test_io_redirector():
 
 class _DummyWriter(object):
 
-    __slots__ = ['commands', 'command_meanings']
+    __slots__ = ['commands', 'command_meanings', 'pending_count']
 
     def __init__(self):
         self.commands = []
         self.command_meanings = []
+        self.pending_count = 0
+
+    def get_pending_count(self):
+        return self.pending_count
 
     def add_command(self, cmd):
         from _pydevd_bundle.pydevd_comm import ID_TO_MEANING
@@ -51,6 +55,8 @@ class _DummyPyDb(object):
     def __init__(self):
         self.cmd_factory = NetCommandFactory()
         self.writer = _DummyWriter()
+        self.created_pydb_daemon_threads = {}
+        self.pydb_disposed = False
 
 
 def test_patch_stdin():
@@ -223,3 +229,48 @@ def test_redirect_to_pyd_io_messages_user_change_stdout(_redirect_context, std):
     assert py_db.writer.command_meanings == ['CMD_WRITE_TO_CONSOLE']
     assert stream.getvalue() == u'bbbccc'
 
+
+def test_buffered_io_messages():
+    from _pydevd_bundle.pydevd_io import BufferedIoMessages
+
+    py_db = _DummyPyDb()
+    buffered_io_messages = BufferedIoMessages()
+    # Don't let the flush thread send the output (flushes are done manually in the test).
+    buffered_io_messages.flush_interval = 10
+    try:
+        buffered_io_messages.write(py_db, 'a1', 1)
+        buffered_io_messages.write(py_db, 'a2', 1)
+        buffered_io_messages.write(py_db, 'b1', 2)
+        buffered_io_messages.write(py_db, 'a3', 1)
+        assert py_db.writer.commands == []
+
+        # The client isn't keeping up: keep it buffered.
+        py_db.writer.pending_count = buffered_io_messages.max_writer_pending
+        assert not buffered_io_messages.flush(py_db)
+        assert py_db.writer.commands == []
+        py_db.writer.pending_count = 0
+
+        # Consecutive writes to the same stream are merged, keeping the order.
+        assert buffered_io_messages.flush(py_db)
+        assert py_db.writer.command_meanings == ['CMD_WRITE_TO_CONSOLE'] * 3
+        contents = [cmd._as_bytes for cmd in py_db.writer.commands]
+        assert b'a1a2' in contents[0] and b'ctx="1"' in contents[0]
+        assert b'b1' in contents[1] and b'ctx="2"' in contents[1]
+        assert b'a3' in contents[2] and b'ctx="1"' in contents[2]
+        del py_db.writer.commands[:]
+        del py_db.writer.command_meanings[:]
+
+        # Over the max buffered size the output is dropped.
+        buffered_io_messages.max_buffered_size = 4
+        py_db.writer.pending_count = buffered_io_messages.max_writer_pending
+        for _i in range(4):
+            buffered_io_messages.write(py_db, 'ab', 1)
+        assert buffered_io_messages.flush(py_db, force=True)
+        contents = [cmd._as_bytes for cmd in py_db.writer.commands]
+        assert len(contents) == 2
+        assert b'abab' in contents[0]
+        assert b'4 chars of output dropped' in contents[1] and b'ctx="2"' in contents[1]
+    finally:
+        flush_thread = buffered_io_messages._flush_thread
+        buffered_io_messages.stop_flush_thread(5)
+    assert not flush_thread.is_alive()
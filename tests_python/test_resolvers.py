@@ -33,6 +33,82 @@ def test_dict_resolver_hex():
         ('(0x1, 0xa, 0x64)', (10000, 100000, 100000), '[(1, 10, 100)]'), ]
 
 
+class _HashChanges(object):
+
+    def __init__(self):
+        self.hash = 1
+
+    def __hash__(self):
+        return self.hash
+
+
+def test_dict_resolver_resolve_by_key_id(monkeypatch):
+    from _pydevd_bundle import pydevd_resolver
+    from _pydevd_bundle.pydevd_resolver import DictResolver, UnableToResolveVariableException
+    import pytest
+    monkeypatch.setattr(pydevd_resolver, 'get_global_debugger', lambda: None)
+
+    dict_resolver = DictResolver()
+    key1 = (1, 2)
+    key2 = _HashChanges()
+    dct = {key1: 'a', key2: 'b'}
+    names = dict((value, name) for (name, value) in dict_resolver.get_dictionary(dct).items() if '(' in name)
+    assert dict_resolver.resolve(dct, names['a']) == 'a'
+
+    # Keys are only compared by their id.
+    key2.hash = 2
+    assert dict_resolver.resolve(dct, names['b']) == 'b'
+
+    # Changing the dict afterwards is Ok.
+    key3 = (5, 6)
+    dct[key3] = 'c'
+    del dct[key1]
+    assert dict_resolver.resolve(dct, '%s (%s)' % (key3, id(key3))) == 'c'
+    with pytest.raises(UnableToResolveVariableException):
+        dict_resolver.resolve(dct, names['a'])
+
+
+def test_dict_resolver_resolve_by_key_id_while_suspended(monkeypatch):
+    from _pydevd_bundle import pydevd_resolver
+    from _pydevd_bundle.pydevd_resolver import DictResolver
+    from _pydevd_bundle.pydevd_xml import ValueReprCache
+
+    value_repr_cache = ValueReprCache()
+
+    class _DummySuspendedFramesManager(object):
+
+        def get_value_repr_cache(self, thread_id):
+            return value_repr_cache
+
+    class _DummyPyDB(object):
+
+        suspended_frames_manager = _DummySuspendedFramesManager()
+
+    monkeypatch.setattr(pydevd_resolver, 'get_global_debugger', lambda: _DummyPyDB())
+
+    dict_resolver = DictResolver()
+    key1 = (1, 2)
+    key2 = _HashChanges()
+    dct = {key1: 'a', key2: 'b'}
+    names = dict((value, name) for (name, value) in dict_resolver.get_dictionary(dct).items() if '(' in name)
+    assert dict_resolver.resolve(dct, names['a']) == 'a'
+
+    # The index is kept in the cache of the suspension (which is cleared when values may change).
+    assert value_repr_cache.get(dct, pydevd_resolver._DICT_KEYS_INDEX_INFO_KEY) == {
+        id(key1): (key1, 'a'), id(key2): (key2, 'b')}
+
+    key2.hash = 2
+    assert dict_resolver.resolve(dct, names['b']) == 'b'
+
+    # A key added after the index was built is still found.
+    key3 = (5, 6)
+    dct[key3] = 'c'
+    assert dict_resolver.resolve(dct, '%s (%s)' % (key3, id(key3))) == 'c'
+
+    value_repr_cache.clear()
+    assert len(value_repr_cache) == 0
+
+
 def test_object_resolver_simple():
     from _pydevd_bundle.pydevd_resolver import DefaultResolver
     default_resolver = DefaultResolver()
@@ -314,3 +390,92 @@ def test_tuple_resolver_mixed():
     check_len_entry(len_entry, ('__len__', 2))
     assert contents_debug_adapter_protocol == [
         ('some_value', 10, '.some_value'), ('0', 1, '[0]'), ('1', 2, '[1]'), ]
+
+
+def test_type_resolve_handler_caches_none_resolver():
+    from _pydevd_bundle.pydevd_xml import TypeResolveHandler
+    type_resolve_handler = TypeResolveHandler()
+    assert type_resolve_handler.get_type(1) == (int, 'int', None)
+
+    # Afterwards the resolver (None) must come from the cache.
+    type_resolve_handler._resolve_providers = None
+    type_resolve_handler._default_type_map = None
+    assert type_resolve_handler.get_type(2) == (int, 'int', None)
+
+
+def test_value_repr_cache():
+    from _pydevd_bundle import pydevd_xml
+    from _pydevd_bundle.pydevd_safe_repr import SafeRepr
+
+    class MyObject(object):
+
+        calls = 0
+
+        def __repr__(self):
+            MyObject.calls += 1
+            return 'MyObject(%s)' % (MyObject.calls,)
+
+    obj = MyObject()
+
+    # Nothing is cached if no cache is given.
+    assert pydevd_xml.get_variable_details(obj, to_string=SafeRepr())[-1] == 'MyObject(1)'
+    assert pydevd_xml.get_variable_details(obj, to_string=SafeRepr())[-1] == 'MyObject(2)'
+
+    value_repr_cache = pydevd_xml.ValueReprCache()
+    safe_repr = SafeRepr()
+    assert pydevd_xml.get_variable_details(
+        obj, to_string=safe_repr, value_repr_cache=value_repr_cache)[-1] == 'MyObject(3)'
+    assert pydevd_xml.get_variable_details(
+        obj, to_string=SafeRepr(), value_repr_cache=value_repr_cache)[-1] == 'MyObject(3)'
+
+    # Different options are cached separately.
+    safe_repr = SafeRepr()
+    safe_repr.convert_to_hex = True
+    assert pydevd_xml.get_variable_details(
+        obj, to_string=safe_repr, value_repr_cache=value_repr_cache)[-1] == 'MyObject(4)'
+
+    value_repr_cache.clear()
+    assert pydevd_xml.get_variable_details(
+        obj, to_string=SafeRepr(), value_repr_cache=value_repr_cache)[-1] == 'MyObject(5)'
+
+
+def test_value_repr_render_budget():
+    import time
+    from _pydevd_bundle import pydevd_xml
+    from _pydevd_bundle.pydevd_safe_repr import SafeRepr
+
+    class MyObject(object):
+
+        def __repr__(self):
+            return 'MyObject'
+
+    value_repr_cache = pydevd_xml.ValueReprCache()
+    cached = MyObject()
+    assert pydevd_xml.get_variable_details(
+        cached, to_string=SafeRepr(), value_repr_cache=value_repr_cache)[-1] == 'MyObject'
+
+    # Time is over: only values which are fast to render (or cached) are rendered.
+    budget = pydevd_xml.RenderBudget(max_time=0.0001)
+    time.sleep(.01)
+    assert budget.is_time_exceeded()
+    assert pydevd_xml.get_variable_details(
+        cached, to_string=SafeRepr(), budget=budget, value_repr_cache=value_repr_cache)[-1] == 'MyObject'
+    assert not budget.last_value_truncated
+    assert pydevd_xml.get_variable_details(1, to_string=SafeRepr(), budget=budget)[-1] == '1'
+    assert not budget.last_value_truncated
+    assert pydevd_xml.get_variable_details(
+        MyObject(), to_string=SafeRepr(), budget=budget)[-1] == pydevd_xml.TIME_BUDGET_EXCEEDED_VALUE
+    assert budget.last_value_truncated
+
+    # The client is told about it.
+    assert ' isTruncated="True"' in pydevd_xml.var_to_xml(MyObject(), 'obj', budget=budget)
+    assert ' isTruncated="True"' not in pydevd_xml.var_to_xml(1, 'obj', budget=budget)
+
+    # Values bigger than the budget are truncated (and not cached).
+    budget = pydevd_xml.RenderBudget(max_size=5)
+    lst = list(range(10))
+    full_repr = '%s: %s' % (list, lst)
+    assert pydevd_xml.get_variable_details(
+        lst, budget=budget, value_repr_cache=value_repr_cache)[-1] == full_repr[:5] + '...'
+    assert budget.last_value_truncated
+    assert pydevd_xml.get_variable_details(lst, value_repr_cache=value_repr_cache)[-1] == full_repr
@@ -714,3 +714,36 @@ def test_raw():
     else:
         assert raw_value_repr == obj.decode('latin1')
 
+
+
+def test_maxsize():
+    safe_repr = SafeRepr()
+    safe_repr.maxsize = 10
+
+    assert safe_repr(list(range(3))) == '[0, 1, 2]'
+    assert not safe_repr.truncated
+
+    assert safe_repr(list(range(20))) == '[0, 1, 2, ...'
+    assert safe_repr.truncated
+
+    assert safe_repr('a' * 20) == "'aaaaaaaaa..."
+    assert safe_repr.truncated
+
+
+def test_maxtime():
+    import time
+
+    class SlowRepr(object):
+
+        def __repr__(self):
+            time.sleep(.1)
+            return 'SlowRepr'
+
+    safe_repr = SafeRepr()
+    safe_repr.maxtime = .15
+
+    assert safe_repr([SlowRepr(), SlowRepr(), SlowRepr(), SlowRepr()]) == '[SlowRepr, SlowRepr, ...]'
+    assert safe_repr.truncated
+
+    assert safe_repr({1: SlowRepr()}) == '{1: SlowRepr}'
+    assert not safe_repr.truncated
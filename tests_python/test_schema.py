@@ -140,3 +140,61 @@ def test_schema_translation_thread():
         ]},
         'seq':-1
     }
+
+
+def test_schema_lazy_request():
+    import json
+    import pytest
+    pydevd_base_schema.BaseSchema.initialize_ids_translation()
+    thread_dap_id = pydevd_base_schema.BaseSchema._translate_id_to_dap(2 ** 45)
+    frame_dap_id = pydevd_base_schema.BaseSchema._translate_id_to_dap(2 ** 46)
+
+    json_msg = json.dumps({
+        'command': 'stackTrace',
+        'arguments': {'threadId': thread_dap_id, 'levels': 20},
+        'type': 'request',
+        'seq': 5,
+    })
+    request = pydevd_base_schema.from_json(json_msg, update_ids_from_dap=True, lazy_requests=True)
+    assert isinstance(request, pydevd_base_schema.LazyRequest)
+    assert request.type == 'request'
+    assert request.seq == 5
+    assert request.command == 'stackTrace'
+    assert request.arguments.threadId == 2 ** 45
+    assert request.arguments.levels == 20
+    assert request.arguments.startFrame is None
+    assert request.arguments.format == {}
+
+    # Anything else creates the actual request.
+    full_request = pydevd_base_schema.from_json(json_msg, update_ids_from_dap=True)
+    assert request.to_dict() == full_request.to_dict()
+    assert request.arguments.to_dict() == full_request.arguments.to_dict()
+
+    response = pydevd_base_schema.build_response(request, kwargs={'body': {'stackFrames': []}})
+    assert response.request_seq == 5
+    assert response.command == 'stackTrace'
+
+    request = pydevd_base_schema.from_json(json.dumps({
+        'command': 'evaluate',
+        'arguments': {'expression': 'a', 'frameId': frame_dap_id},
+        'type': 'request',
+        'seq': 6,
+    }), update_ids_from_dap=True, lazy_requests=True)
+    assert request.arguments.frameId == 2 ** 46
+    assert request.arguments.context is None
+
+    # Requests which are not lazy or are missing required arguments are fully decoded.
+    request = pydevd_base_schema.from_json(json.dumps({
+        'command': 'continue', 'arguments': {'threadId': thread_dap_id}, 'type': 'request', 'seq': 7,
+    }), update_ids_from_dap=True, lazy_requests=True)
+    assert request.__class__ == pydevd_schema.ContinueRequest
+
+    with pytest.raises(TypeError):
+        pydevd_base_schema.from_json(json.dumps({
+            'command': 'variables', 'arguments': {}, 'type': 'request', 'seq': 8,
+        }), update_ids_from_dap=True, lazy_requests=True)
+
+    with pytest.raises(KeyError):
+        pydevd_base_schema.from_json(json.dumps({
+            'command': 'variables', 'arguments': {'variablesReference': 9999}, 'type': 'request', 'seq': 9,
+        }), update_ids_from_dap=True, lazy_requests=True)
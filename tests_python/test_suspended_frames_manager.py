@@ -1,4 +1,6 @@
 import sys
+
+import pytest
 from _pydevd_bundle.pydevd_constants import int_types
 from _pydevd_bundle.pydevd_resolver import MAX_ITEMS_TO_HANDLE, TOO_LARGE_ATTR
 from _pydevd_bundle import pydevd_frame_utils
@@ -132,3 +134,224 @@ def test_get_child_variables():
             if not found_len:
                 raise AssertionError('Expected to find variable named: __len__')
 
+
+def test_dap_ids_released_on_untrack(monkeypatch):
+    from _pydevd_bundle.pydevd_suspended_frames import SuspendedFramesManager
+    from _pydevd_bundle._debug_adapter import pydevd_base_schema
+    from _pydevd_bundle._debug_adapter.pydevd_base_schema import BaseSchema
+    BaseSchema.initialize_ids_translation()
+    thread_dap_id = BaseSchema._translate_id_to_dap('thread1')
+
+    suspended_frames_manager = SuspendedFramesManager()
+    shared = [1]
+
+    def check_suspend(thread_id):
+        tracker = suspended_frames_manager.track_frames(None)
+        tracker_instance = tracker.__enter__()
+        frame = get_frame()
+        frames_list = pydevd_frame_utils.FramesList()
+        frames_list.append(frame)
+        tracker_instance.track(thread_id, frames_list)
+        variable = suspended_frames_manager.get_variable(id(frame))
+        children = variable.get_children_variables()
+        frame_dap_id = BaseSchema._translate_id_to_dap(id(frame))
+        shared_variable = tracker_instance.obtain_as_variable('shared', shared)
+        shared_dap_id = BaseSchema._translate_id_to_dap(shared_variable.get_variable_reference())
+        assert BaseSchema._translate_id_from_dap(frame_dap_id) == id(frame)
+        return tracker, frame, frame_dap_id, shared_dap_id, children
+
+    tracker1, frame1, frame1_dap_id, shared_dap_id, _children1 = check_suspend('thread1')
+    tracker2, frame2, frame2_dap_id, shared_dap_id2, _children2 = check_suspend('thread2')
+    assert shared_dap_id == shared_dap_id2
+
+    tracker1.__exit__(None, None, None)
+    with pytest.raises(KeyError):
+        BaseSchema._translate_id_from_dap(frame1_dap_id)
+
+    # Still referenced by the thread which is still suspended.
+    assert BaseSchema._translate_id_from_dap(shared_dap_id) == id(shared)
+    assert BaseSchema._translate_id_from_dap(frame2_dap_id) == id(frame2)
+
+    tracker2.__exit__(None, None, None)
+    with pytest.raises(KeyError):
+        BaseSchema._translate_id_from_dap(shared_dap_id)
+
+    # Thread ids aren't released.
+    assert BaseSchema._translate_id_from_dap(thread_dap_id) == 'thread1'
+
+    # Released dap ids are only reused after some other ids are released.
+    tracker, _frame, frame_dap_id, _shared_dap_id, _children = check_suspend('thread1')
+    assert frame_dap_id not in (frame1_dap_id, frame2_dap_id)
+    tracker.__exit__(None, None, None)
+
+    # Afterwards they're reused (so, the table doesn't grow).
+    monkeypatch.setattr(pydevd_base_schema, 'REUSE_RELEASED_DAP_IDS_AFTER', 6)
+    table_sizes = []
+    for _i in range(10):
+        tracker, _frame, _frame_dap_id, _shared_dap_id, _children = check_suspend('thread1')
+        tracker.__exit__(None, None, None)
+        table_sizes.append(len(BaseSchema._dap_id_to_obj_id))
+    assert len(set(table_sizes[5:])) == 1
+
+
+def test_value_repr_cache_owned_by_tracker():
+    from _pydevd_bundle.pydevd_suspended_frames import SuspendedFramesManager
+
+    class MyObject(object):
+
+        calls = 0
+
+        def __repr__(self):
+            MyObject.calls += 1
+            return 'MyObject(%s)' % (MyObject.calls,)
+
+    class _DummyPyDB(object):
+
+        all_threads_suspended = True
+
+        def are_all_threads_suspended(self):
+            return self.all_threads_suspended
+
+    py_db = _DummyPyDB()
+    suspended_frames_manager = SuspendedFramesManager()
+    obj = MyObject()
+
+    def create_frames_list():
+        frames_list = pydevd_frame_utils.FramesList()
+        frames_list.append(get_frame())
+        return frames_list
+
+    def get_value(tracker, thread_id):
+        variable = tracker.obtain_as_variable('obj', obj)
+        return variable.get_var_data(value_repr_cache=suspended_frames_manager.get_value_repr_cache(thread_id))['value']
+
+    with suspended_frames_manager.track_frames(py_db) as tracker1:
+        tracker1.track('thread1', create_frames_list())
+        with suspended_frames_manager.track_frames(py_db) as tracker2:
+            tracker2.track('thread2', create_frames_list())
+
+            assert get_value(tracker1, 'thread1') == 'MyObject(1)'
+            assert get_value(tracker1, 'thread1') == 'MyObject(1)'
+            assert get_value(tracker2, 'thread2') == 'MyObject(2)'
+
+            # Nothing is cached while some thread is running.
+            py_db.all_threads_suspended = False
+            assert suspended_frames_manager.get_value_repr_cache('thread1') is None
+            assert get_value(tracker1, 'thread1') == 'MyObject(3)'
+            py_db.all_threads_suspended = True
+            assert get_value(tracker1, 'thread1') == 'MyObject(1)'
+
+            # Evaluating some code clears the caches of all the threads.
+            suspended_frames_manager.clear_value_repr_caches()
+            assert get_value(tracker1, 'thread1') == 'MyObject(4)'
+            assert get_value(tracker2, 'thread2') == 'MyObject(5)'
+
+        # Resuming a thread clears the caches of the threads still suspended.
+        assert suspended_frames_manager.get_value_repr_cache('thread2') is None
+        assert get_value(tracker1, 'thread1') == 'MyObject(6)'
+
+    # Nothing is cached outside of a suspension.
+    assert suspended_frames_manager.get_value_repr_cache('thread1') is None
+
+
+def test_get_var_data_truncated():
+    from _pydevd_bundle.pydevd_suspended_frames import SuspendedFramesManager
+    from _pydevd_bundle.pydevd_xml import RenderBudget
+
+    suspended_frames_manager = SuspendedFramesManager()
+    with suspended_frames_manager.track_frames(None) as tracker:
+        variable = tracker.obtain_as_variable('lst', list(range(10)))
+
+        var_data = variable.get_var_data(budget=RenderBudget(max_size=5))
+        assert var_data['value'].endswith('...')
+        assert var_data['presentationHint'] == {'attributes': ['truncated']}
+
+        # The full value is provided if there's no budget.
+        var_data = variable.get_var_data()
+        assert var_data['value'] == str(list(range(10)))
+        assert 'presentationHint' not in var_data
+
+
+def get_large_containers_frame():
+    obj_list = list(range(_NUMBER_OF_ITEMS_TO_CREATE))
+    obj_dict = dict(('key%s' % (idx,), idx) for idx in range(_NUMBER_OF_ITEMS_TO_CREATE))
+    obj_set = set(range(_NUMBER_OF_ITEMS_TO_CREATE))
+    small_list = [1, 2]
+    return sys._getframe()
+
+
+def test_get_child_variables_paged():
+    from _pydevd_bundle.pydevd_suspended_frames import SuspendedFramesManager
+    suspended_frames_manager = SuspendedFramesManager()
+    frame = get_large_containers_frame()
+    with suspended_frames_manager.track_frames(None) as tracker:
+        tracker.track('thread1', pydevd_frame_utils.create_frames_list_from_frame(frame))
+        variable = suspended_frames_manager.get_variable(id(frame))
+
+        name_to_var = dict((x.get_name(), x) for x in variable.get_children_variables())
+        assert variable.get_children_variables(filter='indexed') == []
+
+        # Small containers don't report indexed/named variables.
+        assert 'indexedVariables' not in name_to_var['small_list'].get_var_data()
+
+        for name in ('obj_list', 'obj_dict', 'obj_set'):
+            var = name_to_var[name]
+            var_data = var.get_var_data()
+            assert var_data['indexedVariables'] == _NUMBER_OF_ITEMS_TO_CREATE
+            assert var_data['namedVariables'] == 1
+
+            named = var.get_children_variables(filter='named')
+            assert [x.get_name() for x in named] == ['__len__']
+
+            indexed = var.get_children_variables(filter='indexed', start=500, count=100)
+            assert len(indexed) == 100
+
+            # The last page may be smaller than the count requested.
+            indexed = var.get_children_variables(filter='indexed', start=_NUMBER_OF_ITEMS_TO_CREATE - 10, count=100)
+            assert len(indexed) == 10
+
+        # The named children of subclasses of builtin containers are counted from the instance
+        # fields (without collecting those).
+        class ListWithAttrs(list):
+            pass
+
+        obj = ListWithAttrs(range(_NUMBER_OF_ITEMS_TO_CREATE))
+        obj.attr1 = 1
+        obj.attr2 = 2
+        var = tracker.obtain_as_variable('obj', obj, evaluate_name='obj')
+        assert var.get_var_data()['namedVariables'] == 3
+        named = var.get_children_variables(filter='named')
+        assert [x.get_name() for x in named] == ['attr1', 'attr2', '__len__']
+
+        indexed = name_to_var['obj_list'].get_children_variables(filter='indexed', start=500, count=2)
+        assert [x.get_var_data() for x in indexed] == [
+            {'name': '500', 'value': '500', 'type': 'int', 'evaluateName': 'obj_list[500]', 'variablesReference': 0},
+            {'name': '501', 'value': '501', 'type': 'int', 'evaluateName': 'obj_list[501]', 'variablesReference': 0},
+        ]
+
+        indexed = name_to_var['obj_dict'].get_children_variables(filter='indexed', start=500, count=1)
+        assert [x.get_var_data() for x in indexed] == [
+            {'name': "'key500'", 'value': '500', 'type': 'int', 'evaluateName': "obj_dict['key500']", 'variablesReference': 0},
+        ]
+
+
+def test_get_child_variables_paged_numpy():
+    np = pytest.importorskip('numpy')
+    from _pydevd_bundle.pydevd_suspended_frames import SuspendedFramesManager
+    suspended_frames_manager = SuspendedFramesManager()
+    with suspended_frames_manager.track_frames(None) as tracker:
+        var = tracker.obtain_as_variable('arr', np.arange(_NUMBER_OF_ITEMS_TO_CREATE), evaluate_name='arr')
+
+        var_data = var.get_var_data()
+        assert var_data['indexedVariables'] == _NUMBER_OF_ITEMS_TO_CREATE
+
+        named = [x.get_name() for x in var.get_children_variables(filter='named')]
+        assert named == ['dtype', 'max', 'min', 'shape', 'size', '__internals__']
+        assert var_data['namedVariables'] == len(named)
+
+        indexed = var.get_children_variables(filter='indexed', start=500, count=2)
+        assert [(x.get_name(), x.get_var_data()['evaluateName']) for x in indexed] == [
+            ('500', 'arr[500]'), ('501', 'arr[501]')]
+
+        # Without a filter all the children are returned.
+        assert '[0:%s] ' % (_NUMBER_OF_ITEMS_TO_CREATE,) in [x.get_name() for x in var.get_children_variables()]
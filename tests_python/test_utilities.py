@@ -389,3 +389,668 @@ def check_dont_notify_on_gevent_loaded():
 def test_gevent_notify():
     _check_in_separate_process('check_notify_on_gevent_loaded', update_env={'GEVENT_SUPPORT': ''})
     _check_in_separate_process('check_dont_notify_on_gevent_loaded', update_env={'GEVENT_SUPPORT': 'True'})
+
+
+def test_get_code_lines():
+    from _pydevd_bundle import pydevd_frame_utils
+    from _pydevd_bundle.pydevd_frame_utils import get_code_lines
+
+    code = compile('a = 1\n\nb = 2\nc = 3\n', '<test_get_code_lines>', 'exec')
+    lines = get_code_lines(code)
+    assert set([1, 3, 4]).issubset(lines)
+    assert 2 not in lines
+    assert get_code_lines(code) is lines  # Cached
+
+    code_id = id(code)
+    assert code_id in pydevd_frame_utils._code_id_to_lines
+    if IS_CPYTHON:
+        # Removed from the index when the code is collected.
+        del code
+        assert code_id not in pydevd_frame_utils._code_id_to_lines
+
+
+def test_clear_cache_skips_for_file():
+    from _pydevd_bundle.pydevd_trace_dispatch_regular import (clear_cache_skips,
+        global_cache_skips, global_cache_frame_skips)
+    from pydevd_file_utils import get_abs_path_real_path_and_base_from_file
+
+    filename1 = get_abs_path_real_path_and_base_from_file(__file__)[1]
+    other_filename = os.path.join(os.path.dirname(__file__), 'other_file.py')
+
+    key1 = (1, 'method1', __file__)
+    key2 = (2, 'method2', __file__)
+    key3 = (1, 'method3', other_filename)
+
+    initial_cache_skips = global_cache_skips.copy()
+    initial_cache_frame_skips = global_cache_frame_skips.copy()
+    try:
+        global_cache_skips.update({key1: 1, key2: 2, key3: 2})
+        global_cache_frame_skips.update({key1: 0, (key1, 10): 0, key3: 0, (key3, 'returns'): set()})
+
+        clear_cache_skips(filename1)
+
+        # Skipped because of filters: not related to breakpoints (so, kept).
+        assert global_cache_skips[key1] == 1
+        assert key2 not in global_cache_skips
+        assert global_cache_skips[key3] == 2
+
+        assert key1 not in global_cache_frame_skips
+        assert (key1, 10) not in global_cache_frame_skips
+        assert key3 in global_cache_frame_skips
+        assert (key3, 'returns') in global_cache_frame_skips
+
+        clear_cache_skips()
+        assert not global_cache_skips
+        assert not global_cache_frame_skips
+    finally:
+        global_cache_skips.clear()
+        global_cache_skips.update(initial_cache_skips)
+        global_cache_frame_skips.clear()
+        global_cache_frame_skips.update(initial_cache_frame_skips)
+
+
+def test_line_breakpoint_compiled_conditions():
+    from _pydevd_bundle.pydevd_breakpoints import LineBreakpoint
+    import sys
+
+    bp = LineBreakpoint(1, 'a == 1', 'None', 'a + 1', hit_condition='@HIT@ % a == 0')
+    assert bp.condition_code is not None
+    assert bp.expression_code is not None
+    assert bp.hit_condition_code is not None
+
+    a = 2
+    frame = sys._getframe()
+    assert [bp.handle_hit_condition(frame) for _i in range(4)] == [False, True, False, True]
+    assert eval(bp.expression_code, frame.f_globals, frame.f_locals) == 3
+
+    # Invalid expressions aren't compiled (they're evaluated from the source so that the error is reported).
+    bp = LineBreakpoint(1, 'a ==', 'None', None, hit_condition='@HIT@ ==')
+    assert bp.condition_code is None
+    assert bp.expression_code is None
+    assert bp.hit_condition_code is None
+    assert not bp.handle_hit_condition(frame)
+
+    # The hit count must also be available in nested scopes.
+    for hit_condition in (
+            'any(x == @HIT@ for x in [a])',
+            '[@HIT@ for _ in range(1)][0] == a',
+            '(lambda: @HIT@)() == a',
+            '{x: @HIT@ for x in [1]}[1] == a',
+        ):
+        bp = LineBreakpoint(1, None, 'None', None, hit_condition=hit_condition)
+        assert [bp.handle_hit_condition(frame) for _i in range(3)] == [False, True, False], hit_condition
+
+    bp = LineBreakpoint(1, None, 'None', None, hit_condition='a == 2')
+    assert bp.hit_condition_code is not None
+    assert bp.handle_hit_condition(frame)
+
+
+def test_compiled_code_cache():
+    from _pydevd_bundle.pydevd_code_cache import CompiledCodeCache
+
+    cache = CompiledCodeCache(max_size=2)
+    compiled = []
+
+    def compile_code(source):
+
+        def _compile():
+            compiled.append(source)
+            return compile(source, '<string>', 'eval')
+
+        return _compile
+
+    code = cache.get_code(('a', 'eval'), compile_code('a'))
+    assert cache.get_code(('a', 'eval'), compile_code('a')) is code
+    cache.get_code(('b', 'eval'), compile_code('b'))
+    cache.get_code(('a', 'eval'), compile_code('a'))
+
+    # 'b' is the least recently used, so, it's the one evicted.
+    cache.get_code(('c', 'eval'), compile_code('c'))
+    cache.get_code(('a', 'eval'), compile_code('a'))
+    cache.get_code(('b', 'eval'), compile_code('b'))
+    assert compiled == ['a', 'b', 'c', 'b']
+
+    # Errors are cached too (but a new exception is raised each time).
+    errors = []
+    for _i in range(2):
+        with pytest.raises(SyntaxError) as exc_info:
+            cache.get_code(('a ==', 'eval'), compile_code('a =='))
+        errors.append(exc_info.value)
+    assert compiled == ['a', 'b', 'c', 'b', 'a ==']
+    assert errors[0] is not errors[1]
+    assert errors[0].lineno == errors[1].lineno == 1
+
+    # Errors which aren't related to the source aren't cached.
+    def fail_to_compile():
+        compiled.append('fail')
+        raise MemoryError()
+
+    for _i in range(2):
+        with pytest.raises(MemoryError):
+            cache.get_code(('fail', 'eval'), fail_to_compile)
+    assert compiled == ['a', 'b', 'c', 'b', 'a ==', 'fail', 'fail']
+
+    stats = cache.to_dict()
+    assert stats['size'] == 2
+    assert stats['hits'] == 4
+    assert stats['misses'] == 7
+    assert stats['evictions'] == 3
+    assert stats['hit_rate'] == 4. / 11
+
+
+def test_evaluate_expression_compiled_code_cache():
+    from _pydevd_bundle.pydevd_code_cache import get_compiled_code_cache
+    from _pydevd_bundle.pydevd_vars import evaluate_expression, compile_expression
+    import sys
+
+    cache = get_compiled_code_cache()
+    a = 10
+    frame = sys._getframe()
+    hits = cache.hits
+    assert evaluate_expression(None, frame, '  a + 1', is_exec=False) == 11
+    assert evaluate_expression(None, frame, '  a + 1', is_exec=False) == 11
+    assert cache.hits == hits + 1
+    assert compile_expression('  a + 1', 'eval') is compile_expression('  a + 1', 'eval')
+
+    # A statement falls back from the eval to an exec (and both are cached).
+    evaluate_expression(None, frame, 'b = a + 2', is_exec=True)
+    hits = cache.hits
+    evaluate_expression(None, frame, 'b = a + 2', is_exec=True)
+    assert cache.hits == hits + 2
+
+
+def test_socket_reader():
+    from _pydevd_bundle.pydevd_comm import SocketReader
+    import socket
+
+    if not hasattr(socket, 'socketpair'):
+        pytest.skip('socket.socketpair not available.')
+
+    sock1, sock2 = socket.socketpair()
+    try:
+        reader = SocketReader(sock1)
+        reader.READ_SIZE = 16  # Small reads so that the buffer needs to be moved/grown.
+        reader.MAX_KEPT_BUFFER_SIZE = 64
+
+        big_contents = b'{"a": "' + b'x' * 1000 + b'"}'
+        messages = [b'{"b": 1}', big_contents, b'{"c": "\xc3\xa1"}']
+
+        def write_all():
+            for msg in messages:
+                sock2.sendall(b'Content-Length: %d\r\n\r\n' % (len(msg),))
+                sock2.sendall(msg)
+            sock2.sendall(b'101\t1\tline\n')
+            sock2.close()
+
+        t = threading.Thread(target=write_all)
+        t.start()
+
+        for msg in messages:
+            assert reader.read_line() == b'Content-Length: %d\r\n' % (len(msg),)
+            assert reader.read_line() == b'\r\n'
+            assert reader.read(len(msg)) == msg
+        assert reader.read_line() == b'101\t1\tline\n'
+
+        # Socket closed.
+        assert reader.read_line() == b''
+        assert reader.read(1) == b''
+        t.join()
+    finally:
+        sock1.close()
+
+
+def test_send_buffers():
+    from _pydevd_bundle.pydevd_net_command import send_buffers
+    import socket
+
+    if not hasattr(socket, 'socketpair'):
+        pytest.skip('socket.socketpair not available.')
+
+    sock1, sock2 = socket.socketpair()
+    try:
+        # Big buffers (so that sendmsg does partial sends), empty buffers and more buffers than
+        # what's sent in a single sendmsg.
+        buffers = [b'a' * 200000, b'', b'b' * 100] + [b'%d' % (i,) for i in range(1500)]
+        received = []
+
+        def read_all():
+            while True:
+                contents = sock2.recv(65536)
+                if not contents:
+                    break
+                received.append(contents)
+
+        t = threading.Thread(target=read_all)
+        t.start()
+        send_buffers(sock1, buffers)
+        sock1.shutdown(socket.SHUT_WR)
+        t.join()
+        assert b''.join(received) == b''.join(buffers)
+    finally:
+        sock1.close()
+        sock2.close()
+
+
+def test_internal_commands_queue_wake_up():
+    from pydevd import _InternalCommandsQueue
+    import time
+
+    queue = _InternalCommandsQueue()
+    waited = []
+
+    def wait_for_commands():
+        initial_time = time.time()
+        queue.wait_for_commands(10)
+        waited.append(time.time() - initial_time)
+
+    t = threading.Thread(target=wait_for_commands)
+    t.start()
+    time.sleep(.2)
+    queue.wake_up()
+    t.join(5)
+    assert len(waited) == 1
+    assert waited[0] < 5
+
+    # The wake up isn't lost if it's done before waiting (but it's cleared after the wait).
+    queue.wake_up()
+    initial_time = time.time()
+    queue.wait_for_commands(10)
+    assert time.time() - initial_time < 5
+    queue.wait_for_commands(.1)
+
+
+def test_writer_priority_lanes():
+    from _pydev_bundle.pydev_imports import _queue
+    from _pydevd_bundle.pydevd_comm import _PriorityCommandsQueue, _CMD_ID_TO_WRITER_LANE, \
+        WRITER_LANE_CONTROL, WRITER_LANE_THREAD_EVENTS, WRITER_LANE_MODULE_EVENTS, WRITER_LANE_OUTPUT
+    from _pydevd_bundle.pydevd_comm_constants import CMD_WRITE_TO_CONSOLE, CMD_MODULE_EVENT, \
+        CMD_THREAD_SUSPEND_SINGLE_NOTIFICATION, CMD_RETURN, CMD_EXIT
+
+    assert _CMD_ID_TO_WRITER_LANE.get(CMD_RETURN, WRITER_LANE_CONTROL) == WRITER_LANE_CONTROL
+    assert _CMD_ID_TO_WRITER_LANE[CMD_THREAD_SUSPEND_SINGLE_NOTIFICATION] == WRITER_LANE_THREAD_EVENTS
+    assert _CMD_ID_TO_WRITER_LANE[CMD_MODULE_EVENT] == WRITER_LANE_MODULE_EVENTS
+    assert _CMD_ID_TO_WRITER_LANE[CMD_WRITE_TO_CONSOLE] == WRITER_LANE_OUTPUT
+    assert _CMD_ID_TO_WRITER_LANE[CMD_EXIT] == WRITER_LANE_OUTPUT
+
+    queue = _PriorityCommandsQueue(WRITER_LANE_OUTPUT + 1)
+    assert queue.empty()
+    with pytest.raises(_queue.Empty):
+        queue.get(True, 0.01)
+
+    # Note: keep the threads alive until the end (so that thread idents aren't reused).
+    finish_threads = threading.Event()
+    threads = []
+
+    def put_in_thread(*items_and_lanes):
+        items_added = threading.Event()
+
+        def put_items():
+            for item, lane in items_and_lanes:
+                queue.put(item, lane)
+            items_added.set()
+            finish_threads.wait()
+
+        t = threading.Thread(target=put_items)
+        t.start()
+        threads.append(t)
+        assert items_added.wait(5)
+
+    # Items from different threads: lower lanes are written first.
+    put_in_thread(*[('output%s' % (i,), WRITER_LANE_OUTPUT) for i in range(3)])
+    put_in_thread(('module0', WRITER_LANE_MODULE_EVENTS))
+    put_in_thread(('stopped0', WRITER_LANE_THREAD_EVENTS), ('stopped1', WRITER_LANE_THREAD_EVENTS))
+    queue.put('response0', WRITER_LANE_CONTROL)
+    queue.put('response1', WRITER_LANE_CONTROL)
+
+    assert queue.qsize() == 8
+    assert queue.qsize(WRITER_LANE_OUTPUT) == 3
+    assert [queue.get_nowait() for _i in range(8)] == [
+        'response0', 'response1', 'stopped0', 'stopped1', 'module0', 'output0', 'output1', 'output2']
+    assert queue.empty()
+    with pytest.raises(_queue.Empty):
+        queue.get_nowait()
+
+    # Items added by the same thread are not reordered (i.e.: the output printed while evaluating
+    # is written before the evaluate response).
+    put_in_thread(*[('output%s' % (i,), WRITER_LANE_OUTPUT) for i in range(3)])
+    put_in_thread(('module0', WRITER_LANE_MODULE_EVENTS))
+    queue.put('eval_output0', WRITER_LANE_OUTPUT)
+    queue.put('stopped2', WRITER_LANE_THREAD_EVENTS)
+    queue.put('eval_output1', WRITER_LANE_OUTPUT)
+    queue.put('eval_response', WRITER_LANE_CONTROL)
+    assert queue.qsize(WRITER_LANE_CONTROL) == 4
+    assert queue.qsize(WRITER_LANE_THREAD_EVENTS) == 0
+    assert queue.qsize(WRITER_LANE_OUTPUT) == 3  # Only the output from the other thread is kept.
+    assert [queue.get_nowait() for _i in range(8)] == [
+        'eval_output0', 'stopped2', 'eval_output1', 'eval_response', 'module0', 'output0', 'output1', 'output2']
+    assert queue.empty()
+
+    # Check that a blocked get is awakened by a put.
+    t = threading.Timer(0.05, queue.put, args=('response2', WRITER_LANE_CONTROL))
+    t.start()
+    assert queue.get(True, 5) == 'response2'
+    t.join()
+
+    finish_threads.set()
+    for t in threads:
+        t.join()
+
+
+class _DummyWriter(object):
+
+    def __init__(self):
+        self.command_ids = []
+
+    def add_command(self, cmd):
+        self.command_ids.append(cmd.id)
+
+
+def _create_py_db_with_dummy_writer():
+    import pydevd
+    py_db = pydevd.PyDB(set_as_global=False)
+    py_db.writer = _DummyWriter()
+    py_db.set_enable_thread_notifications(True)
+    return py_db
+
+
+@pytest.mark.parametrize('use_cython', [False, True])
+def test_thread_tracer_stops_when_thread_killed(use_cython):
+    from _pydevd_bundle.pydevd_constants import get_current_thread_id, NO_FTRACE
+    from _pydevd_bundle.pydevd_comm_constants import CMD_THREAD_CREATE, CMD_THREAD_KILL
+    if use_cython:
+        try:
+            from _pydevd_bundle import pydevd_cython_wrapper  # @UnusedImport
+        except ImportError:
+            pytest.skip('Cython speedups not available.')
+        mod = sys.modules['_pydevd_bundle.pydevd_cython']
+        ThreadTracer, PyDBAdditionalThreadInfo = mod.ThreadTracer, mod.PyDBAdditionalThreadInfo
+    else:
+        from _pydevd_bundle.pydevd_trace_dispatch_regular import ThreadTracer
+        from _pydevd_bundle.pydevd_additional_thread_info_regular import PyDBAdditionalThreadInfo
+
+    py_db = _create_py_db_with_dummy_writer()
+
+    t = threading.Thread(target=lambda: None)
+    additional_info = PyDBAdditionalThreadInfo()
+    t.additional_info = additional_info
+    thread_id = get_current_thread_id(t)
+
+    py_db.notify_thread_created(thread_id, t)
+    assert py_db.writer.command_ids == [CMD_THREAD_CREATE]
+    assert not additional_info.pydev_notify_kill
+
+    # When the exit is noticed the thread is marked as killed (so, the tracer doesn't need to
+    # check whether the thread is still alive at each call).
+    py_db.notify_thread_not_alive(thread_id)
+    assert py_db.writer.command_ids == [CMD_THREAD_CREATE, CMD_THREAD_KILL]
+    assert additional_info.pydev_notify_kill
+
+    tracer = ThreadTracer((py_db, t, additional_info, {}, {}))
+    frame = sys._getframe()
+    assert tracer(frame, 'call', None) is None
+    assert tracer(frame, 'line', None) is NO_FTRACE
+    assert not additional_info.is_tracing
+
+    # A thread marked as killed isn't notified as created again.
+    py_db.notify_thread_created(thread_id, t)
+    assert py_db.writer.command_ids == [CMD_THREAD_CREATE, CMD_THREAD_KILL]
+
+
+def test_reconcile_running_threads():
+    from _pydevd_bundle.pydevd_constants import get_thread_id
+    from _pydevd_bundle.pydevd_comm_constants import CMD_THREAD_CREATE, CMD_THREAD_KILL
+    py_db = _create_py_db_with_dummy_writer()
+
+    # The first check is done right away (and notifies about the threads already running).
+    assert py_db._reconcile_running_threads()
+    assert get_thread_id(threading.current_thread()) in py_db._running_thread_ids
+    assert CMD_THREAD_CREATE in py_db.writer.command_ids
+
+    finish = threading.Event()
+    t = threading.Thread(target=finish.wait, args=(10,))
+    t.start()
+    try:
+        # Threads not started through pydev_monkey are only noticed on the next periodic check.
+        del py_db.writer.command_ids[:]
+        assert py_db._reconcile_running_threads()
+        assert py_db.writer.command_ids == []
+        assert get_thread_id(t) not in py_db._running_thread_ids
+
+        py_db._next_threads_reconcile_time = 0
+        assert py_db._reconcile_running_threads()
+        assert CMD_THREAD_CREATE in py_db.writer.command_ids
+        assert get_thread_id(t) in py_db._running_thread_ids
+    finally:
+        finish.set()
+        t.join(5)
+
+    del py_db.writer.command_ids[:]
+    py_db._next_threads_reconcile_time = 0
+    assert py_db._reconcile_running_threads()
+    assert CMD_THREAD_KILL in py_db.writer.command_ids
+    assert get_thread_id(t) not in py_db._running_thread_ids
+    assert t.additional_info.pydev_notify_kill
+
+
+def test_unix_socket_and_inherited_fd_transports(tmpdir):
+    from _pydevd_bundle.pydevd_comm import start_server, start_client, create_server_socket
+    import errno
+    import socket
+    import time
+
+    if not hasattr(socket, 'AF_UNIX'):
+        pytest.skip('Unix domain sockets not available.')
+
+    endpoint = 'unix:' + str(tmpdir.join('pydevd.sock'))
+
+    # A socket left over by some previous process is removed.
+    create_server_socket(endpoint, 0).close()
+    assert os.path.exists(endpoint[len('unix:'):])
+
+    # But not one which something is still listening at.
+    listening = create_server_socket(endpoint, 0)
+    try:
+        listening.listen(1)
+        with pytest.raises(socket.error) as exc_info:
+            create_server_socket(endpoint, 0)
+        assert exc_info.value.errno == errno.EADDRINUSE
+    finally:
+        listening.close()
+
+    server_sockets = []
+    t = threading.Thread(target=lambda: server_sockets.append(start_server(0, endpoint)))
+    t.start()
+    for _i in range(50):
+        try:
+            client_socket = start_client(endpoint, None)
+            break
+        except socket.error:
+            time.sleep(.1)
+    t.join()
+    server_socket = server_sockets[0]
+    try:
+        assert server_socket.family == socket.AF_UNIX
+        client_socket.sendall(b'ping')
+        assert server_socket.recv(4) == b'ping'
+    finally:
+        client_socket.close()
+        server_socket.close()
+
+    sock1, sock2 = socket.socketpair()
+    try:
+        # The fd endpoint uses the inherited socket as is (in both, client and server modes).
+        for start in (lambda endpoint: start_client(endpoint, None), lambda endpoint: start_server(0, endpoint)):
+            s = start(u'fd:%s' % (os.dup(sock1.fileno()),))
+            try:
+                s.sendall(b'pong')
+                assert sock2.recv(4) == b'pong'
+            finally:
+                s.close()
+    finally:
+        sock1.close()
+        sock2.close()
+
+
+def test_json_encoder():
+    from _pydevd_bundle.pydevd_json_encoder import dumps_to_bytes
+    import json
+
+    for obj in (
+            {'type': 'event', 'body': {'output': u'ação\n', 'category': 'stdout', 'source': {}}, 'seq': 1},
+            [1, 2.5, None, True, u'汉字'],
+            {1: 'non str key'},
+            {'big': 2 ** 70},  # Doesn't fit in 64 bits
+            {'surrogate': u'\ud800'} if IS_PY3K else {},  # Lone surrogate (can't be encoded as utf-8)
+        ):
+        as_bytes = dumps_to_bytes(obj)
+        assert isinstance(as_bytes, bytes)
+        assert json.loads(as_bytes.decode('utf-8')) == json.loads(json.dumps(obj))
+
+    with pytest.raises(TypeError):
+        dumps_to_bytes({'not serializable': object()})
+
+
+def test_stack_frame_source_cache():
+    from _pydevd_bundle.pydevd_net_command_factory_json import NetCommandFactoryJson
+
+    factory = NetCommandFactoryJson()
+    source = factory._get_stack_frame_source('/project/module.py')
+    assert source == {'path': '/project/module.py', 'sourceReference': 0}
+    assert factory._get_stack_frame_source('/project/module.py') is source
+
+    factory.MAX_CACHED_SOURCES = 2
+    factory._get_stack_frame_source('/project/module2.py')
+    factory._get_stack_frame_source('/project/module3.py')  # Clears the cache (max reached).
+    assert factory._get_stack_frame_source('/project/module.py') is not source
+
+
+def test_array_to_xml_numpy_formatting(monkeypatch):
+    np = pytest.importorskip('numpy')
+    from _pydevd_bundle import pydevd_vars
+    from _pydevd_bundle.pydevd_xml import ValueReprCache
+
+    def check(array, roffset=0, coffset=0, rows=-1, cols=-1, format='%'):
+        array, _meta_xml, r, c, f = pydevd_vars.array_to_meta_xml(array, 'arr', format)
+        if rows == -1 and cols == -1:
+            rows, cols = r, c
+        xml = pydevd_vars.array_to_xml(array, roffset, coffset, rows, cols, '%' + f)
+
+        with monkeypatch.context() as m:
+            # The xml must be the same one created formatting each cell.
+            m.setattr(pydevd_vars, '_array_window_to_xml', lambda *args: None)
+            assert xml == pydevd_vars.array_to_xml(array, roffset, coffset, rows, cols, '%' + f)
+        return xml
+
+    xml = check(np.array([['a<b>&"c', ''], [u'x y/z=%00', '100%']]))
+    assert xml.count('<var ') == 4
+
+    check(np.arange(200.).reshape(20, 10) - 100)
+    check(np.arange(200.).reshape(20, 10), roffset=3, coffset=2, rows=5, cols=5, format='%.2f')
+    check(np.arange(200).reshape(20, 10), format='%d')
+    check(np.arange(30))
+    check(np.asfortranarray(np.arange(30.)))
+    check(np.array([[None, {'a': 1}], [[1, 2], 'x']], dtype=object), format='%s')
+
+    # The bounds of the array are computed only once (while the cache isn't cleared).
+    value_repr_cache = ValueReprCache()
+    array = np.arange(6).reshape(2, 3)
+    meta_xml = pydevd_vars.array_to_meta_xml(array, 'arr', '%', value_repr_cache)[1]
+    assert 'max="5" min="0"' in meta_xml
+    array[0, 0] = 10
+    assert pydevd_vars.array_to_meta_xml(array, 'arr', '%', value_repr_cache)[1] == meta_xml
+    assert 'max="10" min="1"' in pydevd_vars.array_to_meta_xml(array, 'arr', '%')[1]
+
+    value_repr_cache.clear()
+    assert 'max="10" min="1"' in pydevd_vars.array_to_meta_xml(array, 'arr', '%', value_repr_cache)[1]
+
+
+def _read_binary_array_data(xml):
+    import base64
+    import re
+    import numpy as np
+
+    data = base64.b64decode(re.search(r'encoding="base64" data="([^"]*)"', xml).group(1))
+    arrays = []
+    for dtype, shape, offset, nbytes in re.findall(
+            r'<buffer index="\d+" dtype="([^"]*)" shape="([^"]*)" strides="[^"]*" offset="(\d+)" nbytes="(\d+)"/>', xml):
+        dtype = dtype.replace('&lt;', '<').replace('&gt;', '>')
+        shape = tuple(int(dim) for dim in shape.split(','))
+        offset = int(offset)
+        arrays.append(np.frombuffer(data[offset:offset + int(nbytes)], dtype=dtype).reshape(shape))
+    return arrays
+
+
+def test_table_like_struct_to_binary_xml():
+    np = pytest.importorskip('numpy')
+    from _pydevd_bundle import pydevd_vars
+
+    array = np.arange(200.).reshape(20, 10)
+    xml = pydevd_vars.table_like_struct_to_xml(array, 'arr', 3, 2, 5, 4, '%', binary=True)
+    assert '<array slice="arr"' in xml
+    assert '<arraydata rows="5" cols="4" encoding="base64"' in xml
+    window, = _read_binary_array_data(xml)
+    assert window.dtype == np.dtype('<f8')
+    assert (window == array[3:8, 2:6]).all()
+
+    # Big-endian and python objects are converted.
+    array = np.arange(10, dtype='>i4')
+    window, = _read_binary_array_data(pydevd_vars.table_like_struct_to_xml(array, 'arr', 0, 0, -1, -1, '%', binary=True))
+    assert window.dtype == np.dtype('<i4')
+    assert window.tolist() == [list(range(10))]
+
+    array = np.array([None, 'a', 1], dtype=object)
+    window, = _read_binary_array_data(pydevd_vars.table_like_struct_to_xml(array, 'arr', 0, 0, -1, -1, '%', binary=True))
+    assert window.tolist() == [['None', 'a', '1']]
+
+
+def test_dataframe_to_binary_xml():
+    pd = pytest.importorskip('pandas')
+    from _pydevd_bundle import pydevd_vars
+
+    df = pd.DataFrame({'ints': range(10), 'floats': [i / 2. for i in range(10)], 'strs': ['s%s' % i for i in range(10)]})
+    xml = pydevd_vars.table_like_struct_to_xml(df, 'df', 2, 0, 3, 3, '%', binary=True)
+
+    # The header is the same one sent in the text format.
+    text_xml = pydevd_vars.table_like_struct_to_xml(df, 'df', 2, 0, 3, 3, '%')
+    assert xml[:xml.index('<arraydata')] == text_xml[:text_xml.index('<arraydata')]
+
+    ints, floats, strs = _read_binary_array_data(xml)
+    assert ints.tolist() == [2, 3, 4]
+    assert floats.tolist() == [1., 1.5, 2.]
+    assert strs.tolist() == ['s2', 's3', 's4']
+
+
+def test_dataframe_to_xml_numpy_formatting(monkeypatch):
+    pd = pytest.importorskip('pandas')
+    from _pydevd_bundle import pydevd_vars
+    from _pydevd_bundle.pydevd_xml import ValueReprCache
+
+    df = pd.DataFrame({
+        'ints': range(20),
+        'floats': [i / 3. for i in range(20)],
+        'bools': [i % 2 == 0 for i in range(20)],
+        'strs': ['<s%s> & "%%"' % (i,) for i in range(20)],
+        'objs': [None if i % 2 else {'a': i} for i in range(20)],
+        'dates': pd.date_range('2020-01-01', periods=20),
+    })
+
+    value_repr_cache = ValueReprCache()
+    for args in ((0, 0, -1, -1, '%'), (3, 1, 5, 4, '%.2f')):
+        xml = pydevd_vars.table_like_struct_to_xml(df, 'df', *args, value_repr_cache=value_repr_cache)
+        with monkeypatch.context() as m:
+            # The xml must be the same one created formatting each cell.
+            m.setattr(pydevd_vars, '_dataframe_columns_to_xml', lambda *args: None)
+            assert xml == pydevd_vars.table_like_struct_to_xml(df, 'df', *args, value_repr_cache=value_repr_cache)
+
+    # The bounds of the columns are computed only once (while the cache isn't cleared).
+    value_repr_cache.clear()
+    xml = pydevd_vars.table_like_struct_to_xml(df, 'df', 0, 0, 5, 1, '%', value_repr_cache=value_repr_cache)
+    assert 'max="19" min="0"' in xml
+    df.iloc[0, 0] = 100
+    assert 'max="19" min="0"' in pydevd_vars.table_like_struct_to_xml(
+        df, 'df', 0, 0, 5, 1, '%', value_repr_cache=value_repr_cache)
+    assert 'max="100" min="1"' in pydevd_vars.table_like_struct_to_xml(df, 'df', 0, 0, 5, 1, '%')
+
+    value_repr_cache.clear()
+    assert 'max="100" min="1"' in pydevd_vars.table_like_struct_to_xml(
+        df, 'df', 0, 0, 5, 1, '%', value_repr_cache=value_repr_cache)